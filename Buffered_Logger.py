@@ -0,0 +1,139 @@
+"""
+Buffered Logger
+스크립트 공용 로거입니다. 레벨별로 걸러내고 출력은 모아서 한 번에 씁니다.
+
+- 레벨: DEBUG < INFO < WARNING < ERROR (기본 INFO, 환경 변수 MW_LOG_LEVEL로 변경)
+- 메시지는 버퍼에 모았다가 flush() 때 콘솔(과 파일 싱크)에 한 번에 씁니다.
+  버퍼가 FLUSH_LINES를 넘거나 FLUSH_INTERVAL이 지나도 자동으로 flush 합니다.
+- 오브젝트마다 반복되는 메시지는 item(key, ...)으로 기록합니다.
+  key마다 ITEM_LIMIT개까지만 출력하고 나머지는 개수만 세어 flush 때 요약합니다.
+- set_file_sink(path)로 지정한 파일에도 같은 내용을 추가로 기록합니다.
+
+사용법:
+    log = get_logger("Convert_Armature_for_UE")
+
+    @log.flushing
+    def convert(): ...
+        log.item("copy", "복사: %s", obj.name)   # 메시지 포맷은 출력될 때만 수행
+        log.info("완료")
+"""
+
+import functools
+import os
+import sys
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {'DEBUG': DEBUG, 'INFO': INFO, 'WARNING': WARNING, 'ERROR': ERROR}
+LEVEL_PREFIXES = {DEBUG: "", INFO: "", WARNING: "WARNING: ", ERROR: "ERROR: "}
+
+ITEM_LIMIT = 5          # key마다 출력하는 반복 메시지 최대 개수
+FLUSH_LINES = 500       # 버퍼가 이 줄 수를 넘으면 자동 flush
+FLUSH_INTERVAL = 1.0    # 마지막 flush 후 이 시간(초)이 지나면 자동 flush
+
+level = LEVEL_NAMES.get(os.environ.get("MW_LOG_LEVEL", "INFO").upper(), INFO)
+file_sink_path = None
+loggers = {}
+
+def set_level(new_level):
+    """전체 로그 레벨 변경 ('DEBUG', 'INFO', ... 또는 숫자)"""
+    global level
+    level = LEVEL_NAMES[new_level.upper()] if isinstance(new_level, str) else int(new_level)
+
+def set_file_sink(path):
+    """로그를 추가로 기록할 파일 경로 지정 (None이면 해제)"""
+    global file_sink_path
+    file_sink_path = path
+
+def get_logger(name):
+    logger = loggers.get(name)
+    if logger is None:
+        logger = loggers[name] = BufferedLogger(name)
+    return logger
+
+def flush_all():
+    for logger in loggers.values():
+        logger.flush()
+
+def format_message(message, args):
+    return message % args if args else message
+
+class BufferedLogger:
+    """레벨 필터링, 버퍼 출력, 반복 메시지 요약을 지원하는 로거"""
+
+    def __init__(self, name):
+        self.name = name
+        self.lines = []
+        self.item_counts = {}    # key -> (전체 개수, 출력한 개수)
+        self.last_flush = time.perf_counter()
+
+    def is_enabled_for(self, message_level):
+        return message_level >= level
+
+    def log(self, message_level, message, *args):
+        if message_level < level:
+            return
+        self.lines.append(LEVEL_PREFIXES[message_level] + format_message(message, args))
+        if len(self.lines) >= FLUSH_LINES or time.perf_counter() - self.last_flush > FLUSH_INTERVAL:
+            self.flush(summarize=False)
+
+    def debug(self, message, *args):
+        self.log(DEBUG, message, *args)
+
+    def info(self, message, *args):
+        self.log(INFO, message, *args)
+
+    def warning(self, message, *args):
+        self.log(WARNING, message, *args)
+
+    def error(self, message, *args):
+        self.log(ERROR, message, *args)
+
+    def item(self, key, message, *args, message_level=INFO):
+        """
+        반복되는 항목 메시지 (오브젝트마다 한 줄 등)
+        key마다 ITEM_LIMIT개까지만 출력하고 나머지는 flush 때 개수로 요약합니다.
+        DEBUG 레벨에서는 모두 출력합니다.
+        """
+        total, shown = self.item_counts.get(key, (0, 0))
+        if message_level >= level and (shown < ITEM_LIMIT or level <= DEBUG):
+            self.log(message_level, message, *args)
+            shown += 1
+        self.item_counts[key] = (total + 1, shown)
+
+    def summarize_items(self):
+        for key, (total, shown) in self.item_counts.items():
+            if total > shown and level <= INFO:
+                self.lines.append(f"  ... {key}: 총 {total}건 중 {total - shown}건 생략")
+        self.item_counts.clear()
+
+    def flush(self, summarize=True):
+        """버퍼의 메시지를 한 번에 출력 (summarize면 반복 메시지 요약도 출력)"""
+        if summarize:
+            self.summarize_items()
+        self.last_flush = time.perf_counter()
+        if not self.lines:
+            return
+
+        text = "\n".join(self.lines) + "\n"
+        self.lines.clear()
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+        if file_sink_path:
+            with open(file_sink_path, "a", encoding="utf-8") as f:
+                f.write(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] [{self.name}]\n{text}")
+
+    def flushing(self, func):
+        """함수가 끝나면 (예외가 발생해도) flush 하는 데코레이터"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.flush()
+        return wrapper
@@ -1,132 +1,773 @@
 import bpy
+import hashlib
+import heapq
 import numpy as np
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from mathutils.bvhtree import BVHTree
 
-def get_k_nearest_weights(target_co, vertices_co, k=5):
+try:
+    from .Shared_Utils import profiled, get_logger, run_steps
+except ImportError:
+    from Shared_Utils import profiled, get_logger, run_steps
+
+log = get_logger("Constraint_Bone_to_Vertex")
+
+# 'VERTEX'  : inverse distance weights over the K_NEAREST closest vertices
+# 'SURFACE' : closest point on the triangle surface (BVH), three barycentric weights
+# 'GEODESIC': inverse geodesic distance weights over the K_NEAREST vertices reached along mesh edges
+#             from the nearest vertex (never jumps to another shell that is only spatially close)
+BIND_MODE = 'VERTEX'
+K_NEAREST = 5
+# How each bone tail aims at its vertex group:
+# 'IK'           : IK with chain_count = 1 (original behavior)
+# 'DAMPED_TRACK' : same single-bone aim without an IK solve (much cheaper on big rigs)
+# 'STRETCH_TO'   : aim and stretch the bone to reach the target
+CONSTRAINT_MODE = 'IK'
+AIM_CONSTRAINTS = {
+    'IK': ('IK', "IK"),
+    'DAMPED_TRACK': ('DAMPED_TRACK', "Damped Track"),
+    'STRETCH_TO': ('STRETCH_TO', "Stretch To"),
+}
+COMPARE_SAMPLE_FRAMES = 48
+# Reruns only rebind bones whose head/tail moved or whose mesh changed since the last bind.
+# The per-bone cache lives on the armature object as a custom property (one entry per mesh).
+USE_BIND_CACHE = True
+BIND_CACHE_PROPERTY = "mw_bind_cache"
+MOVE_TOLERANCE = 1e-5
+# NumPy releases the GIL in the heavy array ops, so VERTEX binding math for several
+# armature/mesh pairs runs in parallel worker threads. bpy is only touched on the main thread.
+# SURFACE (per-point BVH queries) and GEODESIC (Python Dijkstra) hold the GIL, so those binds
+# use a single worker: extra threads would only add contention. The worker still keeps the
+# math off the main thread so the modal job can yield while it runs.
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+# Upper bound of points x vertices per distance block (keeps memory flat on dense meshes)
+DISTANCE_CHUNK_ELEMENTS = 4_000_000
+
+def get_k_nearest_weights_batch(points, vertices_co, k=K_NEAREST):
     """
-    Finds k-nearest vertices and calculates weights using Inverse Distance Weighting (IDW).
+    Finds the k nearest vertices of many points at once and weights them with
+    Inverse Distance Weighting (IDW).
+    Returns (m, k) vertex indices and weights. Pure NumPy, safe to call from a worker thread.
     """
-    # Calculate distances to all vertices
-    dists = np.linalg.norm(vertices_co - target_co, axis=1)
-    
-    # Get indices of k closest vertices
-    # np.argpartition is faster than sort for finding k smallest
-    if len(dists) <= k:
-        k_indices = np.arange(len(dists))
-    else:
-        k_indices = np.argpartition(dists, k)[:k]
-        
-    k_dists = dists[k_indices]
-    
-    # Avoid division by zero (if distance is very small, give full weight to that vertex)
+    k = min(k, len(vertices_co))
+    if len(points) == 0:
+        return np.empty((0, k), dtype=np.int64), np.empty((0, k))
+
+    # Squared distances via |v|^2 - 2 p.v (|p|^2 is constant per row, so it doesn't change the ranking)
+    vertex_sq = np.einsum('ij,ij->i', vertices_co, vertices_co)
+    rows = max(1, DISTANCE_CHUNK_ELEMENTS // len(vertices_co))
+    indices = np.empty((len(points), k), dtype=np.int64)
+    for start in range(0, len(points), rows):
+        chunk = points[start:start + rows]
+        dist_sq = vertex_sq - 2.0 * (chunk @ vertices_co.T)
+        indices[start:start + rows] = np.argpartition(dist_sq, k - 1, axis=1)[:, :k]
+
+    # Exact distances for the selected vertices only
+    k_dists = np.linalg.norm(vertices_co[indices] - points[:, np.newaxis, :], axis=2)
+
+    # Inverse Distance Weighting (w = 1/d^2)
     epsilon = 1e-6
-    if np.any(k_dists < epsilon):
-        weights = np.zeros(len(k_dists))
-        weights[np.argmin(k_dists)] = 1.0
-        return k_indices, weights
-        
-    # Inverse Distance Weighting (IDW)
-    # Using squared distance gives sharper falloff (w = 1/d^2)
-    inv_dists = 1.0 / (k_dists ** 2)
-    weights = inv_dists / np.sum(inv_dists)
-    
-    return k_indices, weights
-
-def constraint_bone_to_vertex():
-    # 1. Validation: Check selections
-    selected_objects = bpy.context.selected_objects
-    if len(selected_objects) != 2:
-        print("Error: Please select exactly two objects (One Mesh, One Armature).")
+    inv_dists = 1.0 / np.maximum(k_dists, epsilon) ** 2
+    weights = inv_dists / np.sum(inv_dists, axis=1, keepdims=True)
+
+    # If a point sits on a vertex, give full weight to that vertex
+    snapped = np.flatnonzero(np.any(k_dists < epsilon, axis=1))
+    if len(snapped):
+        weights[snapped] = 0.0
+        weights[snapped, np.argmin(k_dists[snapped], axis=1)] = 1.0
+
+    return indices, weights
+
+def get_barycentric_weights(points, corners):
+    """
+    Barycentric weights of points (m, 3) on triangles (m, 3, 3).
+    Clamped to the triangle and normalized; degenerate triangles fall back to the closest corner.
+    """
+    edge_1 = corners[:, 1] - corners[:, 0]
+    edge_2 = corners[:, 2] - corners[:, 0]
+    offset = points - corners[:, 0]
+
+    d11 = np.einsum('ij,ij->i', edge_1, edge_1)
+    d12 = np.einsum('ij,ij->i', edge_1, edge_2)
+    d22 = np.einsum('ij,ij->i', edge_2, edge_2)
+    d1p = np.einsum('ij,ij->i', edge_1, offset)
+    d2p = np.einsum('ij,ij->i', edge_2, offset)
+
+    denom = d11 * d22 - d12 * d12
+    degenerate = denom <= 1e-12 * np.maximum(d11 * d22, 1e-30)
+    safe_denom = np.where(degenerate, 1.0, denom)
+
+    v = (d22 * d1p - d12 * d2p) / safe_denom
+    w = (d11 * d2p - d12 * d1p) / safe_denom
+    weights = np.clip(np.stack([1.0 - v - w, v, w], axis=1), 0.0, None)
+    weights /= np.maximum(np.sum(weights, axis=1, keepdims=True), 1e-12)
+
+    if np.any(degenerate):
+        rows = np.flatnonzero(degenerate)
+        corner_dists = np.linalg.norm(corners[rows] - points[rows, np.newaxis, :], axis=2)
+        weights[rows] = 0.0
+        weights[rows, np.argmin(corner_dists, axis=1)] = 1.0
+
+    return weights
+
+def get_surface_weights_batch(points, bvh, vertices_co, triangles):
+    """
+    Closest surface point for every point via one shared BVH, as (m, 3) triangle
+    vertex indices and barycentric weights.
+    BVHTree has no batch query, so find_nearest still runs once per point in Python;
+    only the barycentric weights and the nearest-vertex fallback are vectorised.
+    Points the BVH finds no surface for fall back to their 3 nearest vertices.
+    """
+    if len(points) == 0:
+        return np.empty((0, 3), dtype=np.int64), np.empty((0, 3))
+
+    locations = np.empty((len(points), 3))
+    triangle_indices = np.zeros(len(points), dtype=np.int64)
+    missing = []
+    for i, point in enumerate(points):
+        location, normal, index, distance = bvh.find_nearest(point)
+        if index is None:
+            missing.append(i)
+            locations[i] = point
+            continue
+        locations[i] = location
+        triangle_indices[i] = index
+
+    indices = triangles[triangle_indices]
+    weights = get_barycentric_weights(locations, vertices_co[indices])
+    if missing:
+        indices[missing], weights[missing] = get_k_nearest_weights_batch(points[missing], vertices_co, 3)
+    return indices, weights
+
+def get_geodesic_weights_batch(points, vertices_co, adjacency, k=K_NEAREST):
+    """
+    For every point, run a Dijkstra bounded to k settled vertices along the mesh edges from its
+    nearest vertex and weight them by inverse squared geodesic distance.
+    Returns (m, k) vertex indices and weights; islands smaller than k are padded with zero weights.
+    """
+    k = min(k, len(vertices_co))
+    if len(points) == 0:
+        return np.empty((0, k), dtype=np.int64), np.empty((0, k))
+
+    indptr, neighbors, lengths = adjacency
+    seeds = get_k_nearest_weights_batch(points, vertices_co, 1)[0][:, 0]
+    seed_dists = np.linalg.norm(vertices_co[seeds] - points, axis=1)
+
+    indices = np.empty((len(points), k), dtype=np.int64)
+    dists = np.full((len(points), k), np.inf)
+    for row, (seed, seed_dist) in enumerate(zip(seeds.tolist(), seed_dists.tolist())):
+        settled = {}
+        heap = [(seed_dist, seed)]
+        while heap and len(settled) < k:
+            dist, vertex = heapq.heappop(heap)
+            if vertex in settled:
+                continue
+            settled[vertex] = dist
+            for edge in range(indptr[vertex], indptr[vertex + 1]):
+                neighbor = neighbors[edge]
+                if neighbor not in settled:
+                    heapq.heappush(heap, (dist + lengths[edge], neighbor))
+
+        found = len(settled)
+        indices[row, :found] = list(settled.keys())
+        indices[row, found:] = seed
+        dists[row, :found] = list(settled.values())
+
+    # Inverse Distance Weighting on geodesic distances (padding has infinite distance -> weight 0)
+    epsilon = 1e-6
+    inv_dists = 1.0 / np.maximum(dists, epsilon) ** 2
+    weights = inv_dists / np.sum(inv_dists, axis=1, keepdims=True)
+
+    # If a point sits on its seed vertex, give full weight to that vertex
+    snapped = np.flatnonzero(dists[:, 0] < epsilon)
+    if len(snapped):
+        weights[snapped] = 0.0
+        weights[snapped, 0] = 1.0
+
+    return indices, weights
+
+def get_mesh_adjacency(mesh_obj, vertices_co, adjacency_cache):
+    """
+    CSR vertex adjacency (indptr, neighbors, edge lengths) of a mesh from one bulk edge read,
+    built once per mesh and shared by all bones/pairs. Stored as lists for the Dijkstra inner loop.
+    """
+    cached = adjacency_cache.get(mesh_obj.name)
+    if cached is None:
+        edges = mesh_obj.data.edges
+        pairs = np.empty(len(edges) * 2, dtype=np.int32)
+        edges.foreach_get("vertices", pairs)
+        pairs = pairs.reshape(-1, 2).astype(np.int64)
+
+        # Both directions of every edge, sorted by source vertex
+        sources = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        targets = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        order = np.argsort(sources, kind='stable')
+        sources, targets = sources[order], targets[order]
+        lengths = np.linalg.norm(vertices_co[targets] - vertices_co[sources], axis=1)
+        indptr = np.zeros(len(vertices_co) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(vertices_co)), out=indptr[1:])
+
+        cached = adjacency_cache[mesh_obj.name] = (indptr.tolist(), targets.tolist(), lengths.tolist())
+    return cached
+
+def get_mesh_bvh(mesh_obj, vertices_co, bvh_cache):
+    """Triangles and BVH of a mesh in local space, built once per mesh and shared by all bones/pairs."""
+    cached = bvh_cache.get(mesh_obj.name)
+    if cached is None:
+        mesh = mesh_obj.data
+        mesh.calc_loop_triangles()
+        triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", triangles)
+        triangles = triangles.reshape(-1, 3).astype(np.int64)
+        bvh = BVHTree.FromPolygons(vertices_co.tolist(), triangles.tolist(), all_triangles=True) if len(triangles) else None
+        cached = bvh_cache[mesh_obj.name] = (triangles, bvh)
+    return cached
+
+def transform_points(matrix, points):
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+def get_mesh_hash(mesh, vertices):
+    """Hash of vertex positions and face topology (a changed mesh invalidates every cached bone)."""
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    digest = hashlib.sha1(vertices.tobytes())
+    digest.update(loop_vertices.tobytes())
+    return digest.hexdigest()
+
+def read_binding_inputs(armature_obj, mesh_obj, mode=BIND_MODE):
+    """Read everything the binding math needs from bpy in bulk (main thread only)."""
+    pose_bones = armature_obj.pose.bones
+    count = len(pose_bones)
+
+    heads = np.empty(count * 3, dtype=np.float32)
+    tails = np.empty(count * 3, dtype=np.float32)
+    pose_bones.foreach_get("head", heads)
+    pose_bones.foreach_get("tail", tails)
+
+    vertices = np.empty(len(mesh_obj.data.vertices) * 3, dtype=np.float32)
+    mesh_obj.data.vertices.foreach_get("co", vertices)
+
+    mesh_hash = get_mesh_hash(mesh_obj.data, vertices)
+    vertices = vertices.reshape(-1, 3).astype(np.float64)
+
+    return {
+        'mode': mode,
+        'mesh_hash': mesh_hash,
+        'triangles': None,   # Filled in by get_mesh_bvh when a SURFACE bind has bones to compute
+        'bvh': None,
+        'adjacency': None,   # Filled in by get_mesh_adjacency when a GEODESIC bind has bones to compute
+        'dirty': np.ones(count, dtype=bool),   # Bones to (re)bind, see mark_dirty_bones
+        'previous': {},   # Bone name -> vertex indices of the last bind, cleared before rewriting
+        'bone_names': [pose_bone.name for pose_bone in pose_bones],
+        'is_root': np.fromiter((pose_bone.parent is None for pose_bone in pose_bones), dtype=bool, count=count),
+        'heads': heads.reshape(-1, 3).astype(np.float64),
+        'tails': tails.reshape(-1, 3).astype(np.float64),
+        'vertices': vertices,
+        # Armature space -> mesh local space (bone points are compared with v.co)
+        'to_mesh': np.linalg.inv(np.array(mesh_obj.matrix_world)) @ np.array(armature_obj.matrix_world),
+    }
+
+def compute_binding(inputs, k=K_NEAREST):
+    """Vertex weights for the dirty bone tails (IK) and root heads (Copy Location). No bpy access."""
+    vertices = inputs['vertices']
+    dirty = inputs['dirty']
+    tails_local = transform_points(inputs['to_mesh'], inputs['tails'][dirty])
+    heads_local = transform_points(inputs['to_mesh'], inputs['heads'][dirty & inputs['is_root']])
+
+    if inputs['mode'] == 'SURFACE':
+        bvh, triangles = inputs['bvh'], inputs['triangles']
+        return {
+            'tail': get_surface_weights_batch(tails_local, bvh, vertices, triangles),
+            'head': get_surface_weights_batch(heads_local, bvh, vertices, triangles),
+        }
+
+    if inputs['mode'] == 'GEODESIC':
+        return {
+            'tail': get_geodesic_weights_batch(tails_local, vertices, inputs['adjacency'], k),
+            'head': get_geodesic_weights_batch(heads_local, vertices, inputs['adjacency'], k),
+        }
+
+    return {
+        'tail': get_k_nearest_weights_batch(tails_local, vertices, k),
+        'head': get_k_nearest_weights_batch(heads_local, vertices, k),
+    }
+
+def ensure_vertex_group(mesh_obj, name):
+    vertex_group = mesh_obj.vertex_groups.get(name)
+    if vertex_group is None:
+        vertex_group = mesh_obj.vertex_groups.new(name=name)
+    return vertex_group
+
+def set_vertex_group_weights(vertex_group, indices, weights):
+    for idx, weight in zip(indices, weights):
+        vertex_group.add([int(idx)], float(weight), 'REPLACE')
+
+def get_bind_settings(mode, k=K_NEAREST):
+    return f"{mode}:{k}"
+
+def load_bind_cache(armature_obj, mesh_obj):
+    """The cached bind of this armature/mesh pair as NumPy arrays, or None."""
+    caches = armature_obj.get(BIND_CACHE_PROPERTY)
+    entry = caches.get(mesh_obj.name) if caches is not None else None
+    if entry is None:
+        return None
+
+    entry = entry.to_dict()
+    width = entry['width']
+    return {
+        'mesh_hash': entry['mesh_hash'],
+        'settings': entry['settings'],
+        'bone_names': list(entry['bone_names']),
+        'points': np.array(entry['points'], dtype=np.float64).reshape(-1, 6),
+        'is_root': np.array(entry['is_root'], dtype=bool),
+        'tail_indices': np.array(entry['tail_indices'], dtype=np.int64).reshape(-1, width),
+        'tail_weights': np.array(entry['tail_weights'], dtype=np.float64).reshape(-1, width),
+        'head_indices': np.array(entry['head_indices'], dtype=np.int64).reshape(-1, width),
+        'head_weights': np.array(entry['head_weights'], dtype=np.float64).reshape(-1, width),
+    }
+
+def get_local_points(inputs):
+    """Heads and tails of all bones in mesh local space as one (n, 6) array."""
+    return np.hstack([transform_points(inputs['to_mesh'], inputs['heads']),
+                      transform_points(inputs['to_mesh'], inputs['tails'])])
+
+def mark_dirty_bones(armature_obj, mesh_obj, inputs, cache, settings, constraint_mode=CONSTRAINT_MODE):
+    """
+    Compare the current bones and mesh with the cached bind and set inputs['dirty'] / inputs['previous'].
+    A bone is dirty if it is new, moved, changed root state, lost its vertex group or aim constraint,
+    or if the mesh or the bind settings changed (then every bone is dirty).
+    """
+    bone_names = inputs['bone_names']
+    count = len(bone_names)
+    cached_rows = np.full(count, -1, dtype=np.int64)
+    inputs['cached_rows'] = cached_rows
+    if cache is None:
         return
 
-    mesh_obj = None
-    armature_obj = None
+    row_of = {name: row for row, name in enumerate(cache['bone_names'])}
+    cached_rows[:] = np.fromiter((row_of.get(name, -1) for name in bone_names), dtype=np.int64, count=count)
+    known = cached_rows >= 0
+    vertex_count = len(inputs['vertices'])
+
+    if cache['mesh_hash'] == inputs['mesh_hash'] and cache['settings'] == settings:
+        rows = cached_rows[known]
+        moved = np.abs(get_local_points(inputs)[known] - cache['points'][rows]).max(axis=1) > MOVE_TOLERANCE
+        root_changed = cache['is_root'][rows] != inputs['is_root'][known]
+        dirty = np.ones(count, dtype=bool)
+        dirty[known] = moved | root_changed
 
-    for obj in selected_objects:
-        if obj.type == 'MESH':
-            mesh_obj = obj
-        elif obj.type == 'ARMATURE':
-            armature_obj = obj
+        # Bones whose vertex groups or constraints were edited or deleted since the last bind
+        vertex_groups = mesh_obj.vertex_groups
+        pose_bones = armature_obj.pose.bones
+        for bone_index in np.flatnonzero(~dirty):
+            bone_name = bone_names[bone_index]
+            if vertex_groups.get(bone_name) is None or find_aim_constraint(pose_bones[bone_name])[0] != constraint_mode:
+                dirty[bone_index] = True
+            elif inputs['is_root'][bone_index] and vertex_groups.get(f"{bone_name}_root") is None:
+                dirty[bone_index] = True
+        inputs['dirty'] = dirty
 
-    if not mesh_obj or not armature_obj:
-        print("Error: Selection must include one Mesh and one Armature.")
+    # Vertices of the previous bind are removed from the groups before the new weights are written
+    for bone_index in np.flatnonzero(inputs['dirty'] & known):
+        row = cached_rows[bone_index]
+        tail_indices = cache['tail_indices'][row]
+        head_indices = cache['head_indices'][row] if cache['is_root'][row] else None
+        inputs['previous'][bone_names[bone_index]] = (
+            tail_indices[tail_indices < vertex_count],
+            None if head_indices is None else head_indices[head_indices < vertex_count])
+
+def store_bind_cache(armature_obj, mesh_obj, inputs, binding, cache, settings):
+    """Merge the new binding of the dirty bones with the cached bones and store it on the armature."""
+    dirty = inputs['dirty']
+    tail_indices, tail_weights = binding['tail']
+    head_indices, head_weights = binding['head']
+    count, width = len(inputs['bone_names']), tail_indices.shape[1]
+
+    points = get_local_points(inputs)
+    full = {
+        'tail_indices': np.zeros((count, width), dtype=np.int64),
+        'tail_weights': np.zeros((count, width)),
+        'head_indices': np.zeros((count, width), dtype=np.int64),
+        'head_weights': np.zeros((count, width)),
+    }
+
+    # Clean bones keep their cached points, so small moves can't add up across reruns
+    clean = ~dirty
+    if np.any(clean):
+        rows = inputs['cached_rows'][clean]
+        points[clean] = cache['points'][rows]
+        for key, values in full.items():
+            values[clean] = cache[key][rows]
+
+    full['tail_indices'][dirty] = tail_indices
+    full['tail_weights'][dirty] = tail_weights
+    full['head_indices'][dirty & inputs['is_root']] = head_indices
+    full['head_weights'][dirty & inputs['is_root']] = head_weights
+
+    if armature_obj.get(BIND_CACHE_PROPERTY) is None:
+        armature_obj[BIND_CACHE_PROPERTY] = {}
+    armature_obj[BIND_CACHE_PROPERTY][mesh_obj.name] = {
+        'mesh_hash': inputs['mesh_hash'],
+        'settings': settings,
+        'width': width,
+        'bone_names': inputs['bone_names'],
+        'points': points.ravel().tolist(),
+        'is_root': inputs['is_root'].astype(np.int32).tolist(),
+        **{key: values.ravel().tolist() for key, values in full.items()},
+    }
+
+def find_aim_constraint(pose_bone):
+    """The aim constraint this script added to the bone as (mode, constraint), or (None, None)."""
+    for constraint_mode, (constraint_type, name) in AIM_CONSTRAINTS.items():
+        constraint = pose_bone.constraints.get(name)
+        if constraint is not None and constraint.type == constraint_type:
+            return constraint_mode, constraint
+    return None, None
+
+def set_aim_constraint(pose_bone, target, subtarget, constraint_mode=CONSTRAINT_MODE):
+    """Aim the bone tail at the vertex group with the constraint of constraint_mode, replacing the other aim constraints."""
+    constraint_type, name = AIM_CONSTRAINTS[constraint_mode]
+    for other_type, other_name in AIM_CONSTRAINTS.values():
+        existing = pose_bone.constraints.get(other_name)
+        if existing is not None and existing.type == other_type != constraint_type:
+            pose_bone.constraints.remove(existing)
+
+    constraint = pose_bone.constraints.get(name)
+    if not constraint:
+        constraint = pose_bone.constraints.new(type=constraint_type)
+    constraint.target = target
+    constraint.subtarget = subtarget
+
+    if constraint_type == 'IK':
+        constraint.chain_count = 1
+    elif constraint_type == 'DAMPED_TRACK':
+        constraint.track_axis = 'TRACK_Y'
+    else:
+        constraint.volume = 'NO_VOLUME'
+        constraint.rest_length = pose_bone.bone.length
+    return constraint
+
+def switch_aim_constraints(armature_obj, constraint_mode):
+    """
+    Convert the existing aim constraints of an armature to constraint_mode, keeping their targets.
+    Returns {bone name: previous mode} so the switch can be undone with restore_aim_constraints.
+    """
+    previous_modes = {}
+    for pose_bone in armature_obj.pose.bones:
+        previous_mode, constraint = find_aim_constraint(pose_bone)
+        if constraint is None:
+            continue
+        previous_modes[pose_bone.name] = previous_mode
+        if previous_mode != constraint_mode:
+            set_aim_constraint(pose_bone, constraint.target, constraint.subtarget, constraint_mode)
+    return previous_modes
+
+def restore_aim_constraints(armature_obj, previous_modes):
+    pose_bones = armature_obj.pose.bones
+    for bone_name, previous_mode in previous_modes.items():
+        pose_bone = pose_bones.get(bone_name)
+        current_mode, constraint = find_aim_constraint(pose_bone)
+        if constraint is not None and current_mode != previous_mode:
+            set_aim_constraint(pose_bone, constraint.target, constraint.subtarget, previous_mode)
+
+def read_group_weights(mesh_obj, name, indices):
+    """Current weights {vertex index: weight or None} of a vertex group, or None if the group doesn't exist yet."""
+    vertex_group = mesh_obj.vertex_groups.get(name)
+    if vertex_group is None:
+        return None
+    weights = {}
+    for idx in set(indices):
+        try:
+            weights[idx] = vertex_group.weight(idx)
+        except RuntimeError:
+            weights[idx] = None   # Vertex is not in the group
+    return weights
+
+def restore_group_weights(mesh_obj, name, weights):
+    """Put back the weights recorded by read_group_weights (a group that didn't exist is removed)."""
+    vertex_group = mesh_obj.vertex_groups.get(name)
+    if vertex_group is None:
         return
+    if weights is None:
+        mesh_obj.vertex_groups.remove(vertex_group)
+        return
+    vertex_group.remove(list(weights))
+    for idx, weight in weights.items():
+        if weight is not None:
+            vertex_group.add([idx], weight, 'REPLACE')
+
+def snapshot_bone_constraints(pose_bone):
+    """The Copy Location and aim constraint targets of a bone before iter_write_binding changes them."""
+    copy_loc = pose_bone.constraints.get("Copy Location")
+    aim_mode, aim = find_aim_constraint(pose_bone)
+    return {
+        'copy_location': None if copy_loc is None else (copy_loc.target, copy_loc.subtarget),
+        'aim': None if aim is None else (aim_mode, aim.target, aim.subtarget),
+    }
+
+def restore_bone_constraints(pose_bone, snapshot):
+    copy_loc = pose_bone.constraints.get("Copy Location")
+    if snapshot['copy_location'] is None:
+        if copy_loc is not None:
+            pose_bone.constraints.remove(copy_loc)
+    elif copy_loc is not None:
+        copy_loc.target, copy_loc.subtarget = snapshot['copy_location']
+
+    if snapshot['aim'] is None:
+        _, aim = find_aim_constraint(pose_bone)
+        if aim is not None:
+            pose_bone.constraints.remove(aim)
+    else:
+        aim_mode, target, subtarget = snapshot['aim']
+        set_aim_constraint(pose_bone, target, subtarget, aim_mode)
+
+def read_bind_cache_entry(armature_obj, mesh_obj):
+    """A plain copy of the stored bind cache entry of one pair (None if there is none)."""
+    caches = armature_obj.get(BIND_CACHE_PROPERTY)
+    entry = caches.get(mesh_obj.name) if caches is not None else None
+    return None if entry is None else entry.to_dict()
+
+def rollback_binding(journal, cache_journal):
+    """Undo the bones and bind caches written so far, newest first (cancelled or failed job)."""
+    for armature_obj, mesh_obj, previous in reversed(cache_journal):
+        caches = armature_obj.get(BIND_CACHE_PROPERTY)
+        if previous is not None:
+            caches[mesh_obj.name] = previous
+        elif caches is not None and mesh_obj.name in caches:
+            del caches[mesh_obj.name]
+
+    for entry in reversed(journal):
+        mesh_obj = entry['mesh']
+        for name, weights in entry['groups'].items():
+            restore_group_weights(mesh_obj, name, weights)
+        pose_bone = entry['armature'].pose.bones.get(entry['bone_name'])
+        if pose_bone is not None:
+            restore_bone_constraints(pose_bone, entry['constraints'])
+
+def iter_write_binding(armature_obj, mesh_obj, inputs, binding, constraint_mode=CONSTRAINT_MODE, journal=None):
+    """
+    Create the vertex groups and constraints of the dirty bones of one pair, yielding after each bone (main thread).
+    If journal is a list, the previous state of every bone is appended before it is changed (see rollback_binding).
+    """
+    tail_indices, tail_weights = binding['tail']
+    head_indices, head_weights = binding['head']
+    dirty = inputs['dirty']
+    root_row = np.cumsum(inputs['is_root'][dirty]) - 1
+    pose_bones = armature_obj.pose.bones
+
+    for tail_row, bone_index in enumerate(np.flatnonzero(dirty)):
+        bone_name = inputs['bone_names'][bone_index]
+        pose_bone = pose_bones[bone_name]
+        previous_tail, previous_head = inputs['previous'].get(bone_name, (None, None))
+
+        if journal is not None:
+            # Vertices this bone is about to touch: the new bind plus the previous bind that gets removed
+            touched_tail = tail_indices[tail_row].tolist() + (previous_tail.tolist() if previous_tail is not None else [])
+            groups = {bone_name: read_group_weights(mesh_obj, bone_name, touched_tail)}
+            if inputs['is_root'][bone_index]:
+                touched_head = head_indices[root_row[tail_row]].tolist() + (previous_head.tolist() if previous_head is not None else [])
+                groups[f"{bone_name}_root"] = read_group_weights(mesh_obj, f"{bone_name}_root", touched_head)
+            journal.append({'armature': armature_obj, 'mesh': mesh_obj, 'bone_name': bone_name,
+                            'groups': groups, 'constraints': snapshot_bone_constraints(pose_bone)})
 
-    # 2. Data Preparation
-    # Ensure we are in Object Mode
-    bpy.ops.object.mode_set(mode='OBJECT')
-    
-    bone_names = [bone.name for bone in armature_obj.data.bones]
-    vertices = np.array([v.co for v in mesh_obj.data.vertices]) # Optimization: cache coordinates directly
-    
-    # 3. Process Each Bone
-    for bone_name in bone_names:
-        pose_bone = armature_obj.pose.bones[bone_name]
-        data_bone = armature_obj.data.bones[bone_name]
-        
         # --- Common Logic: Tail to Nearest Vertex (for IK) ---
-        bone_tail_world = armature_obj.matrix_world @ pose_bone.tail
-        # For vertex distance calculation, we need vertex coords in World Space or both in Local.
-        # It's usually easier to bring bone coords to Mesh Local Space or Mesh Verts to World.
-        # Let's bring Bone Point to Mesh Local Space for comparison with v.co
-        bone_tail_mesh_local = mesh_obj.matrix_world.inverted() @ bone_tail_world
-        
-        # Find k closest vertices and weights
-        indices, weights = get_k_nearest_weights(bone_tail_mesh_local, vertices, k=5)
-        
-        # Create Vertex Group for IK
-        if bone_name not in mesh_obj.vertex_groups:
-            vg = mesh_obj.vertex_groups.new(name=bone_name)
-        else:
-            vg = mesh_obj.vertex_groups[bone_name]
-            
-        # Add weights to vertex group
-        for idx, weight in zip(indices, weights):
-            vg.add([int(idx)], weight, 'REPLACE')
-        
+        vg = ensure_vertex_group(mesh_obj, bone_name)
+        if previous_tail is not None and len(previous_tail):
+            vg.remove(previous_tail.tolist())
+        set_vertex_group_weights(vg, tail_indices[tail_row], tail_weights[tail_row])
+
         # --- Root Bone Logic: Head to Nearest Vertex (for Copy Location) ---
-        if data_bone.parent is None:
-            # This is a root bone
+        if inputs['is_root'][bone_index]:
             root_vg_name = f"{bone_name}_root"
-            
-            bone_head_world = armature_obj.matrix_world @ pose_bone.head
-            bone_head_mesh_local = mesh_obj.matrix_world.inverted() @ bone_head_world
-            
-            # Find closest vertex index to head (Weighted)
-            indices_head, weights_head = get_k_nearest_weights(bone_head_mesh_local, vertices, k=5)
-            
-            # Create Vertex Group for Root Anchor
-            if root_vg_name not in mesh_obj.vertex_groups:
-                root_vg = mesh_obj.vertex_groups.new(name=root_vg_name)
-            else:
-                root_vg = mesh_obj.vertex_groups[root_vg_name]
-                
-            # Add weights to vertex group
-            for idx, weight in zip(indices_head, weights_head):
-                root_vg.add([int(idx)], weight, 'REPLACE')
-            
+            row = root_row[tail_row]
+            root_vg = ensure_vertex_group(mesh_obj, root_vg_name)
+            if previous_head is not None and len(previous_head):
+                root_vg.remove(previous_head.tolist())
+            set_vertex_group_weights(root_vg, head_indices[row], head_weights[row])
+
             # Add Copy Location Constraint FIRST
-            # Remove existing Copy Location if any (for idempotency)
+            # Reuse existing Copy Location if any (for idempotency)
             copy_loc = pose_bone.constraints.get("Copy Location")
             if not copy_loc:
                 copy_loc = pose_bone.constraints.new(type='COPY_LOCATION')
-            
-            # Move constraint to top of stack if needed, though 'new' usually adds to end.
-            # Ideally Copy Location handles position, IK handles rotation/stretch towards tail.
-            
             copy_loc.target = mesh_obj
             copy_loc.subtarget = root_vg_name
-            # Copy Location usually works best for roots to pin them.
-        
-        # --- Add IK Constraint ---
-        ik_constraint = pose_bone.constraints.get("IK")
-        if not ik_constraint:
-            ik_constraint = pose_bone.constraints.new(type='IK')
-            
-        ik_constraint.target = mesh_obj
-        ik_constraint.subtarget = bone_name
-        ik_constraint.chain_count = 1
-
-    print("Successfully created weighted vertex groups and constraints.")
+
+        # --- Add Aim Constraint (IK, or a cheaper Damped Track / Stretch To) ---
+        set_aim_constraint(pose_bone, mesh_obj, bone_name, constraint_mode)
+
+        yield bone_index
+
+def get_world_centers(objects):
+    """World-space bounding box centers of objects as an (n, 3) array."""
+    centers = []
+    for obj in objects:
+        matrix = np.array(obj.matrix_world)
+        local_center = np.mean(np.array(obj.bound_box), axis=0)
+        centers.append(matrix[:3, :3] @ local_center + matrix[:3, 3])
+    return np.array(centers).reshape(-1, 3)
+
+def pair_armatures_with_meshes(armatures, meshes):
+    """
+    Match every armature to one mesh.
+    A mesh already driven by the armature (Armature modifier or parenting) wins,
+    otherwise the mesh whose bounding box center is nearest to the armature's.
+    """
+    driven_by = {}
+    for mesh_obj in meshes:
+        for modifier in mesh_obj.modifiers:
+            if modifier.type == 'ARMATURE' and modifier.object in armatures:
+                driven_by.setdefault(modifier.object, mesh_obj)
+        if mesh_obj.parent in armatures:
+            driven_by.setdefault(mesh_obj.parent, mesh_obj)
+
+    distances = np.linalg.norm(
+        get_world_centers(armatures)[:, np.newaxis, :] - get_world_centers(meshes)[np.newaxis, :, :], axis=2)
+
+    return [(armature_obj, driven_by.get(armature_obj) or meshes[int(np.argmin(distances[i]))])
+            for i, armature_obj in enumerate(armatures)]
+
+def get_selected_pairs():
+    """One mesh + one armature binds that pair; with more, every armature gets its nearest mesh."""
+    selected_objects = bpy.context.selected_objects
+    meshes = [obj for obj in selected_objects if obj.type == 'MESH' and len(obj.data.vertices)]
+    armatures = [obj for obj in selected_objects if obj.type == 'ARMATURE']
+    if not meshes or not armatures:
+        return []
+    return pair_armatures_with_meshes(armatures, meshes)
+
+@profiled()
+@log.flushing
+def constraint_bone_to_vertex(pairs=None, mode=BIND_MODE, constraint_mode=CONSTRAINT_MODE, use_cache=USE_BIND_CACHE):
+    """Synchronous version (Modal_Job_Runner steps iter_constraint_bone_to_vertex instead)."""
+    return run_steps(iter_constraint_bone_to_vertex(pairs, mode, constraint_mode, use_cache))
+
+def iter_constraint_bone_to_vertex(pairs=None, mode=BIND_MODE, constraint_mode=CONSTRAINT_MODE, use_cache=USE_BIND_CACHE):
+    """
+    Bind bones to the mesh for one or many (armature, mesh) pairs, yielding progress (0.0 - 1.0).
+    pairs: list of (armature_obj, mesh_obj); None uses the selection (see get_selected_pairs).
+    mode: 'VERTEX' (k nearest vertices), 'SURFACE' (closest triangle, barycentric weights)
+          or 'GEODESIC' (k nearest vertices along mesh edges).
+    constraint_mode: 'IK', 'DAMPED_TRACK' or 'STRETCH_TO' (see AIM_CONSTRAINTS).
+    use_cache: only rebind bones that changed since the last bind (see mark_dirty_bones).
+    If the job is cancelled (GeneratorExit) or fails, the bones written so far are rolled back.
+    """
+    # 1. Validation: Check selections
+    if pairs is None:
+        pairs = get_selected_pairs()
+    if not pairs:
+        log.error("Selection must include at least one Mesh (with vertices) and one Armature.")
+        return {'CANCELLED'}
+
+    # 2. Data Preparation (bpy reads stay on the main thread)
+    # Ensure we are in Object Mode
+    if bpy.context.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    bvh_cache = {}
+    adjacency_cache = {}
+    settings = get_bind_settings(mode)
+    inputs = []
+    caches = []
+    for armature_obj, mesh_obj in pairs:
+        pair_inputs = read_binding_inputs(armature_obj, mesh_obj, mode)
+        cache = load_bind_cache(armature_obj, mesh_obj)
+        mark_dirty_bones(armature_obj, mesh_obj, pair_inputs, cache if use_cache else None, settings, constraint_mode)
+        if mode == 'SURFACE' and np.any(pair_inputs['dirty']):
+            pair_inputs['triangles'], pair_inputs['bvh'] = get_mesh_bvh(mesh_obj, pair_inputs['vertices'], bvh_cache)
+            if not len(pair_inputs['triangles']):
+                # A mesh with vertices but no faces has no surface to project onto
+                log.warning("'%s' has no faces, binding '%s' with VERTEX mode instead.", mesh_obj.name, armature_obj.name)
+                pair_inputs['mode'] = 'VERTEX'
+        if mode == 'GEODESIC' and np.any(pair_inputs['dirty']):
+            pair_inputs['adjacency'] = get_mesh_adjacency(mesh_obj, pair_inputs['vertices'], adjacency_cache)
+        inputs.append(pair_inputs)
+        caches.append(cache)
+
+    dirty_bones = sum(int(np.count_nonzero(pair_inputs['dirty'])) for pair_inputs in inputs)
+    all_bones = sum(len(pair_inputs['bone_names']) for pair_inputs in inputs)
+    total_bones = max(dirty_bones, 1)
+
+    # 3. Nearest-vertex math for all pairs in the thread pool (parallel only when every pair is VERTEX)
+    parallel = all(pair_inputs['mode'] == 'VERTEX' for pair_inputs in inputs)
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS if parallel else 1)
+    journal = []
+    cache_journal = []
+    try:
+        futures = [executor.submit(compute_binding, pair_inputs) for pair_inputs in inputs]
+
+        # 4. Write vertex groups and constraints pair by pair, as results arrive
+        done_bones = 0
+        for (armature_obj, mesh_obj), pair_inputs, cache, future in zip(pairs, inputs, caches, futures):
+            while not wait([future], timeout=0.01).done:
+                yield done_bones / total_bones
+            binding = future.result()
+            for _ in iter_write_binding(armature_obj, mesh_obj, pair_inputs, binding, constraint_mode, journal):
+                done_bones += 1
+                yield done_bones / total_bones
+            if np.any(pair_inputs['dirty']):
+                cache_journal.append((armature_obj, mesh_obj, read_bind_cache_entry(armature_obj, mesh_obj)))
+                store_bind_cache(armature_obj, mesh_obj, pair_inputs, binding, cache, settings)
+    except (GeneratorExit, Exception):
+        # Cancelled (or failed) part way: put every bone written so far back the way it was
+        rollback_binding(journal, cache_journal)
+        log.info("Bind stopped: restored %d bone(s) to their previous vertex groups and constraints.", len(journal))
+        log.flush()
+        raise
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    log.info("SUCCESS: Created weighted vertex groups and constraints for %d armature/mesh pair(s) (%d/%d bones rebound).",
+             len(pairs), dirty_bones, all_bones)
+    return {'FINISHED'}
+
+def load_constraint_cost_profiler():
+    try:
+        from . import Constraint_Cost_Profiler
+    except ImportError:
+        import Constraint_Cost_Profiler
+    return Constraint_Cost_Profiler
+
+@profiled()
+@log.flushing
+def compare_constraint_modes(armatures=None, cheap_mode='DAMPED_TRACK', sample_frames=COMPARE_SAMPLE_FRAMES):
+    """
+    Measure playback of the same rig with IK aim constraints and with cheap_mode,
+    then put the original constraints back. Returns {mode: frame time stats}.
+    """
+    if armatures is None:
+        armatures = [obj for obj in bpy.context.selected_objects if obj.type == 'ARMATURE']
+    if not armatures:
+        log.error("Select at least one Armature bound with constraint_bone_to_vertex.")
+        return {}
+
+    profiler = load_constraint_cost_profiler()
+    scene = bpy.context.scene
+    frame_end = min(scene.frame_end, scene.frame_start + max(1, sample_frames) - 1)
+    frames = list(range(scene.frame_start, frame_end + 1))
+    original_frame = scene.frame_current
+
+    previous_modes = {}
+    results = {}
+    try:
+        for constraint_mode in ('IK', cheap_mode):
+            for armature_obj in armatures:
+                modes = switch_aim_constraints(armature_obj, constraint_mode)
+                previous_modes.setdefault(armature_obj, modes)
+            results[constraint_mode] = profiler.summarize_times(run_steps(profiler.iter_measure_frames(scene, frames)))
+    finally:
+        for armature_obj, modes in previous_modes.items():
+            restore_aim_constraints(armature_obj, modes)
+        scene.frame_set(original_frame)
+
+    bone_count = sum(len(modes) for modes in previous_modes.values())
+    log.info("=== Aim constraint playback: %d bones, %d frames ===", bone_count, len(frames))
+    for constraint_mode, stats in results.items():
+        speedup = results['IK']['mean_ms'] / stats['mean_ms'] if stats['mean_ms'] > 0 else float('inf')
+        log.info("  %-12s: %.2f ms/frame -> %.1f fps (x%.2f vs IK)", constraint_mode, stats['mean_ms'], stats['fps'], speedup)
+    return results
 
 # Execute the function
-constraint_bone_to_vertex()
+if __name__ == "__main__":
+    constraint_bone_to_vertex()
@@ -0,0 +1,206 @@
+"""
+Constraint Cost Profiler
+컨스트레인트가 재생 속도에 주는 영향을 실제로 측정하는 스크립트
+
+- 샘플 프레임 구간에서 프레임마다 frame_set()(Depsgraph 평가 포함)에 걸린 시간을 측정합니다.
+- 컨스트레인트를 타입별 / 소유자(오브젝트)별로 Mute 한 뒤 다시 측정해서
+  기준값과의 차이를 그 그룹의 비용으로 보고, 비싼 순서대로 출력합니다.
+- 각 구성(기준, 전체 Mute, 그룹별 Mute)의 예상 fps도 함께 출력합니다.
+- 측정이 끝나면 (취소되어도) Mute 상태와 현재 프레임을 원래대로 되돌립니다.
+"""
+
+import bpy
+import numpy as np
+import time
+
+try:
+    from .Shared_Utils import profiled, run_steps
+except ImportError:
+    from Shared_Utils import profiled, run_steps
+
+SAMPLE_FRAMES = 24      # 측정에 사용할 프레임 수 (씬 시작 프레임부터)
+WARMUP_FRAMES = 2       # 캐시 영향을 줄이기 위해 측정 전에 평가만 하는 프레임 수
+MAX_OWNERS = 30         # 소유자별 측정 최대 개수 (컨스트레인트가 많은 순)
+REPORT_LIMIT = 10       # 출력할 순위 개수
+
+last_report = {}
+
+def collect_constraints(scene):
+    """
+    씬의 Mute 되지 않은 모든 컨스트레인트를 수집하는 함수
+    반환값: [(소유자 오브젝트, 표시 이름, 컨스트레인트), ...]
+    포즈 본 컨스트레인트의 소유자는 아마추어 오브젝트입니다.
+    """
+    constraints = []
+    for obj in scene.objects:
+        for constraint in obj.constraints:
+            if not constraint.mute:
+                constraints.append((obj, obj.name, constraint))
+        if obj.type == 'ARMATURE' and obj.pose:
+            for pose_bone in obj.pose.bones:
+                for constraint in pose_bone.constraints:
+                    if not constraint.mute:
+                        constraints.append((obj, f"{obj.name}:{pose_bone.name}", constraint))
+    return constraints
+
+def group_constraints(constraints):
+    """컨스트레인트를 타입별, 소유자별 그룹으로 나누는 함수"""
+    by_type = {}
+    by_owner = {}
+    for owner, _, constraint in constraints:
+        by_type.setdefault(constraint.type, []).append(constraint)
+        by_owner.setdefault(owner.name, []).append(constraint)
+    return by_type, by_owner
+
+def set_muted(constraints, mute):
+    for constraint in constraints:
+        constraint.mute = mute
+
+def iter_measure_frames(scene, frames):
+    """frames의 각 프레임으로 이동하는 데 걸린 시간(ms)을 측정 (프레임마다 진행률 yield)"""
+    for frame in frames[:WARMUP_FRAMES]:
+        scene.frame_set(frame)
+
+    times = np.empty(len(frames), dtype=np.float64)
+    for i, frame in enumerate(frames):
+        start = time.perf_counter()
+        scene.frame_set(frame)
+        times[i] = (time.perf_counter() - start) * 1000.0
+        yield (i + 1) / len(frames)
+    return times
+
+def summarize_times(times):
+    mean_ms = float(times.mean())
+    return {
+        'mean_ms': mean_ms,
+        'median_ms': float(np.median(times)),
+        'max_ms': float(times.max()),
+        'fps': 1000.0 / mean_ms if mean_ms > 0 else float('inf'),
+    }
+
+@profiled()
+def profile_constraint_cost(scene=None, sample_frames=SAMPLE_FRAMES, group_by='BOTH'):
+    """동기 실행 버전 (Modal_Job_Runner에서는 iter_profile_constraint_cost를 단계별로 실행)"""
+    return run_steps(iter_profile_constraint_cost(scene, sample_frames, group_by))
+
+def iter_profile_constraint_cost(scene=None, sample_frames=SAMPLE_FRAMES, group_by='BOTH'):
+    """
+    단계마다 진행률(0.0 ~ 1.0)을 yield 하는 측정 작업
+    group_by: 'TYPE', 'OWNER', 'BOTH'
+    반환값: {'baseline': 통계, 'all_muted': 통계, 'ranking': [(그룹 종류, 이름, 개수, 비용 ms, 통계), ...]}
+    """
+    scene = scene or bpy.context.scene
+    original_frame = scene.frame_current
+    frame_end = min(scene.frame_end, scene.frame_start + max(1, sample_frames) - 1)
+    frames = list(range(scene.frame_start, frame_end + 1))
+
+    constraints = collect_constraints(scene)
+    by_type, by_owner = group_constraints(constraints)
+
+    # 측정할 구성 목록: (그룹 종류, 이름, Mute 할 컨스트레인트)
+    configurations = [('ALL', "All Constraints", [constraint for _, _, constraint in constraints])]
+    if group_by in {'TYPE', 'BOTH'}:
+        configurations += [('TYPE', name, group) for name, group in by_type.items()]
+    if group_by in {'OWNER', 'BOTH'}:
+        owners = sorted(by_owner.items(), key=lambda item: len(item[1]), reverse=True)[:MAX_OWNERS]
+        configurations += [('OWNER', name, group) for name, group in owners]
+
+    step_count = len(configurations) + 1
+    muted = []
+    try:
+        # 1. 기준 측정 (모든 컨스트레인트 활성)
+        measure = iter_measure_frames(scene, frames)
+        try:
+            while True:
+                yield next(measure) / step_count
+        except StopIteration as result:
+            baseline = summarize_times(result.value)
+
+        # 2. 구성마다 Mute -> 측정 -> 복원
+        results = []
+        for step, (kind, name, group) in enumerate(configurations, start=1):
+            set_muted(group, True)
+            muted = group
+            measure = iter_measure_frames(scene, frames)
+            try:
+                while True:
+                    yield (step + next(measure)) / step_count
+            except StopIteration as result:
+                stats = summarize_times(result.value)
+            set_muted(group, False)
+            muted = []
+            results.append((kind, name, len(group), baseline['mean_ms'] - stats['mean_ms'], stats))
+    finally:
+        set_muted(muted, False)
+        scene.frame_set(original_frame)
+
+    all_muted = results[0][4]
+    ranking = sorted(results[1:], key=lambda row: row[3], reverse=True)
+    report = {'baseline': baseline, 'all_muted': all_muted, 'ranking': ranking, 'frames': len(frames)}
+
+    last_report.clear()
+    last_report.update(report)
+    print_report(report, len(constraints))
+    return report
+
+def print_report(report, constraint_count):
+    baseline = report['baseline']
+    all_muted = report['all_muted']
+    print(f"\n=== Constraint Cost: 컨스트레인트 {constraint_count}개, 프레임 {report['frames']}개 ===")
+    print(f"  기준       : {baseline['mean_ms']:.2f} ms/frame (median {baseline['median_ms']:.2f}, max {baseline['max_ms']:.2f}) -> {baseline['fps']:.1f} fps")
+    print(f"  전체 Mute  : {all_muted['mean_ms']:.2f} ms/frame -> {all_muted['fps']:.1f} fps "
+          f"(컨스트레인트 비용 {baseline['mean_ms'] - all_muted['mean_ms']:.2f} ms)")
+    print(f"  비용 순위 (상위 {REPORT_LIMIT}개, Mute 했을 때 줄어든 시간):")
+    for kind, name, count, cost_ms, stats in report['ranking'][:REPORT_LIMIT]:
+        print(f"    [{kind}] {name} ({count}개): {cost_ms:+.2f} ms -> Mute 시 {stats['fps']:.1f} fps")
+
+
+class MW_OT_ProfileConstraintCost(bpy.types.Operator):
+    """Measure how much each constraint type and owner slows down playback"""
+    bl_idname = "mw.profile_constraint_cost"
+    bl_label = "Profile Constraint Cost"
+    bl_options = {'REGISTER'}
+
+    sample_frames: bpy.props.IntProperty(
+        name="Sample Frames",
+        description="Number of frames to evaluate for each configuration",
+        default=SAMPLE_FRAMES,
+        min=1,
+    )
+    group_by: bpy.props.EnumProperty(
+        name="Group By",
+        items=[
+            ('BOTH', "Type and Owner", "Mute by constraint type, then by owner object"),
+            ('TYPE', "Type", "Mute by constraint type"),
+            ('OWNER', "Owner", "Mute by owner object"),
+        ],
+        default='BOTH',
+    )
+
+    def execute(self, context):
+        report = profile_constraint_cost(context.scene, self.sample_frames, self.group_by)
+        baseline = report['baseline']
+        if report['ranking']:
+            kind, name, _, cost_ms, _ = report['ranking'][0]
+            self.report({'INFO'}, f"{baseline['fps']:.1f} fps, most expensive: {name} ({cost_ms:.2f} ms)")
+        else:
+            self.report({'INFO'}, f"{baseline['fps']:.1f} fps, no constraints found")
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(MW_OT_ProfileConstraintCost)
+
+def unregister():
+    bpy.utils.unregister_class(MW_OT_ProfileConstraintCost)
+
+if __name__ == "__main__":
+    # 기존 등록 해제 (안전성)
+    try:
+        unregister()
+    except:
+        pass
+
+    register()
+
+    bpy.ops.mw.profile_constraint_cost()
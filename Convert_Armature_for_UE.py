@@ -2,7 +2,10 @@
 선택된 아마추어를 언리얼 엔진에 맞게 변환하는 스크립트입니다.
 
 1. 아마추어와 하위 메시를 같은 콜렉션에 복사
-2. Pose 기반으로 Bake Action
+   (PRUNE_WEIGHTS면 복사한 메시의 작은 웨이트를 제거하고 버텍스당 영향 본 수를 MAX_INFLUENCES로 제한)
+2. Pose 기반으로 Bake Action (BAKE_ALL_ACTIONS면 NLA 스트립을 포함한 모든 액션을 각각 베이크)
+   (BAKE_CHUNK_FRAMES 프레임마다 진행률을 yield 하므로 Modal_Job_Runner에서 도중에 취소 가능)
+   (STRIP_NON_DEFORM_BONES면 메시가 사용하지 않는 본을 제거하고 애니메이션을 남은 상위 본 기준으로 다시 기록)
 3. 아마추어 이름을 Root로 변경하고 100배 스케일
 4. Apply Scale 적용
 5. Location 키프레임에 100배 곱하기
@@ -12,38 +15,430 @@
 """
 
 import bpy
-import bmesh
-from mathutils import Vector
+import numpy as np
 
-def get_all_fcurves(action):
+try:
+    from .Shared_Utils import profiled, get_logger, DEBUG, run_steps, get_all_fcurves, scale_keyframe_values
+except ImportError:
+    from Shared_Utils import profiled, get_logger, DEBUG, run_steps, get_all_fcurves, scale_keyframe_values
+
+# 본 로컬 트랜스폼 변환과 키 일괄 기록은 Keyframe_Utils의 함수를 사용
+try:
+    from .Keyframe_Utils import pose_to_basis_matrices, write_pose_action
+except ImportError:
+    from Keyframe_Utils import pose_to_basis_matrices, write_pose_action
+
+log = get_logger("Convert_Armature_for_UE")
+
+# True면 현재 액션만이 아니라 모든 원본 액션(NLA 스트립 포함)을 복사한 아마추어 하나에 각각 베이크합니다.
+BAKE_ALL_ACTIONS = False
+# True면 베이크(BAKE_ALL_ACTIONS와 함께 쓰면 액션마다)를 프레임 구간별 백그라운드 Blender 프로세스로 나눠서 병렬 실행 (Sharded_Bake.py)
+SHARD_BAKE = False
+# True면 복사한 메시의 스킨 웨이트를 정리 (WEIGHT_THRESHOLD 미만 제거, 버텍스당 MAX_INFLUENCES개로 제한, 합 1로 정규화)
+PRUNE_WEIGHTS = False
+WEIGHT_THRESHOLD = 0.01
+MAX_INFLUENCES = 4
+# True면 베이크 후 어떤 메시도 웨이트로 사용하지 않는 본(컨트롤, IK 타겟 등)을 제거 (루트 본은 유지)
+STRIP_NON_DEFORM_BONES = False
+# 베이크할 때 이 프레임 수마다 진행률을 yield (Modal_Job_Runner에서 UI 갱신과 취소가 가능한 단위)
+BAKE_CHUNK_FRAMES = 10
+# 작업이 취소되거나 실패하면 작업 중 새로 생긴 이 종류의 데이터 블록을 삭제 (오브젝트를 먼저 삭제)
+ROLLBACK_COLLECTIONS = ("objects", "meshes", "armatures", "actions")
+
+def load_sharded_bake():
+    try:
+        from . import Sharded_Bake
+    except ImportError:
+        import Sharded_Bake
+    return Sharded_Bake
+
+def scale_location_keyframes(actions, factor):
+    """여러 액션의 Location F-Curve 키프레임을 한 번에 스케일하고, 처리한 곡선 수를 반환하는 함수"""
+    location_curves_updated = 0
+    for action in actions:
+        for fcurve in get_all_fcurves(action):
+            if fcurve.data_path.endswith('location'):
+                scale_keyframe_values(fcurve, factor)
+                location_curves_updated += 1
+    return location_curves_updated
+
+def is_armature_action(action, bone_names):
+    """액션에 아마추어 본을 대상으로 하는 F-Curve가 있는지 확인하는 함수"""
+    for fcurve in get_all_fcurves(action):
+        if fcurve.data_path.startswith('pose.bones["'):
+            bone_name = fcurve.data_path[len('pose.bones["'):].split('"]', 1)[0]
+            if bone_name in bone_names:
+                return True
+    return False
+
+def get_source_actions(armature_obj):
     """
-    Blender 5.0+ 호환성을 위한 F-Curve 가져오기 헬퍼 함수
-    Action.fcurves (Legacy) 또는 Action.slots -> channelbag (New)를 모두 지원
+    베이크할 원본 액션 목록을 반환하는 함수
+    NLA 스트립의 액션과 현재 액션을 사용하고, 둘 다 없으면 이 아마추어의 본을 대상으로 하는 모든 액션을 사용합니다.
     """
-    # 1. Legacy API (Blender 4.x 이하)
-    if hasattr(action, "fcurves"):
-        return action.fcurves
-    
-    # 2. New API (Blender 5.0+ Slotted Actions)
-    fcurves = []
-    if hasattr(action, "slots"):
+    actions = []
+    animation_data = armature_obj.animation_data
+    if animation_data:
+        if animation_data.action:
+            actions.append(animation_data.action)
+        for track in animation_data.nla_tracks:
+            for strip in track.strips:
+                if strip.action and strip.action not in actions:
+                    actions.append(strip.action)
+
+    if not actions:
+        bone_names = {bone.name for bone in armature_obj.data.bones}
+        actions = [action for action in bpy.data.actions if is_armature_action(action, bone_names)]
+    return actions
+
+def assign_action(obj, action):
+    """오브젝트에 액션을 지정하는 함수 (Blender 4.4+ 에서는 슬롯이 비어 있으면 첫 슬롯 지정)"""
+    animation_data = obj.animation_data or obj.animation_data_create()
+    animation_data.action = action
+    if getattr(animation_data, "action_slot", False) is None and action.slots:
+        animation_data.action_slot = action.slots[0]
+
+def get_single_user_action(obj):
+    """
+    오브젝트의 현재 액션을 반환하는 함수 (없으면 None)
+    복사한 오브젝트가 원본과 액션을 공유하면 원본 액션이 바뀌지 않도록 복사본으로 분리합니다.
+    """
+    animation_data = obj.animation_data
+    action = animation_data.action if animation_data else None
+    if action is not None and action.users - int(action.use_fake_user) > 1:
+        action = action.copy()
+        assign_action(obj, action)
+    return action
+
+def snapshot_data_blocks():
+    """취소 시 롤백을 위해 지금 있는 오브젝트, 메시, 아마추어, 액션을 기록하는 함수"""
+    return {name: set(getattr(bpy.data, name)) for name in ROLLBACK_COLLECTIONS}
+
+def remove_new_data_blocks(snapshot):
+    """snapshot 이후 새로 생긴 데이터 블록(복사본, 베이크된 액션, Empty 등)을 삭제하고 개수를 반환하는 함수"""
+    removed = 0
+    for name in ROLLBACK_COLLECTIONS:
+        collection = getattr(bpy.data, name)
+        for id_data in [id_data for id_data in collection if id_data not in snapshot[name]]:
+            collection.remove(id_data)
+            removed += 1
+    return removed
+
+def remove_pose_constraints(armature_obj):
+    """모든 포즈 본의 컨스트레인트 제거 (nla.bake의 clear_constraints와 같은 결과)"""
+    for pose_bone in armature_obj.pose.bones:
+        for constraint in list(pose_bone.constraints):
+            pose_bone.constraints.remove(constraint)
+
+def read_pose_matrices(pose_bones):
+    """포즈 본 행렬(아마추어 공간)을 (본 수, 4, 4) 배열로 읽는 함수"""
+    buffer = np.empty(len(pose_bones) * 16, dtype=np.float32)
+    pose_bones.foreach_get("matrix", buffer)
+    # foreach_get의 행렬은 열 우선(column-major)이므로 전치
+    return buffer.reshape(-1, 4, 4).transpose(0, 2, 1).astype(np.float64)
+
+def iter_sample_pose_matrices(armature_obj, frames):
+    """
+    frames를 한 번 순회하면서 컨스트레인트가 적용된 포즈 본 행렬 (프레임, 본, 4, 4)을 샘플링하는 함수
+    BAKE_CHUNK_FRAMES 프레임마다 진행률을 yield 하고, 끝나면 (취소되어도) 현재 프레임을 되돌립니다.
+    """
+    scene = bpy.context.scene
+    original_frame = scene.frame_current
+    pose_bones = armature_obj.pose.bones
+    matrices = np.empty((len(frames), len(pose_bones), 4, 4))
+    try:
+        for row, frame in enumerate(frames):
+            scene.frame_set(frame)
+            matrices[row] = read_pose_matrices(pose_bones)
+            if (row + 1) % BAKE_CHUNK_FRAMES == 0:
+                yield (row + 1) / len(frames)
+    finally:
+        scene.frame_set(original_frame)
+    return matrices
+
+def iter_bake_pose(armature_obj, frame_start, frame_end, action=None):
+    """
+    Pose 기반 Bake (visual keying)를 프레임 묶음 단위로 실행하면서 진행률을 yield 하는 함수
+    프레임마다 포즈 본 행렬을 샘플링한 뒤 본 로컬 트랜스폼으로 변환해서 액션에 키를 일괄 기록합니다.
+    (Keyframe_Utils의 변환 사용, 회전은 본의 rotation_mode 그대로 기록, 컨스트레인트는 그대로 둠)
+    action이 있으면 nla.bake의 use_current_action처럼 그 액션에, 없으면 새 액션에 기록합니다.
+    반환값: 베이크된 액션 (armature_obj에 지정됨)
+    """
+    frames = list(range(frame_start, frame_end + 1))
+    sample_steps = iter_sample_pose_matrices(armature_obj, frames)
+    try:
+        while True:
+            yield 0.9 * next(sample_steps)
+    except StopIteration as result:
+        matrices = result.value
+
+    basis = pose_to_basis_matrices(armature_obj, matrices)
+    action = write_pose_action(armature_obj, np.array(frames, dtype=np.float32), basis, action=action)
+    yield 1.0
+    return action
+
+def iter_bake_all_actions(armature_obj, source_actions, shard_bake=False):
+    """
+    하나의 아마추어에 원본 액션마다 Pose 기반 Bake를 실행하고 진행률을 yield 하는 함수
+    shard_bake가 True면 액션마다 프레임 범위를 워커 프로세스들로 나눠 베이크합니다. (워커 대기 중에는 None을 yield)
+    컨스트레인트는 모든 베이크가 끝난 뒤에 한 번만 제거합니다.
+    반환값: 베이크된 액션 리스트 (source_actions 순서)
+    """
+    animation_data = armature_obj.animation_data or armature_obj.animation_data_create()
+    # 복사된 NLA 트랙이 베이크 결과에 섞이지 않도록 제거
+    for track in list(animation_data.nla_tracks):
+        animation_data.nla_tracks.remove(track)
+
+    baked_actions = []
+    for index, source_action in enumerate(source_actions):
+        assign_action(armature_obj, source_action)
+        frame_start, frame_end = (int(round(frame)) for frame in source_action.frame_range)
+
+        if shard_bake:
+            bake_steps = load_sharded_bake().iter_bake_sharded(armature_obj, frame_start, frame_end)
+        else:
+            bake_steps = iter_bake_pose(armature_obj, frame_start, frame_end)
         try:
-            from bpy_extras import anim_utils
-            for slot in action.slots:
-                channelbag = anim_utils.action_get_channelbag_for_slot(action, slot)
-                if channelbag:
-                    fcurves.extend(channelbag.fcurves)
-        except ImportError:
-            pass
-            
-    return fcurves
+            while True:
+                progress = next(bake_steps)
+                yield None if progress is None else (index + progress) / len(source_actions)
+        except StopIteration as result:
+            baked_action = result.value
+
+        baked_action.name = f"{source_action.name}_UE"
+        baked_action.use_fake_user = True
+        baked_actions.append(baked_action)
+        log.item("베이크된 액션", "Bake 완료: '%s' → '%s' (프레임 %d-%d)",
+                 source_action.name, baked_action.name, frame_start, frame_end)
+
+    # 모든 베이크가 끝난 뒤 컨스트레인트 제거
+    remove_pose_constraints(armature_obj)
+
+    if baked_actions:
+        assign_action(armature_obj, baked_actions[0])
+    return baked_actions
+
+def read_deform_weights(mesh_obj, deform_group_indices):
+    """
+    디폼 본 버텍스 그룹의 웨이트를 희소(COO) 배열 (버텍스, 그룹, 웨이트)로 읽는 함수
+    버텍스 그룹은 foreach_get으로 한 번에 읽을 수 없어서 버텍스마다 groups를 foreach_get 합니다.
+    """
+    vertex_ids, group_ids, weights = [], [], []
+    for vertex in mesh_obj.data.vertices:
+        groups = vertex.groups
+        count = len(groups)
+        if not count:
+            continue
+        ids = np.empty(count, dtype=np.int32)
+        values = np.empty(count, dtype=np.float32)
+        groups.foreach_get("group", ids)
+        groups.foreach_get("weight", values)
+        vertex_ids.append(np.full(count, vertex.index, dtype=np.int32))
+        group_ids.append(ids)
+        weights.append(values)
+
+    if not vertex_ids:
+        empty = np.empty(0, dtype=np.int32)
+        return empty, empty, np.empty(0, dtype=np.float32)
+
+    vertex_ids, group_ids, weights = np.concatenate(vertex_ids), np.concatenate(group_ids), np.concatenate(weights)
+    deform = np.isin(group_ids, deform_group_indices)
+    return vertex_ids[deform], group_ids[deform], weights[deform]
+
+def compute_pruned_weights(vertex_ids, group_ids, weights, threshold=WEIGHT_THRESHOLD, max_influences=MAX_INFLUENCES):
+    """
+    작은 웨이트 제거 + 버텍스당 영향 수 제한 + 정규화를 배열 연산으로 한 번에 계산하는 함수
+    버텍스마다 가장 큰 웨이트 하나는 threshold보다 작아도 남깁니다.
+    반환값: (남길 항목 마스크, 정규화된 웨이트)
+    """
+    # 버텍스별로 웨이트가 큰 순서로 정렬한 뒤, 버텍스 안에서의 순위 계산
+    order = np.lexsort((-weights, vertex_ids))
+    sorted_vertices = vertex_ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_vertices[1:] != sorted_vertices[:-1]])
+    ranks = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+
+    keep = np.zeros(len(weights), dtype=bool)
+    keep[order] = (ranks < max_influences) & ((weights[order] >= threshold) | (ranks == 0))
+
+    totals = np.bincount(vertex_ids[keep], weights=weights[keep], minlength=int(vertex_ids.max(initial=-1)) + 1)
+    new_weights = np.where(keep, weights / np.maximum(totals[vertex_ids], 1e-12), 0.0)
+    return keep, new_weights
+
+def write_pruned_weights(mesh_obj, vertex_ids, group_ids, weights, keep, new_weights):
+    """제거할 웨이트는 그룹별로 한 번에 remove, 남은 웨이트는 바뀐 버텍스만 foreach_set으로 기록"""
+    vertex_groups = mesh_obj.vertex_groups
+    removed = ~keep
+    for group_index in np.unique(group_ids[removed]):
+        vertex_groups[int(group_index)].remove(vertex_ids[removed & (group_ids == group_index)].tolist())
+
+    changed = np.zeros(int(vertex_ids.max()) + 1, dtype=bool)
+    changed[vertex_ids[removed | (np.abs(new_weights - weights) > 1e-6)]] = True
+    rewrite = keep & changed[vertex_ids]
+    kept_vertices, kept_groups, kept_weights = vertex_ids[rewrite], group_ids[rewrite], new_weights[rewrite].astype(np.float32)
+    order = np.lexsort((kept_groups, kept_vertices))
+    kept_vertices, kept_groups, kept_weights = kept_vertices[order], kept_groups[order], kept_weights[order]
+    starts = np.searchsorted(kept_vertices, np.unique(kept_vertices))
+    ends = np.r_[starts[1:], len(kept_vertices)]
+
+    vertices = mesh_obj.data.vertices
+    for start, end in zip(starts, ends):
+        groups = vertices[int(kept_vertices[start])].groups
+        ids = np.empty(len(groups), dtype=np.int32)
+        values = np.empty(len(groups), dtype=np.float32)
+        groups.foreach_get("group", ids)
+        groups.foreach_get("weight", values)
+        # 디폼 그룹이 아닌 웨이트는 그대로 두고 남은 디폼 웨이트만 교체
+        positions = np.searchsorted(kept_groups[start:end], ids)
+        matched = positions < end - start
+        matched[matched] = kept_groups[start:end][positions[matched]] == ids[matched]
+        values[matched] = kept_weights[start:end][positions[matched]]
+        groups.foreach_set("weight", values)
+
+def prune_mesh_weights(mesh_obj, deform_bone_names, threshold=WEIGHT_THRESHOLD, max_influences=MAX_INFLUENCES):
+    """메시 하나의 스킨 웨이트를 정리하고 통계를 반환하는 함수"""
+    # 복사한 메시가 원본과 데이터를 공유하면 원본 웨이트가 바뀌지 않도록 분리
+    if mesh_obj.data.users > 1:
+        mesh_obj.data = mesh_obj.data.copy()
+
+    deform_group_indices = [vg.index for vg in mesh_obj.vertex_groups if vg.name in deform_bone_names]
+    vertex_ids, group_ids, weights = read_deform_weights(mesh_obj, deform_group_indices)
+    if not len(weights):
+        return {'influences': 0, 'removed': 0, 'max_before': 0, 'max_after': 0}
+
+    keep, new_weights = compute_pruned_weights(vertex_ids, group_ids, weights, threshold, max_influences)
+    write_pruned_weights(mesh_obj, vertex_ids, group_ids, weights, keep, new_weights)
+    return {
+        'influences': len(weights),
+        'removed': int(np.count_nonzero(~keep)),
+        'max_before': int(np.bincount(vertex_ids).max()),
+        'max_after': int(np.bincount(vertex_ids[keep]).max()),
+    }
+
+def get_weighted_bone_names(mesh_objects, deform_bone_names):
+    """메시들의 버텍스 그룹에 0보다 큰 웨이트가 하나라도 있는 디폼 본 이름 집합"""
+    used = set()
+    for mesh_obj in mesh_objects:
+        deform_groups = {vg.index: vg.name for vg in mesh_obj.vertex_groups if vg.name in deform_bone_names}
+        vertex_ids, group_ids, weights = read_deform_weights(mesh_obj, list(deform_groups))
+        used.update(deform_groups[int(group_index)] for group_index in np.unique(group_ids[weights > 0]))
+    return used
+
+def get_bones_to_strip(armature_obj, used_bone_names):
+    """사용되지 않는 본 이름 목록 (언리얼 스켈레톤의 루트가 하나로 유지되도록 루트 본은 제외)"""
+    return [bone.name for bone in armature_obj.data.bones
+            if bone.parent is not None and bone.name not in used_bone_names]
+
+def iter_strip_bones(armature_obj, actions, strip_names, mesh_objects):
+    """
+    본을 제거하고 남은 본의 애니메이션을 새 계층 기준으로 다시 기록하면서 진행률을 yield 하는 함수
+    1. 액션마다 프레임을 한 번 순회하면서 모든 포즈 본의 아마추어 공간 행렬을 샘플링
+    2. 제거할 본의 자식은 가장 가까운 남는 상위 본으로 부모를 옮긴 뒤 본 제거
+    3. 샘플링한 행렬을 새 계층의 로컬 트랜스폼으로 변환해서 액션을 다시 기록 (Keyframe_Utils의 변환 사용)
+    반환값: 다시 기록한 액션 리스트 (actions 순서)
+    """
+    sampled_names = [pose_bone.name for pose_bone in armature_obj.pose.bones]
+
+    # 1. 제거 전의 포즈를 액션마다 샘플링
+    samples = []
+    for index, action in enumerate(actions):
+        assign_action(armature_obj, action)
+        frame_start, frame_end = (int(round(frame)) for frame in action.frame_range)
+        frames = list(range(frame_start, frame_end + 1))
+        sample_steps = iter_sample_pose_matrices(armature_obj, frames)
+        try:
+            while True:
+                yield 0.8 * (index + next(sample_steps)) / len(actions)
+        except StopIteration as result:
+            samples.append((frames, result.value))
+
+    # 2. 본 제거 (자식은 가장 가까운 남는 상위 본으로 이동)
+    strip = set(strip_names)
+    bpy.context.view_layer.objects.active = armature_obj
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = armature_obj.data.edit_bones
+    for edit_bone in edit_bones:
+        if edit_bone.name in strip:
+            continue
+        parent = edit_bone.parent
+        while parent is not None and parent.name in strip:
+            parent = parent.parent
+        if parent is not edit_bone.parent:
+            edit_bone.use_connect = False
+            edit_bone.parent = parent
+    for name in strip_names:
+        edit_bones.remove(edit_bones[name])
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    # 제거한 본의 빈 버텍스 그룹도 정리
+    for mesh_obj in mesh_objects:
+        for vertex_group in list(mesh_obj.vertex_groups):
+            if vertex_group.name in strip:
+                mesh_obj.vertex_groups.remove(vertex_group)
+
+    # 3. 남은 본의 포즈 행렬을 새 계층 기준의 로컬 트랜스폼으로 다시 기록
+    column_of = {name: i for i, name in enumerate(sampled_names)}
+    kept_columns = [column_of[pose_bone.name] for pose_bone in armature_obj.pose.bones]
+    rewritten = []
+    for action, (frames, matrices) in zip(actions, samples):
+        basis = pose_to_basis_matrices(armature_obj, matrices[:, kept_columns])
+        name, use_fake_user = action.name, action.use_fake_user
+        new_action = write_pose_action(armature_obj, frames, basis)
+        bpy.data.actions.remove(action)
+        new_action.name = name
+        new_action.use_fake_user = use_fake_user
+        rewritten.append(new_action)
+        log.item("본 제거 후 다시 기록", "액션 '%s' 다시 기록 (프레임 %d-%d)", name, frames[0], frames[-1])
+
+    if rewritten:
+        assign_action(armature_obj, rewritten[0])
+    yield 1.0
+    return rewritten
 
-def convert_armature_for_unreal():
+@profiled()
+@log.flushing
+def convert_armature_for_unreal(bake_all_actions=BAKE_ALL_ACTIONS, shard_bake=SHARD_BAKE, prune_weights=PRUNE_WEIGHTS,
+                                strip_bones=STRIP_NON_DEFORM_BONES):
+    """동기 실행 버전 (Modal_Job_Runner에서는 iter_convert_armature_for_unreal을 단계별로 실행)"""
+    return run_steps(iter_convert_armature_for_unreal(bake_all_actions, shard_bake, prune_weights, strip_bones))
+
+def iter_convert_armature_for_unreal(bake_all_actions=BAKE_ALL_ACTIONS, shard_bake=SHARD_BAKE, prune_weights=PRUNE_WEIGHTS,
+                                     strip_bones=STRIP_NON_DEFORM_BONES):
+    """
+    단계마다 진행률(0.0 ~ 1.0)을 yield 하는 변환 작업 (인자는 iter_convert_armature_steps와 같음)
+    도중에 취소되거나(GeneratorExit) 오류가 나면 작업 중 만든 복사본, 베이크된 액션, Empty를 삭제하고
+    선택 상태를 되돌립니다. (원본 아마추어와 메시는 바꾸지 않음)
+    """
+    view_layer = bpy.context.view_layer
+    selected_objects = set(bpy.context.selected_objects)
+    active_object = view_layer.objects.active
+    snapshot = snapshot_data_blocks()
+    try:
+        return (yield from iter_convert_armature_steps(bake_all_actions, shard_bake, prune_weights, strip_bones))
+    except (GeneratorExit, Exception):
+        if bpy.context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+        removed = remove_new_data_blocks(snapshot)
+        for obj in view_layer.objects:
+            obj.select_set(obj in selected_objects)
+        view_layer.objects.active = active_object
+        log.info("작업이 중단되어 새로 만든 데이터 블록 %d개를 삭제했습니다.", removed)
+        log.flush()
+        raise
+
+def iter_convert_armature_steps(bake_all_actions=BAKE_ALL_ACTIONS, shard_bake=SHARD_BAKE, prune_weights=PRUNE_WEIGHTS,
+                                strip_bones=STRIP_NON_DEFORM_BONES):
+    """
+    단계마다 진행률(0.0 ~ 1.0)을 yield 하는 변환 작업 본체 (롤백은 iter_convert_armature_for_unreal에서 처리)
+    bake_all_actions가 True면 복사한 아마추어 하나에 모든 원본 액션(NLA 스트립 포함)을 각각 베이크합니다.
+    shard_bake가 True면 베이크(bake_all_actions와 함께 쓰면 액션마다)를 여러 워커 프로세스로 나눠 실행합니다.
+    prune_weights가 True면 복사한 메시의 스킨 웨이트를 정리합니다.
+    strip_bones가 True면 베이크 후 메시가 사용하지 않는 본을 제거합니다.
+    """
     # 현재 선택된 오브젝트들 확인
     selected_objects = list(bpy.context.selected_objects)
     
     if not selected_objects:
-        print("선택된 오브젝트가 없습니다.")
+        log.warning("선택된 오브젝트가 없습니다.")
         return {'CANCELLED'}
     
     # 선택된 오브젝트들 중에서 아마추어 찾기
@@ -56,17 +451,17 @@ def convert_armature_for_unreal():
     
     # 아마추어가 없으면 취소
     if not armatures_found:
-        print("선택된 오브젝트들 중 아마추어가 없습니다.")
+        log.warning("선택된 오브젝트들 중 아마추어가 없습니다.")
         return {'CANCELLED'}
     
     # 아마추어가 여러 개면 첫 번째 것 사용
     if len(armatures_found) > 1:
-        print(f"여러 개의 아마추어가 선택되었습니다. 첫 번째 아마추어 '{armatures_found[0].name}'를 사용합니다.")
+        log.warning("여러 개의 아마추어가 선택되었습니다. 첫 번째 아마추어 '%s'를 사용합니다.", armatures_found[0].name)
         for i, arm in enumerate(armatures_found):
-            print(f"  {i+1}. {arm.name}")
+            log.item("선택된 아마추어", "  %d. %s", i + 1, arm.name)
     
     armature_obj = armatures_found[0]
-    print(f"변환할 아마추어: {armature_obj.name}")
+    log.info("변환할 아마추어: %s", armature_obj.name)
     
     # 1. 아마추어와 하위 메시들을 같은 콜렉션에 복사
     original_collection = None
@@ -83,21 +478,24 @@ def convert_armature_for_unreal():
     
     # 아마추어와 연결된 모든 메시 찾기 (부모 관계, 아마추어 모디파이어, 버텍스 그룹 등)
     connected_meshes = []
+    view_layer_objects = list(bpy.context.view_layer.objects)
     
-    for obj in bpy.context.view_layer.objects:
+    for index, obj in enumerate(view_layer_objects):
+        if index % 200 == 0:
+            yield 0.1 * index / len(view_layer_objects)
         if obj.type == 'MESH':
             is_connected = False
             
             # 1. 직접 부모 관계 확인
             if obj.parent == armature_obj:
                 is_connected = True
-                print(f"부모 관계로 연결된 메시: {obj.name}")
+                log.item("연결된 메시", "부모 관계로 연결된 메시: %s", obj.name, message_level=DEBUG)
             
             # 2. 아마추어 모디파이어 확인
             for modifier in obj.modifiers:
                 if modifier.type == 'ARMATURE' and modifier.object == armature_obj:
                     is_connected = True
-                    print(f"아마추어 모디파이어로 연결된 메시: {obj.name}")
+                    log.item("연결된 메시", "아마추어 모디파이어로 연결된 메시: %s", obj.name, message_level=DEBUG)
                     break
             
             # 3. 버텍스 그룹이 아마추어의 본 이름과 일치하는지 확인
@@ -106,15 +504,17 @@ def convert_armature_for_unreal():
                 mesh_vertex_groups = set(vg.name for vg in obj.vertex_groups)
                 if armature_bone_names.intersection(mesh_vertex_groups):
                     is_connected = True
-                    print(f"버텍스 그룹으로 연결된 메시: {obj.name}")
+                    log.item("연결된 메시", "버텍스 그룹으로 연결된 메시: %s", obj.name, message_level=DEBUG)
             
             if is_connected:
                 connected_meshes.append(obj)
     
     objects_to_copy.extend(connected_meshes)
     
-    print(f"복사할 오브젝트들: {[obj.name for obj in objects_to_copy]}")
+    log.info("복사할 오브젝트: %d개 (아마추어 1개 + 메시 %d개)", len(objects_to_copy), len(connected_meshes))
     
+    yield 0.1
+
     # 오브젝트들 복사
     copied_objects = []
     bpy.ops.object.select_all(action='DESELECT')
@@ -135,44 +535,89 @@ def convert_armature_for_unreal():
             break
     
     if not copied_armature:
-        print("아마추어 복사에 실패했습니다.")
+        log.error("아마추어 복사에 실패했습니다.")
         return {'CANCELLED'}
     
-    print(f"복사된 아마추어: {copied_armature.name}")
+    log.info("복사된 아마추어: %s", copied_armature.name)
 
-    
-    # 2. Pose 기반 Bake Action으로 컨스트레인트 제거
+    # 1-1. 복사한 메시의 스킨 웨이트 정리 (디폼 본 그룹만 대상)
+    if prune_weights:
+        deform_bone_names = {bone.name for bone in copied_armature.data.bones if bone.use_deform}
+        for obj in copied_objects:
+            if obj.type != 'MESH':
+                continue
+            stats = prune_mesh_weights(obj, deform_bone_names)
+            log.item("웨이트 정리", "웨이트 정리 '%s': 영향 %d개 중 %d개 제거, 버텍스당 최대 %d → %d",
+                     obj.name, stats['influences'], stats['removed'], stats['max_before'], stats['max_after'])
+    yield 0.2
+    
+    # 2. Pose 기반 Bake Action으로 컨스트레인트 제거 (프레임마다 포즈를 샘플링해서 키를 일괄 기록)
     bpy.context.view_layer.objects.active = copied_armature
-    bpy.ops.object.mode_set(mode='POSE')
-    
-    # 모든 pose bone 선택
-    bpy.ops.pose.select_all(action='SELECT')
-    
-    # 씬의 프레임 범위를 기준으로 베이크 진행
-    scene = bpy.context.scene
-    frame_start = scene.frame_start
-    frame_end = scene.frame_end
-    
-    # 무조건 베이크 진행 - 씬의 프레임 범위 사용
-    bpy.ops.nla.bake(
-        frame_start=frame_start,
-        frame_end=frame_end,
-        only_selected=False,
-        visual_keying=True,
-        clear_constraints=True,
-        clear_parents=False,
-        use_current_action=True,
-        bake_types={'POSE'}
-    )
-    print(f"Pose 기반 Bake Action 완료 (프레임 {frame_start}-{frame_end})")
     
-    bpy.ops.object.mode_set(mode='OBJECT')
+    if bake_all_actions:
+        # 복사한 아마추어 하나에 원본 액션마다 베이크 (복사와 연결 검사는 한 번만)
+        source_actions = get_source_actions(armature_obj)
+        if not source_actions:
+            log.warning("베이크할 액션이 없습니다.")
+            return {'CANCELLED'}
+
+        bake_steps = iter_bake_all_actions(copied_armature, source_actions, shard_bake)
+        try:
+            while True:
+                progress = next(bake_steps)
+                yield None if progress is None else 0.2 + 0.6 * progress   # None: 워커 대기 중
+        except StopIteration as result:
+            baked_actions = result.value
+        log.info("%s 완료 (액션 %d개)", "Sharded Bake" if shard_bake else "Pose 기반 Bake Action", len(baked_actions))
+    elif shard_bake:
+        # 씬의 프레임 범위를 워커 프로세스들로 나눠 베이크한 뒤 컨스트레인트 제거
+        scene = bpy.context.scene
+        bake_steps = load_sharded_bake().iter_bake_sharded(copied_armature, scene.frame_start, scene.frame_end,
+                                                           action=get_single_user_action(copied_armature))
+        try:
+            while True:
+                progress = next(bake_steps)
+                yield None if progress is None else 0.2 + 0.6 * progress   # None: 워커 대기 중
+        except StopIteration as result:
+            baked_actions = [result.value]
+        remove_pose_constraints(copied_armature)
+        log.info("Sharded Bake 완료 (프레임 %d-%d)", scene.frame_start, scene.frame_end)
+    else:
+        # 씬의 프레임 범위를 기준으로 베이크 진행 (BAKE_CHUNK_FRAMES 프레임마다 yield)
+        scene = bpy.context.scene
+        frame_start = scene.frame_start
+        frame_end = scene.frame_end
+
+        # nla.bake(use_current_action=True)와 같이 복사한 아마추어의 현재 액션에 기록
+        bake_steps = iter_bake_pose(copied_armature, frame_start, frame_end, get_single_user_action(copied_armature))
+        try:
+            while True:
+                yield 0.2 + 0.6 * next(bake_steps)
+        except StopIteration as result:
+            baked_actions = [result.value]
+        remove_pose_constraints(copied_armature)
+        log.info("Pose 기반 Bake Action 완료 (프레임 %d-%d)", frame_start, frame_end)
+    yield 0.8
+
+    # 2-1. 메시가 사용하지 않는 본 제거 (애니메이션은 남은 상위 본 기준으로 다시 기록)
+    if strip_bones:
+        copied_meshes = [obj for obj in copied_objects if obj.type == 'MESH']
+        deform_bone_names = {bone.name for bone in copied_armature.data.bones if bone.use_deform}
+        strip_names = get_bones_to_strip(copied_armature, get_weighted_bone_names(copied_meshes, deform_bone_names))
+        if strip_names:
+            strip_steps = iter_strip_bones(copied_armature, baked_actions, strip_names, copied_meshes)
+            try:
+                while True:
+                    yield 0.8 + 0.05 * next(strip_steps)
+            except StopIteration as result:
+                baked_actions = result.value
+        log.info("사용하지 않는 본 %d개 제거 (남은 본 %d개)", len(strip_names), len(copied_armature.data.bones))
     
     # 3. 아마추어 이름을 Root로 변  경하고 100배 스케일
     copied_armature.name = "Armature"
     copied_armature.scale = (100, 100, 100)
     
-    print("아마추어 이름을 Root로 변경하고 100배 스케일 적용")
+    log.debug("아마추어 이름을 Root로 변경하고 100배 스케일 적용")
 
     # 4. Apply Scale 적용
     # 모든 복사된 오브젝트 선택
@@ -184,22 +629,13 @@ def convert_armature_for_unreal():
 
     # Apply Scale
     bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-    print("Apply Scale 적용 완료")
+    log.debug("Apply Scale 적용 완료")
+    yield 0.9
     
-    # 5. Location 키프레임에 100배 곱하기
-    if copied_armature.animation_data and copied_armature.animation_data.action:
-        action = copied_armature.animation_data.action
-        location_curves_updated = 0
-        
-        for fcurve in get_all_fcurves(action):
-            if fcurve.data_path.endswith('location'):
-                for keyframe in fcurve.keyframe_points:
-                    keyframe.co.y *= 100
-                    keyframe.handle_left.y *= 100
-                    keyframe.handle_right.y *= 100
-                location_curves_updated += 1
-        
-        print(f"Location 키프레임 {location_curves_updated}개 곡선에 100배 적용")
+    # 5. Location 키프레임에 100배 곱하기 (베이크된 모든 액션에 일괄 적용)
+    if baked_actions:
+        location_curves_updated = scale_location_keyframes(baked_actions, 100)
+        log.info("Location 키프레임 %d개 곡선에 100배 적용 (액션 %d개)", location_curves_updated, len(baked_actions))
     
     # 6. 새로운 Empty 생성 및 페어런트 (Unit Scale 변경 대신)
     empty = bpy.data.objects.new(f"Empty_UE_Armature", None)
@@ -218,7 +654,7 @@ def convert_armature_for_unreal():
         if obj.type == 'MESH' and obj.parent != copied_armature:
             obj.parent = empty
     
-    print("Empty 생성 및 페어런트 완료 (시각적 크기 복원)")
+    log.debug("Empty 생성 및 페어런트 완료 (시각적 크기 복원)")
 
     # 최종 선택 상태 설정 - 스켈레탈 메시와 하위 메시들을 모두 선택
     bpy.ops.object.select_all(action='DESELECT')
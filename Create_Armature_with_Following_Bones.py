@@ -1,11 +1,72 @@
 import bpy
-import bmesh
-from mathutils import Vector
+import numpy as np
 
-def create_armature_with_following_bones():
+try:
+    from .Shared_Utils import profiled
+except ImportError:
+    from Shared_Utils import profiled
+
+try:
+    from .Following_Bones import build_following_bones, BONE_LENGTH
+except ImportError:
+    from Following_Bones import build_following_bones, BONE_LENGTH
+
+# 월드 행렬 읽기와 키 일괄 기록은 Keyframe_Utils의 함수를 사용
+try:
+    from .Keyframe_Utils import read_world_matrices, write_pose_action
+except ImportError:
+    from Keyframe_Utils import read_world_matrices, write_pose_action
+
+# True면 Copy Transforms 대신 씬 프레임 범위를 샘플링해서 새 액션에 키로 굽습니다.
+# (콘스트레인트가 없으므로 본이 수천 개여도 재생 속도가 떨어지지 않음)
+BAKE_TO_ACTION = False
+
+def sample_world_matrices(objects, frame_start, frame_end):
+    """
+    프레임 범위 전체에서 오브젝트들의 matrix_world를 한 번에 샘플링하는 함수
+    프레임마다 read_world_matrices로 읽으며, 결과는 (프레임 수, n, 4, 4) 행 우선 배열입니다.
+    """
+    scene = bpy.context.scene
+    frames = np.arange(frame_start, frame_end + 1)
+    samples = np.empty((len(frames), len(objects), 4, 4), dtype=np.float64)
+
+    original_frame = scene.frame_current
+    for i, frame in enumerate(frames):
+        scene.frame_set(int(frame))
+        samples[i] = read_world_matrices(objects)
+    scene.frame_set(original_frame)
+
+    return frames, samples
+
+def bake_following_bones_to_action(armature_obj, bone_names, target_objects, frame_start, frame_end):
+    """
+    콘스트레인트 없이 타겟들의 움직임을 본 키프레임으로 굽는 함수
+    - 프레임 범위 전체의 타겟 matrix_world를 한 번에 샘플링
+    - NumPy로 본 로컬 트랜스폼(matrix_basis)으로 변환
+    - Keyframe_Utils.write_pose_action으로 새 액션에 키를 일괄 기록
+    """
+    frames, samples = sample_world_matrices(target_objects, frame_start, frame_end)
+
+    # 본의 레스트 행렬 (아마추어 공간)
+    bones = armature_obj.data.bones
+    rest = np.empty(len(bones) * 16, dtype=np.float32)
+    bones.foreach_get("matrix_local", rest)
+    bone_index = {bone.name: i for i, bone in enumerate(bones)}
+    rows = [bone_index[name] for name in bone_names]
+    rest = rest.reshape(-1, 4, 4)[rows].transpose(0, 2, 1).astype(np.float64)
+
+    # 월드 -> 아마추어 공간 -> 본 로컬: basis = rest^-1 @ A^-1 @ T
+    armature_inverse = np.linalg.inv(np.array(armature_obj.matrix_world, dtype=np.float64))
+    basis = np.linalg.inv(rest)[np.newaxis] @ (armature_inverse @ samples)
+
+    return write_pose_action(armature_obj, frames, basis, bone_names)
+
+@profiled()
+def create_armature_with_following_bones(bake=BAKE_TO_ACTION):
     """
     선택된 오브젝트들을 기반으로 새로운 아마추어를 생성하고
     각 오브젝트를 따라가는 본들을 생성한 후 Copy Transforms 콘스트레인트를 추가하는 함수
+    bake=True면 콘스트레인트 대신 씬 프레임 범위의 움직임을 새 액션에 키로 굽습니다.
     """
     
     # 선택된 오브젝트 가져오기
@@ -27,66 +88,33 @@ def create_armature_with_following_bones():
     
     print(f"{len(target_objects)}개의 타겟 오브젝트를 찾았습니다: {[obj.name for obj in target_objects]}")
     
-    # 새로운 아마추어 생성
-    bpy.ops.object.armature_add(enter_editmode=False, align='WORLD', location=(0, 0, 0))
-    armature_obj = bpy.context.active_object
-    
+    # 새로운 아마추어 생성 (데이터 API, 원점에 생성)
     # 아마추어 이름 설정 (첫 번째 타겟 오브젝트 이름 기반)
     if len(target_objects) == 1:
-        armature_obj.name = f"{target_objects[0].name}_Armature"
+        armature_name = f"{target_objects[0].name}_Armature"
     else:
-        armature_obj.name = f"Following_Armature"
-    
+        armature_name = f"Following_Armature"
+
+    armature_obj = bpy.data.objects.new(armature_name, bpy.data.armatures.new(armature_name))
+    bpy.context.collection.objects.link(armature_obj)
+
     print(f"새로운 아마추어 '{armature_obj.name}'이 생성되었습니다.")
-    
-    # 기본 본 삭제 (자동 생성된 "Bone" 삭제)
-    bpy.ops.object.mode_set(mode='EDIT')
-    armature_data = armature_obj.data
-    
-    # 기존 본들 삭제
-    for bone in list(armature_data.edit_bones):
-        armature_data.edit_bones.remove(bone)
-    
-    # 각 타겟 오브젝트별로 새로운 본 생성
-    created_bones = []
-    
-    for target_obj in target_objects:
-        # 새로운 본 생성
-        new_bone = armature_data.edit_bones.new(target_obj.name)
-        
-        # 타겟 오브젝트의 위치를 기준으로 본 위치 설정
-        target_location = target_obj.location
-        new_bone.head = target_location
-        new_bone.tail = target_location + Vector((0, 0, 1))  # Z축으로 1유닛 연장
-        
-        created_bones.append(target_obj.name)
-        print(f"본 '{target_obj.name}'이 생성되었습니다.")
-    
-    # Pose 모드로 전환
-    bpy.ops.object.mode_set(mode='POSE')
-    
-    # 각 새로 생성된 본에 Copy Transforms 콘스트레인트 추가
-    for i, target_obj in enumerate(target_objects):
-        bone_name = created_bones[i]
-        pose_bone = armature_obj.pose.bones[bone_name]
-        
-        # Copy Transforms 콘스트레인트 추가
-        constraint = pose_bone.constraints.new(type='COPY_TRANSFORMS')
-        constraint.name = "Copy Transforms"
-        constraint.target = target_obj
-        
-        print(f"Copy Transforms 콘스트레인트가 본 '{bone_name}'에 타겟 '{target_obj.name}'으로 설정되었습니다.")
-    
-    # Object 모드로 되돌아가기
-    bpy.ops.object.mode_set(mode='OBJECT')
-    
-    # 생성된 아마추어와 모든 타겟 오브젝트들을 선택
-    bpy.ops.object.select_all(action='DESELECT')
+
+    # 생성된 아마추어만 선택하고 액티브로 설정 (Edit 모드 진입 대상)
+    for obj in selected_objects:
+        obj.select_set(False)
     armature_obj.select_set(True)
-    
-    # 아마추어를 액티브로 설정
     bpy.context.view_layer.objects.active = armature_obj
-    
+
+    # 타겟 오브젝트의 월드 트랜스폼을 기준으로 본 생성 + Copy Transforms 추가
+    bone_names = build_following_bones(armature_obj, target_objects, add_constraints=not bake, bone_length=BONE_LENGTH)
+
+    if bake:
+        scene = bpy.context.scene
+        action = bake_following_bones_to_action(armature_obj, bone_names, target_objects,
+                                                scene.frame_start, scene.frame_end)
+        print(f"콘스트레인트 없이 프레임 {scene.frame_start}-{scene.frame_end}을 액션 '{action.name}'에 베이크했습니다.")
+
     print(f"총 {len(target_objects)}개의 본이 새로운 아마추어 '{armature_obj.name}'에 생성되었습니다.")
     print("생성된 아마추어와 모든 타겟 오브젝트들이 선택되었습니다.")
     
@@ -1,4 +1,17 @@
 import bpy
+import numpy as np
+
+try:
+    from .Shared_Utils import profiled, get_logger, WARNING, run_steps
+except ImportError:
+    from Shared_Utils import profiled, get_logger, WARNING, run_steps
+
+try:
+    from .Keyframe_Utils import read_object_arrays
+except ImportError:
+    from Keyframe_Utils import read_object_arrays
+
+log = get_logger("Create_Controller_to_Selected_Object")
 
 # 오브젝트 타입별 기본 컨트롤러 크기 설정
 CONTROLLER_SIZE_MAP = {
@@ -14,148 +27,281 @@ CONTROLLER_SIZE_MAP = {
     'DEFAULT': 0.5     # 기타 타입의 기본값
 }
 
-def get_controller_size(obj_type, dimensions):
-    """오브젝트 타입과 크기에 따른 컨트롤러 크기 계산"""
-    max_dimension = max(dimensions.x, dimensions.y, dimensions.z)
-    
-    if max_dimension > 0:
-        # dimensions가 있는 경우 실제 크기 사용
-        return max_dimension * 0.5
+CONTROLLER_SUFFIX = "_CTRL"
+CONTROLLER_CHUNK_SIZE = 250  # Modal_Job_Runner로 실행할 때 한 단계에서 처리하는 오브젝트 수
+
+def get_collection_bounds(collection, cache, visiting=None):
+    """
+    콜렉션 인스턴스의 원본 콜렉션 전체 바운딩 박스 (min, max)를 계산하는 함수
+    같은 콜렉션을 쓰는 인스턴스가 수백 개여도 콜렉션당 한 번만 계산하도록 cache에 저장합니다.
+    중첩된 콜렉션 인스턴스도 재귀적으로 포함합니다. 바운드가 없으면 None을 반환합니다.
+    """
+    if collection in cache:
+        return cache[collection]
+
+    visiting = visiting or set()
+    if collection in visiting:
+        return None  # 순환 참조 방지
+    visiting.add(collection)
+
+    members = collection.all_objects
+    count = len(members)
+    points = []
+
+    if count:
+        # 모든 멤버의 로컬 바운드 박스와 월드 행렬을 한 번에 읽기
+        corners = np.empty(count * 24, dtype=np.float32)
+        members.foreach_get("bound_box", corners)
+        corners = corners.reshape(count, 8, 3)
+        # foreach_get의 행렬은 열 우선(column-major)이므로 (n, 4, 4)는 전치 행렬입니다.
+        matrices = np.empty(count * 16, dtype=np.float32)
+        members.foreach_get("matrix_world", matrices)
+        matrices = matrices.reshape(count, 4, 4)
+
+        # 중첩된 콜렉션 인스턴스는 원본 콜렉션 바운드로 교체
+        for i, member in enumerate(members):
+            if member.instance_type == 'COLLECTION' and member.instance_collection:
+                bounds = get_collection_bounds(member.instance_collection, cache, visiting)
+                if bounds is not None:
+                    low, high = bounds
+                    corners[i] = [(x, y, z) for x in (low[0], high[0]) for y in (low[1], high[1]) for z in (low[2], high[2])]
+
+        # 크기가 없는 멤버(라이트, 일반 Empty 등)는 제외
+        has_extent = np.any(corners.max(axis=1) - corners.min(axis=1) > 0, axis=1)
+        if np.any(has_extent):
+            corners = corners[has_extent]
+            matrices = matrices[has_extent]
+            # 행 벡터 p @ M^T = (M p)^T
+            world = corners @ matrices[:, :3, :3] + matrices[:, np.newaxis, 3, :3]
+            points = world.reshape(-1, 3)
+
+    visiting.discard(collection)
+
+    if len(points):
+        bounds = (points.min(axis=0), points.max(axis=0))
     else:
-        # dimensions가 0인 경우 타입별 기본 크기 사용
-        default_size = CONTROLLER_SIZE_MAP.get(obj_type, CONTROLLER_SIZE_MAP['DEFAULT'])
-        return default_size * 0.5
+        bounds = None
+    cache[collection] = bounds
+    return bounds
 
-def create_controller_for_object(target_obj):
-    """단일 오브젝트에 대해 컨트롤러를 생성하는 함수"""
-    
-    # 현재 선택 상태 저장
-    original_selection = list(bpy.context.selected_objects)
-    original_active = bpy.context.view_layer.objects.active
-    
-    # 모든 오브젝트 선택 해제
-    bpy.ops.object.select_all(action='DESELECT')
-    
-    # 2. 새로운 Empty 오브젝트를 'Cube' 모양으로 생성합니다.
-    bpy.ops.object.empty_add(type='CUBE', location=(0, 0, 0))
-    
-    # 3. 새로 생성된 Empty 오브젝트를 참조합니다. (Child Of Constraint의 타겟)
-    new_empty = bpy.context.view_layer.objects.active
-    new_empty.name = target_obj.name + "_CTRL"
-    
-    # 3-1. Empty의 viewport display 설정: In Front 활성화
-    new_empty.show_in_front = True
-    
-    # 3-2. 바운딩 박스 크기 계산 및 Empty 크기 설정
-    dimensions = target_obj.dimensions
-    radius_size = get_controller_size(target_obj.type, dimensions)
-    
-    # 최소값 보장 (0.05)
-    new_empty.empty_display_size = max(radius_size, 0.05)
-    
-    print(f"DEBUG: '{target_obj.name}' ({target_obj.type}) 크기 - X:{dimensions.x:.3f}, Y:{dimensions.y:.3f}, Z:{dimensions.z:.3f}")
-    print(f"DEBUG: Empty '{new_empty.name}' 크기를 {radius_size:.3f}로 설정")
-    
-    # 4. 트랜스폼(위치, 회전, 스케일)을 복사하고 부모 관계를 상속합니다.
-    # Empty가 원본 오브젝트와 완벽하게 겹치게 됩니다.
-    new_empty.matrix_world = target_obj.matrix_world
-    new_empty.parent = target_obj.parent
-    
-    # 부모가 있는 경우, Parent Inverse를 설정하여 트랜스폼 일관성을 유지합니다.ㅌ
-    if target_obj.parent:
-        new_empty.matrix_parent_inverse = target_obj.parent.matrix_world.inverted()
-        
-    # --- 콜렉션 처리 (오버라이드된 콜렉션 예외 처리 추가) ---
-    target_collections = target_obj.users_collection
-    current_collections = list(new_empty.users_collection)
-
-    # 안전하게 콜렉션에 링크 시도
-    for col in target_collections:
-        if new_empty.name not in col.objects:
+def get_controller_sizes(target_objects, collection_bounds_cache=None):
+    """
+    오브젝트 타입과 크기에 따른 컨트롤러 크기를 한 번에 계산하는 함수
+    - bound_box를 일괄로 읽어 dimensions(바운드 크기 x 스케일)와 같은 값을 계산
+    - 콜렉션 인스턴스 Empty는 원본 콜렉션의 바운드를 사용 (콜렉션당 한 번 계산)
+    - 크기가 0인 경우 타입별 기본 크기 사용
+    """
+    count = len(target_objects)
+    if not count:
+        return np.zeros(0, dtype=np.float32)
+
+    if collection_bounds_cache is None:
+        collection_bounds_cache = {}
+
+    corners = read_object_arrays(target_objects, "bound_box", (8, 3))
+    scales = read_object_arrays(target_objects, "scale", (3,))
+    extents = corners.max(axis=1) - corners.min(axis=1)
+
+    for i, obj in enumerate(target_objects):
+        if obj.type == 'EMPTY' and obj.instance_type == 'COLLECTION' and obj.instance_collection:
+            bounds = get_collection_bounds(obj.instance_collection, collection_bounds_cache)
+            if bounds is not None:
+                extents[i] = bounds[1] - bounds[0]
+
+    max_dimensions = (extents * np.abs(scales)).max(axis=1)
+    default_sizes = np.fromiter(
+        (CONTROLLER_SIZE_MAP.get(obj.type, CONTROLLER_SIZE_MAP['DEFAULT']) for obj in target_objects),
+        dtype=np.float32, count=count)
+
+    # dimensions가 있는 경우 실제 크기, 0인 경우 타입별 기본 크기 사용
+    return np.where(max_dimensions > 0, max_dimensions, default_sizes) * 0.5
+
+def get_linkable_collections(target_obj):
+    """Empty를 링크할 수 있는 대상 콜렉션 목록 (링크/오버라이드된 콜렉션 제외)"""
+    collections = []
+    for col in target_obj.users_collection:
+        if col.library or col.override_library:
+            log.item("제한된 콜렉션", "콜렉션 '%s'은(는) 링크되었거나 오버라이드된 상태입니다. 건너뜁니다.", col.name)
+            continue
+        collections.append(col)
+    return collections
+
+def create_controllers_for_objects(target_objects, collection_bounds_cache=None):
+    """
+    여러 오브젝트에 대해 컨트롤러를 한 번에 생성하는 함수 (bpy.ops 미사용)
+
+    - Empty는 bpy.data.objects.new로 생성
+    - Child Of의 Set Inverse는 타겟 월드 행렬의 역행렬로 직접 계산
+    - 콜렉션 링크는 콜렉션별로 모아서 처리
+    생성된 Empty 리스트를 target_objects 순서대로 반환합니다.
+    """
+    created_empties = []
+    # 콜렉션 -> 링크할 Empty 목록 (콜렉션 멤버십 검사 없이 일괄 링크)
+    links_by_collection = {}
+    scene_collection = bpy.context.scene.collection
+
+    # 컨트롤러 크기를 한 번에 계산 (콜렉션 인스턴스 바운드는 콜렉션별로 캐시)
+    radius_sizes = get_controller_sizes(target_objects, collection_bounds_cache)
+
+    for target_obj, radius_size in zip(target_objects, radius_sizes):
+        # 1. 데이터 API로 'Cube' 모양 Empty 생성
+        new_empty = bpy.data.objects.new(target_obj.name + CONTROLLER_SUFFIX, None)
+        new_empty.empty_display_type = 'CUBE'
+        new_empty.show_in_front = True
+
+        # 2. Empty 크기 설정 (최소값 0.05 보장)
+        new_empty.empty_display_size = max(float(radius_size), 0.05)
+
+        # 3. 트랜스폼(위치, 회전, 스케일)을 복사하고 부모 관계를 상속합니다.
+        # Empty가 원본 오브젝트와 완벽하게 겹치게 됩니다.
+        target_matrix = target_obj.matrix_world.copy()
+        new_empty.matrix_world = target_matrix
+        new_empty.parent = target_obj.parent
+
+        # 부모가 있는 경우, Parent Inverse를 설정하여 트랜스폼 일관성을 유지합니다.
+        if target_obj.parent:
+            new_empty.matrix_parent_inverse = target_obj.parent.matrix_world.inverted_safe()
+
+        # 4. 콜렉션 수집 (제한된 콜렉션만 있으면 Scene 콜렉션 사용)
+        collections = get_linkable_collections(target_obj)
+        if not collections:
+            log.item("Scene 콜렉션에 추가", "대상 콜렉션들이 모두 제한되어 있어 Empty '%s'을(를) Scene 콜렉션에 추가합니다.", new_empty.name)
+            collections = [scene_collection]
+        for col in collections:
+            links_by_collection.setdefault(col, []).append(new_empty)
+
+        # 5. Child Of 제약 조건 추가 후 Set Inverse를 직접 계산
+        # Empty가 타겟의 월드 트랜스폼과 같으므로 역행렬은 타겟 월드 행렬의 역행렬입니다.
+        # 이 과정이 없다면, 오브젝트가 Empty의 로컬 트랜스폼을 따라가기 위해 갑자기 엉뚱한 위치로 이동합니다.
+        constraint = target_obj.constraints.new(type='CHILD_OF')
+        constraint.target = new_empty
+        constraint.inverse_matrix = target_matrix.inverted_safe()
+
+        created_empties.append(new_empty)
+
+    # 6. 콜렉션별로 모아서 링크
+    for col, empties in links_by_collection.items():
+        for new_empty in empties:
             try:
-                # 콜렉션이 오버라이드되었거나 링크된 경우 예외 처리
-                if col.library or col.override_library:
-                    print(f"WARNING: 콜렉션 '{col.name}'은(는) 링크되었거나 오버라이드된 상태입니다. 건너뜁니다.")
-                    continue
                 col.objects.link(new_empty)
-                print(f"INFO: Empty '{new_empty.name}'을(를) 콜렉션 '{col.name}'에 추가했습니다.")
             except RuntimeError as e:
-                print(f"WARNING: 콜렉션 '{col.name}'에 Empty를 링크하는데 실패했습니다: {e}")
-                continue
-
-    # 불필요한 콜렉션에서 언링크 시도
-    for col in current_collections:
-        if col not in target_collections:
-            if new_empty.name in col.objects:
-                try:
-                    if col.library or col.override_library:
-                        print(f"WARNING: 콜렉션 '{col.name}'은(는) 링크되었거나 오버라이드된 상태입니다. 언링크를 건너뜁니다.")
-                        continue
-                    col.objects.unlink(new_empty)
-                    print(f"INFO: Empty '{new_empty.name}'을(를) 콜렉션 '{col.name}'에서 제거했습니다.")
-                except RuntimeError as e:
-                    print(f"WARNING: 콜렉션 '{col.name}'에서 Empty를 언링크하는데 실패했습니다: {e}")
-                    continue
-    
-    # 만약 모든 대상 콜렉션이 오버라이드되어 있다면, Scene 콜렉션에 추가
-    if new_empty.name not in [obj.name for col in target_collections for obj in col.objects]:
-        try:
-            scene_collection = bpy.context.scene.collection
-            if new_empty.name not in scene_collection.objects:
+                log.item("링크 실패", "콜렉션 '%s'에 Empty '%s'를 링크하는데 실패했습니다: %s", col.name, new_empty.name, e, message_level=WARNING)
+
+    # 어떤 콜렉션에도 링크되지 못한 Empty는 Scene 콜렉션에 추가
+    for new_empty in created_empties:
+        if not new_empty.users_collection:
+            try:
                 scene_collection.objects.link(new_empty)
-                print(f"INFO: 대상 콜렉션들이 모두 제한되어 있어 Empty '{new_empty.name}'을(를) Scene 콜렉션에 추가했습니다.")
-        except RuntimeError as e:
-            print(f"ERROR: Scene 콜렉션에도 Empty를 추가할 수 없습니다: {e}")
-    
-    # --- 추가된 부분: Child Of Constraint 설정 ---
-    
-    # 9. 원본 오브젝트를 선택하고 활성화합니다. (제약 조건 추가를 위해)
-    new_empty.select_set(False)
-    target_obj.select_set(True)
-    bpy.context.view_layer.objects.active = target_obj
-    
-    # 10. target_obj에 'Child Of' 제약 조건을 추가합니다.
-    constraint = target_obj.constraints.new(type='CHILD_OF')
-    
-    # 11. 타겟을 새로 생성된 Empty로 지정합니다.
-    constraint.target = new_empty
-    
-    # 12. 현재 월드 트랜스폼을 유지하도록 'Set Inverse'를 실행합니다.
-    # 이 과정이 없다면, 오브젝트가 Empty의 로컬 트랜스폼을 따라가기 위해 갑자기 엉뚱한 위치로 이동합니다.
-    bpy.ops.constraint.childof_set_inverse(constraint=constraint.name, owner='OBJECT')
-    
-    print(f"INFO: '{new_empty.name}' Empty가 생성되었고, '{target_obj.name}' 오브젝트에 Child Of 제약 조건이 설정되었습니다.")
-    
+            except RuntimeError as e:
+                log.error("Scene 콜렉션에도 Empty '%s'를 추가할 수 없습니다: %s", new_empty.name, e)
+
+    return created_empties
+
+@profiled()
+@log.flushing
+def create_controller_for_object(target_obj):
+    """단일 오브젝트에 대해 컨트롤러를 생성하는 함수"""
+    new_empty = create_controllers_for_objects([target_obj])[0]
+    log.info("'%s' Empty가 생성되었고, '%s' 오브젝트에 Child Of 제약 조건이 설정되었습니다.", new_empty.name, target_obj.name)
     return new_empty
 
+def remove_controllers(target_objects, created_empties):
+    """생성한 컨트롤러와 Child Of 제약 조건을 제거하는 함수 (작업 취소 시 롤백)"""
+    created = set(created_empties)
+    for target_obj in target_objects:
+        for constraint in list(target_obj.constraints):
+            if constraint.type == 'CHILD_OF' and constraint.target in created:
+                target_obj.constraints.remove(constraint)
+    for new_empty in created_empties:
+        bpy.data.objects.remove(new_empty)
 
-# 메인 실행 부분
-selected_objects = list(bpy.context.selected_objects)
+@profiled()
+@log.flushing
+def create_controllers_for_selected_objects(context):
+    """선택된 오브젝트 전체에 대해 컨트롤러를 생성하고, 생성된 컨트롤러들을 선택하는 함수"""
+    return run_steps(iter_create_controllers_for_selected_objects(context))
 
-if not selected_objects:
-    print("WARNING: 선택된 오브젝트가 없습니다. 스크립트를 실행할 수 없습니다.")
-else:
-    print(f"INFO: {len(selected_objects)}개의 선택된 오브젝트에 대해 컨트롤러를 생성합니다.")
-    
-    created_empties = []
-    
-    # 각 선택된 오브젝트에 대해 컨트롤러 생성
+def iter_create_controllers_for_selected_objects(context=None, chunk_size=CONTROLLER_CHUNK_SIZE):
+    """
+    컨트롤러를 chunk_size개씩 나눠 생성하면서 진행률(0.0 ~ 1.0)을 yield 하는 작업
+    도중에 취소되면(GeneratorExit) 지금까지 만든 컨트롤러와 제약 조건을 제거합니다.
+    """
+    context = context or bpy.context
+    selected_objects = list(context.selected_objects)
+
+    if not selected_objects:
+        log.warning("선택된 오브젝트가 없습니다. 스크립트를 실행할 수 없습니다.")
+        return []
+
+    # 이미 컨트롤러인 오브젝트만 제외 (이름이 "_CTRL"로 끝나는 경우)
+    target_objects = []
     for obj in selected_objects:
-        # 이미 컨트롤러인 오브젝트만 제외 (이름이 "_CTRL"로 끝나는 경우)
-        if obj.name.endswith("_CTRL"):
-            print(f"SKIP: '{obj.name}'은(는) 이미 컨트롤러이므로 건너뜁니다.")
+        if obj.name.endswith(CONTROLLER_SUFFIX):
+            log.item("이미 컨트롤러", "SKIP: '%s'은(는) 이미 컨트롤러이므로 건너뜁니다.", obj.name)
         else:
-            empty = create_controller_for_object(obj)
-            created_empties.append(empty)
-            print(f"INFO: '{obj.name}' ({obj.type})에 대한 컨트롤러를 생성했습니다.")
-    
+            target_objects.append(obj)
+
+    log.info("%d개의 선택된 오브젝트에 대해 컨트롤러를 생성합니다.", len(target_objects))
+    created_empties = []
+    collection_bounds_cache = {}
+    try:
+        for start in range(0, len(target_objects), chunk_size):
+            chunk = target_objects[start:start + chunk_size]
+            created_empties.extend(create_controllers_for_objects(chunk, collection_bounds_cache))
+            yield len(created_empties) / len(target_objects)
+    except GeneratorExit:
+        remove_controllers(target_objects, created_empties)
+        log.info("작업이 취소되어 생성된 컨트롤러 %d개를 제거했습니다.", len(created_empties))
+        log.flush()
+        raise
+
     # 생성된 모든 Empty 오브젝트들을 선택
-    bpy.ops.object.select_all(action='DESELECT')
+    view_layer = context.view_layer
+    for obj in selected_objects:
+        obj.select_set(False)
     for empty in created_empties:
-        empty.select_set(True)
-    
+        if view_layer.objects.get(empty.name) is not None:
+            empty.select_set(True)
+
     # 마지막으로 생성된 Empty를 활성화
     if created_empties:
-        bpy.context.view_layer.objects.active = created_empties[-1]
-        print(f"SUCCESS: 총 {len(created_empties)}개의 컨트롤러가 생성되었습니다.")
-        print(f"INFO: 생성된 컨트롤러들이 모두 선택되었습니다.")
\ No newline at end of file
+        view_layer.objects.active = created_empties[-1]
+        log.info("SUCCESS: 총 %d개의 컨트롤러가 생성되었고, 모두 선택되었습니다.", len(created_empties))
+
+    return created_empties
+
+
+class MW_OT_CreateControllers(bpy.types.Operator):
+    """Create Child Of controllers for all selected objects in one undo step"""
+    bl_idname = "mw.create_controllers"
+    bl_label = "Create Controllers to Selected Objects"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        created_empties = create_controllers_for_selected_objects(context)
+        if not created_empties:
+            self.report({'WARNING'}, "No controllers created")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Created {len(created_empties)} controllers")
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(MW_OT_CreateControllers)
+
+def unregister():
+    bpy.utils.unregister_class(MW_OT_CreateControllers)
+
+
+# 메인 실행 부분
+if __name__ == "__main__":
+    # 기존 등록 해제 (안전성)
+    try:
+        unregister()
+    except:
+        pass
+
+    register()
+
+    # 오퍼레이터로 실행하여 전체 배치를 하나의 Undo 단계로 기록
+    bpy.ops.mw.create_controllers()
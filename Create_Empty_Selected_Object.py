@@ -1,53 +1,265 @@
 import bpy
+import numpy as np
+from mathutils import Matrix
 
-# 1. 활성화된(Active) 오브젝트를 가져옵니다.
-active_obj = bpy.context.view_layer.objects.active
+try:
+    from .Shared_Utils import profiled
+except ImportError:
+    from Shared_Utils import profiled
+
+# 요소(버텍스/면/포즈 본) 단위 Empty 설정
+ELEMENT_EMPTY_DISPLAY_TYPE = 'ARROWS'   # 방향을 확인할 수 있도록 화살표 모양
+ELEMENT_EMPTY_DISPLAY_SIZE = 0.1
+
+def link_to_collections(new_objects, source_obj):
+    """새 오브젝트들을 원본 오브젝트가 속한 모든 콜렉션에 링크하는 함수"""
+    target_collections = list(source_obj.users_collection) or [bpy.context.scene.collection]
+    for col in target_collections:
+        for new_obj in new_objects:
+            col.objects.link(new_obj)
+
+def create_empty_at_active_object():
+    """활성화된(Active) 오브젝트 위치에 Empty 하나를 생성하는 함수"""
+
+    # 1. 활성화된(Active) 오브젝트를 가져옵니다.
+    active_obj = bpy.context.view_layer.objects.active
+
+    if active_obj is None:
+        print("WARNING: 활성화된 오브젝트가 없습니다. 스크립트를 실행할 수 없습니다.")
+        return None
 
-if active_obj is None:
-    print("WARNING: 활성화된 오브젝트가 없습니다. 스크립트를 실행할 수 없습니다.")
-else:
     # 2. 새로운 Empty 오브젝트를 'Cube' 모양으로 생성합니다.
-    # 오브젝트 생성 (처음에는 활성화된 뷰 레이어의 콜렉션에 생성됨)
-    bpy.ops.object.empty_add(type='CUBE', location=(0, 0, 0))
-    
-    # 3. 새로 생성된 Empty 오브젝트를 참조합니다.
-    new_empty = bpy.context.view_layer.objects.active
-    new_empty.name = active_obj.name + "_Empty" # 이름 설정
-    
-    # 4. 트랜스폼(위치, 회전, 스케일)을 복사하고 부모 관계를 상속합니다.
+    new_empty = bpy.data.objects.new(active_obj.name + "_Empty", None) # 이름 설정
+    new_empty.empty_display_type = 'CUBE'
+
+    # 3. 트랜스폼(위치, 회전, 스케일)을 복사하고 부모 관계를 상속합니다.
     new_empty.matrix_world = active_obj.matrix_world
     new_empty.parent = active_obj.parent
-    
+
     # 부모가 있는 경우, 로컬 트랜스폼 일관성을 위해 Parent Inverse를 설정합니다.
     if active_obj.parent:
         new_empty.matrix_parent_inverse = active_obj.parent.matrix_world.inverted()
-        
-    # --- 콜렉션 처리 ---
-    
-    # 5. 선택된 오브젝트가 현재 속해있는 모든 콜렉션을 가져옵니다.
-    target_collections = active_obj.users_collection
-    
-    # 6. 새로 생성된 Empty가 현재 속한 콜렉션을 먼저 저장합니다.
-    current_collections = list(new_empty.users_collection)
-
-    # 7. Empty를 원본 오브젝트의 모든 콜렉션에 추가합니다.
-    for col in target_collections:
-        if new_empty.name not in col.objects: 
-            col.objects.link(new_empty)
-
-    # 8. Empty를 원래 생성되었던 불필요한 콜렉션에서 제거합니다.
-    for col in current_collections:
-        if col not in target_collections:
-            if new_empty.name in col.objects:
-                col.objects.unlink(new_empty)
-    
-    # --- 수정된 부분: 새로 생성된 Empty를 선택하도록 처리 ---
-    
-    # 9. 기존에 선택되었던 오브젝트의 선택을 해제합니다.
+
+    # 4. Empty를 원본 오브젝트의 모든 콜렉션에 추가합니다.
+    link_to_collections([new_empty], active_obj)
+
+    # 5. 기존에 선택되었던 오브젝트의 선택을 해제하고 새로 생성된 Empty를 선택 및 활성화합니다.
     active_obj.select_set(False)
-    
-    # 10. 새로 생성된 Empty를 선택하고 활성화합니다. (이미 3번에서 활성화되어 있으나, 확실히 처리)
     new_empty.select_set(True)
     bpy.context.view_layer.objects.active = new_empty
-    
-    print(f"INFO: '{new_empty.name}' 오브젝트가 생성되었고, 현재 선택 및 활성화되었습니다.")
\ No newline at end of file
+
+    print(f"INFO: '{new_empty.name}' 오브젝트가 생성되었고, 현재 선택 및 활성화되었습니다.")
+    return new_empty
+
+def normalize_rows(vectors):
+    """(n, 3) 벡터들을 정규화 (길이가 0인 벡터는 그대로 유지)"""
+    lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(lengths > 1e-12, lengths, 1.0)
+
+def frames_from_normals(object_matrix, positions, normals, tangents=None):
+    """
+    로컬 좌표의 위치/노멀(/탄젠트)로부터 월드 행렬 (n, 4, 4)을 계산하는 함수
+    Z축 = 노멀, X축 = 탄젠트 (없으면 월드 축 기준으로 생성)
+    """
+    matrix = np.array(object_matrix, dtype=np.float64)
+    linear = matrix[:3, :3]
+
+    # 위치는 M @ p, 노멀은 역전치 행렬로 변환 (비균등 스케일 대응)
+    world_positions = positions @ linear.T + matrix[:3, 3]
+    u, singular_values, vt = np.linalg.svd(linear)
+    if singular_values[-1] > 1e-9 * singular_values[0]:
+        z_axes = normalize_rows(normals @ np.linalg.inv(linear))
+    else:
+        # 스케일 축이 0이면 역행렬이 없고 메시가 평면으로 눌려 있으므로,
+        # 모든 노멀은 눌린 평면의 법선 방향 (눌린 로컬 축 성분의 부호로 앞/뒤 구분)
+        signs = np.where(normals @ vt[-1] < 0, -1.0, 1.0)
+        z_axes = signs[:, np.newaxis] * u[:, -1]
+
+    if tangents is None:
+        # 노멀이 월드 Z와 거의 평행하면 월드 Y를 기준으로 사용
+        reference = np.tile([0.0, 0.0, 1.0], (len(z_axes), 1))
+        reference[np.abs(z_axes[:, 2]) > 0.99] = (0.0, 1.0, 0.0)
+        x_axes = np.cross(reference, z_axes)
+    else:
+        x_axes = tangents @ linear.T
+        # 노멀 성분 제거 (직교화)
+        x_axes -= np.sum(x_axes * z_axes, axis=1, keepdims=True) * z_axes
+    x_axes = normalize_rows(x_axes)
+    y_axes = np.cross(z_axes, x_axes)
+
+    frames = np.zeros((len(positions), 4, 4))
+    frames[:, :3, 0] = x_axes
+    frames[:, :3, 1] = y_axes
+    frames[:, :3, 2] = z_axes
+    frames[:, :3, 3] = world_positions
+    frames[:, 3, 3] = 1.0
+    return frames
+
+def read_selected_vertex_frames(obj, orient=True):
+    """선택된 버텍스들의 인덱스와 월드 행렬을 foreach_get으로 한 번에 읽는 함수"""
+    mesh = obj.data
+    count = len(mesh.vertices)
+
+    selected = np.zeros(count, dtype=bool)
+    mesh.vertices.foreach_get("select", selected)
+    indices = np.flatnonzero(selected)
+    if not len(indices):
+        return indices, None
+
+    positions = np.empty(count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    positions = positions.reshape(-1, 3)[indices]
+
+    if orient:
+        normals = np.empty(count * 3, dtype=np.float32)
+        # Blender 3.5+ 는 vertex_normals, 그 이전은 MeshVertex.normal
+        if hasattr(mesh, "vertex_normals"):
+            mesh.vertex_normals.foreach_get("vector", normals)
+        else:
+            mesh.vertices.foreach_get("normal", normals)
+        normals = normals.reshape(-1, 3)[indices]
+    else:
+        normals = np.tile([0.0, 0.0, 1.0], (len(indices), 1))
+
+    return indices, frames_from_normals(obj.matrix_world, positions, normals)
+
+def read_selected_face_frames(obj, orient=True):
+    """선택된 면들의 인덱스와 중심점 월드 행렬을 foreach_get으로 한 번에 읽는 함수"""
+    mesh = obj.data
+    count = len(mesh.polygons)
+
+    selected = np.zeros(count, dtype=bool)
+    mesh.polygons.foreach_get("select", selected)
+    indices = np.flatnonzero(selected)
+    if not len(indices):
+        return indices, None
+
+    centers = np.empty(count * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("center", centers)
+    centers = centers.reshape(-1, 3)[indices]
+
+    if not orient:
+        normals = np.tile([0.0, 0.0, 1.0], (len(indices), 1))
+        return indices, frames_from_normals(obj.matrix_world, centers, normals)
+
+    normals = np.empty(count * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("normal", normals)
+    normals = normals.reshape(-1, 3)[indices]
+
+    # 탄젠트: 면 중심에서 첫 번째 버텍스 방향 (면마다 안정적인 X축)
+    loop_starts = np.empty(count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    vertex_co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", vertex_co)
+    first_vertices = vertex_co.reshape(-1, 3)[loop_vertices[loop_starts[indices]]]
+
+    return indices, frames_from_normals(obj.matrix_world, centers, normals, first_vertices - centers)
+
+def read_selected_pose_bone_frames(armature_obj, selected_bones):
+    """
+    선택된 포즈 본들의 인덱스와 월드 행렬을 foreach_get으로 한 번에 읽는 함수
+    selected_bones: {(아마추어 오브젝트, 본 이름), ...} (여러 아마추어에 같은 이름의 본이 있어도 구분)
+    """
+    pose_bones = armature_obj.pose.bones
+    count = len(pose_bones)
+
+    selected = np.fromiter(((armature_obj, pose_bone.name) in selected_bones for pose_bone in pose_bones),
+                           dtype=bool, count=count)
+    indices = np.flatnonzero(selected)
+    if not len(indices):
+        return indices, None
+
+    # foreach_get의 행렬은 열 우선(column-major)이므로 전치해서 행 우선으로 변환
+    matrices = np.empty(count * 16, dtype=np.float32)
+    pose_bones.foreach_get("matrix", matrices)
+    matrices = matrices.reshape(-1, 4, 4)[indices].transpose(0, 2, 1)
+
+    # 아마추어 공간 -> 월드 공간
+    object_matrix = np.array(armature_obj.matrix_world, dtype=np.float64)
+    return indices, object_matrix @ matrices
+
+def create_empties_from_frames(source_obj, names, frames):
+    """월드 행렬 목록으로 Empty들을 데이터 API로 일괄 생성하는 함수"""
+    new_empties = []
+    for name, frame in zip(names, frames):
+        new_empty = bpy.data.objects.new(name, None)
+        new_empty.empty_display_type = ELEMENT_EMPTY_DISPLAY_TYPE
+        new_empty.empty_display_size = ELEMENT_EMPTY_DISPLAY_SIZE
+        new_empty.matrix_world = Matrix(frame.tolist())
+        new_empties.append(new_empty)
+
+    link_to_collections(new_empties, source_obj)
+    return new_empties
+
+def create_empties_at_selected_elements(context, element='AUTO', orient=True):
+    """
+    선택된 요소마다 Empty를 한 번에 생성하는 함수
+    element: 'VERT' (선택된 버텍스), 'FACE' (선택된 면 중심), 'BONE' (선택된 포즈 본),
+             'AUTO' (현재 모드/선택 모드에 따라 결정)
+    orient: True면 노멀(버텍스/면) 또는 본 행렬 방향으로 Empty를 회전
+    """
+    if element == 'AUTO':
+        if context.mode == 'POSE':
+            element = 'BONE'
+        elif context.tool_settings.mesh_select_mode[2]:
+            element = 'FACE'
+        else:
+            element = 'VERT'
+
+    created_empties = []
+
+    if element == 'BONE':
+        selected_bones = {(pose_bone.id_data, pose_bone.name) for pose_bone in (context.selected_pose_bones or [])}
+        armatures = [obj for obj in context.objects_in_mode if obj.type == 'ARMATURE']
+        for armature_obj in armatures:
+            indices, frames = read_selected_pose_bone_frames(armature_obj, selected_bones)
+            if frames is None:
+                continue
+            if not orient:
+                frames[:, :3, :3] = np.eye(3)
+            pose_bones = armature_obj.pose.bones
+            names = [f"{armature_obj.name}_{pose_bones[int(i)].name}_Empty" for i in indices]
+            created_empties.extend(create_empties_from_frames(armature_obj, names, frames))
+    else:
+        meshes = [obj for obj in context.objects_in_mode if obj.type == 'MESH'] or \
+                 [obj for obj in context.selected_objects if obj.type == 'MESH']
+        read_frames = read_selected_face_frames if element == 'FACE' else read_selected_vertex_frames
+        label = "Face" if element == 'FACE' else "Vert"
+        for mesh_obj in meshes:
+            # 에디트 모드의 선택 상태를 메시 데이터에 반영
+            if mesh_obj.mode == 'EDIT':
+                mesh_obj.update_from_editmode()
+            indices, frames = read_frames(mesh_obj, orient)
+            if frames is None:
+                continue
+            names = [f"{mesh_obj.name}_{label}{i}_Empty" for i in indices]
+            created_empties.extend(create_empties_from_frames(mesh_obj, names, frames))
+
+    # 새로 생성된 Empty들을 선택 (에디트/포즈 모드에서는 액티브 오브젝트는 유지)
+    for new_empty in created_empties:
+        if context.view_layer.objects.get(new_empty.name) is not None:
+            new_empty.select_set(True)
+
+    if created_empties:
+        print(f"INFO: 선택된 요소({element}) {len(created_empties)}개에 Empty를 생성했습니다.")
+    else:
+        print(f"WARNING: 선택된 요소({element})가 없습니다.")
+
+    return created_empties
+
+@profiled()
+def create_empty_selected_object(context=None):
+    """
+    에디트 모드(버텍스/면) 또는 포즈 모드(본)에서는 선택된 요소마다 Empty를 생성하고,
+    그 외에는 활성 오브젝트 위치에 Empty 하나를 생성하는 함수
+    """
+    context = context or bpy.context
+    if context.mode in {'EDIT_MESH', 'POSE'}:
+        return create_empties_at_selected_elements(context)
+    return create_empty_at_active_object()
+
+# 메인 실행 부분
+if __name__ == "__main__":
+    create_empty_selected_object()
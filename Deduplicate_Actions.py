@@ -0,0 +1,200 @@
+"""
+Deduplicate Actions
+키프레임 데이터가 완전히 같은 액션들을 하나로 합치는 스크립트
+
+- 모든 액션의 F-Curve 키프레임(co, 핸들, 보간, 핸들 타입, 이징)을 foreach_get으로 한 번에 읽어서 내용 해시를 계산합니다.
+- 해시가 같은 액션끼리 묶고, 사용자가 가장 많은 액션을 대표(canonical)로 정합니다.
+- 나머지 액션의 사용자(활성 액션, NLA 스트립, 그 외 참조)를 대표 액션으로 옮기고 중복 액션을 삭제합니다.
+- 대표 액션의 이름은 Rename_Action_to_Object_Name과 같은 방식으로 사용하는 오브젝트 이름으로 변경합니다.
+- F-Curve 모디파이어가 있거나 슬롯이 여러 개인 액션, 빈 액션은 건너뜁니다.
+- 라이브러리에서 링크했거나 라이브러리 오버라이드인 액션은 이름 변경/삭제를 할 수 없으므로 비교하지 않습니다.
+"""
+
+import bpy
+import hashlib
+import numpy as np
+
+try:
+    from .Shared_Utils import profiled, get_logger, DEBUG, run_steps, get_all_fcurves, rename_action_to_object_name
+except ImportError:
+    from Shared_Utils import profiled, get_logger, DEBUG, run_steps, get_all_fcurves, rename_action_to_object_name
+
+log = get_logger("Deduplicate_Actions")
+
+# 애니메이션 데이터를 가질 수 있는 데이터 블록 (활성 액션과 NLA 스트립을 옮길 대상)
+ANIMATED_ID_COLLECTIONS = ("objects", "meshes", "armatures", "shape_keys", "materials",
+                           "cameras", "lights", "curves", "worlds", "scenes", "node_groups")
+
+# 곡선 모양에 영향을 주는 키프레임 속성 (co와 핸들 좌표 외)
+KEYFRAME_FLOAT_ATTRS = ("back", "amplitude", "period")
+KEYFRAME_ENUM_ATTRS = ("interpolation", "handle_left_type", "handle_right_type", "easing")
+
+def get_action_hash(action):
+    """
+    액션의 키프레임 내용 해시 (이름, 사용자와 무관)
+    비교할 수 없는 액션(F-Curve 모디파이어, 여러 슬롯)과 빈 액션은 None을 반환합니다.
+    """
+    slots = getattr(action, "slots", None)
+    if slots is not None and len(slots) > 1:
+        return None
+
+    fcurves = sorted(get_all_fcurves(action), key=lambda fcurve: (fcurve.data_path, fcurve.array_index))
+    if not fcurves:
+        return None  # 빈 액션은 나중에 키를 넣을 자리로 쓰이는 경우가 많으므로 합치지 않음
+    digest = hashlib.sha1()
+    if slots:
+        digest.update(slots[0].target_id_type.encode())
+
+    for fcurve in fcurves:
+        if len(fcurve.modifiers):
+            return None
+        points = fcurve.keyframe_points
+        count = len(points)
+        digest.update(f"{fcurve.data_path}[{fcurve.array_index}]:{count}:{fcurve.extrapolation}".encode())
+        if not count:
+            continue
+
+        # 키프레임 값은 foreach_get으로 한 번에 읽어서 바이트 그대로 해시
+        buffer = np.empty(count * 2, dtype=np.float32)
+        for attr in ("co", "handle_left", "handle_right"):
+            points.foreach_get(attr, buffer)
+            digest.update(buffer.tobytes())
+        float_buffer = np.empty(count, dtype=np.float32)
+        for attr in KEYFRAME_FLOAT_ATTRS:
+            points.foreach_get(attr, float_buffer)
+            digest.update(float_buffer.tobytes())
+        # 보간, 핸들 타입, 이징 같은 열거형은 정수 인덱스로 읽어서 해시
+        enum_buffer = np.empty(count, dtype=np.int32)
+        for attr in KEYFRAME_ENUM_ATTRS:
+            points.foreach_get(attr, enum_buffer)
+            digest.update(enum_buffer.tobytes())
+
+    return digest.hexdigest()
+
+def get_animated_ids():
+    """애니메이션 데이터가 있는 모든 로컬 데이터 블록 (링크된 데이터의 참조는 user_remap이 옮김)"""
+    animated = []
+    for collection_name in ANIMATED_ID_COLLECTIONS:
+        for id_data in getattr(bpy.data, collection_name, ()):
+            if id_data.library is None and getattr(id_data, "animation_data", None):
+                animated.append(id_data)
+    return animated
+
+def assign_first_slot(owner, action):
+    """Blender 4.4+ 에서 액션을 바꾼 뒤 슬롯이 비어 있으면 첫 슬롯 지정"""
+    if getattr(owner, "action_slot", False) is None and action.slots:
+        owner.action_slot = action.slots[0]
+
+def remap_action_users(replacements):
+    """
+    활성 액션과 NLA 스트립을 대표 액션으로 바꾸고, 그 외의 참조는 user_remap으로 옮기는 함수
+    replacements: {중복 액션: 대표 액션}
+    반환값: (바꾼 활성 액션 수, 바꾼 NLA 스트립 수)
+    """
+    active_count = 0
+    strip_count = 0
+    for id_data in get_animated_ids():
+        animation_data = id_data.animation_data
+        canonical = replacements.get(animation_data.action)
+        if canonical is not None:
+            animation_data.action = canonical
+            assign_first_slot(animation_data, canonical)
+            active_count += 1
+
+        for track in animation_data.nla_tracks:
+            for strip in track.strips:
+                canonical = replacements.get(strip.action)
+                if canonical is not None:
+                    strip.action = canonical
+                    assign_first_slot(strip, canonical)
+                    strip_count += 1
+
+    # Action 컨스트레인트 등 나머지 참조
+    for duplicate, canonical in replacements.items():
+        duplicate.user_remap(canonical)
+    return active_count, strip_count
+
+def get_action_object_names():
+    """액션 -> 그 액션을 활성 액션으로 쓰는 첫 번째 오브젝트 이름"""
+    names = {}
+    for obj in bpy.data.objects:
+        if obj.animation_data and obj.animation_data.action:
+            names.setdefault(obj.animation_data.action, obj.name)
+    return names
+
+@profiled()
+@log.flushing
+def deduplicate_actions():
+    """동기 실행 버전 (Modal_Job_Runner에서는 iter_deduplicate_actions를 단계별로 실행)"""
+    return run_steps(iter_deduplicate_actions())
+
+def is_local_action(action):
+    """편집할 수 있는 로컬 액션인지 확인 (링크된 액션과 라이브러리 오버라이드 제외)"""
+    return action.library is None and action.override_library is None
+
+def iter_deduplicate_actions():
+    """
+    단계마다 진행률(0.0 ~ 1.0)을 yield 하는 중복 액션 정리 작업
+    마지막 yield는 데이터를 바꾸기 전이므로, 취소되면 아무것도 바뀌지 않습니다.
+    반환값: 삭제한 중복 액션 수
+    """
+    actions = [action for action in bpy.data.actions if is_local_action(action)]
+    linked_count = len(bpy.data.actions) - len(actions)
+    if linked_count:
+        log.info("링크/오버라이드 액션 %d개는 건너뜁니다.", linked_count)
+    if not actions:
+        log.info("정리할 로컬 액션이 없습니다.")
+        return 0
+
+    # 1. 모든 액션의 내용 해시 계산
+    groups = {}
+    skipped = 0
+    for index, action in enumerate(actions):
+        if index % 100 == 0:
+            yield 0.8 * index / len(actions)
+        action_hash = get_action_hash(action)
+        if action_hash is None:
+            skipped += 1
+            log.item("비교 불가", "SKIP: '%s' (빈 액션, F-Curve 모디파이어 또는 여러 슬롯)", action.name, message_level=DEBUG)
+            continue
+        groups.setdefault(action_hash, []).append(action)
+
+    # 2. 그룹마다 대표 액션 선택 (사용자가 가장 많은 액션, 같으면 이름순)
+    replacements = {}
+    canonicals = []
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        group.sort(key=lambda action: (-action.users, action.name))
+        canonical = group[0]
+        canonicals.append(canonical)
+        for duplicate in group[1:]:
+            replacements[duplicate] = canonical
+            log.item("중복 액션", "'%s' → '%s'", duplicate.name, canonical.name)
+    yield 0.85
+
+    if not replacements:
+        log.info("중복 액션이 없습니다. (액션 %d개, 비교 불가 %d개)", len(actions), skipped)
+        return 0
+
+    # 3. 사용자를 대표 액션으로 옮기고 중복 액션 삭제
+    active_count, strip_count = remap_action_users(replacements)
+    for duplicate, canonical in replacements.items():
+        canonical.use_fake_user = canonical.use_fake_user or duplicate.use_fake_user
+        bpy.data.actions.remove(duplicate)
+
+    # 4. 대표 액션 이름을 사용하는 오브젝트 이름으로 변경
+    object_names = get_action_object_names()
+    for canonical in canonicals:
+        object_name = object_names.get(canonical)
+        if object_name and canonical.name != object_name:
+            old_action_name = canonical.name
+            new_action_name = rename_action_to_object_name(canonical, object_name)
+            log.item("액션 이름 변경", "오브젝트 '%s': 액션 이름 '%s' → '%s'", object_name, old_action_name, new_action_name)
+
+    log.info("SUCCESS: 중복 액션 %d개 삭제 (대표 액션 %d개, 활성 액션 %d개 / NLA 스트립 %d개 교체)",
+             len(replacements), len(canonicals), active_count, strip_count)
+    return len(replacements)
+
+if __name__ == "__main__":
+    deduplicate_actions()
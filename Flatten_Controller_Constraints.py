@@ -0,0 +1,265 @@
+"""
+Flatten Controller Constraints
+Create_Controller_to_Selected_Object로 만든 Child Of 컨트롤러 구성을 일반 키프레임으로 굽는 스크립트
+
+- 컨트롤러(_CTRL)를 타겟으로 하는 Child Of 컨스트레인트를 가진 오브젝트들의 월드 행렬을
+  프레임 범위를 한 번만 순회하면서 한꺼번에 샘플링합니다.
+- 샘플링한 행렬을 부모 기준 로컬 트랜스폼으로 바꿔 키프레임으로 일괄 기록하고 컨스트레인트를 제거합니다.
+  움직이지 않는 오브젝트는 키 없이 트랜스폼 값만 설정합니다.
+- 옵션으로 더 이상 쓰이지 않는 컨트롤러도 삭제합니다.
+- 마지막에 몇 개 프레임을 다시 평가해서 원래 월드 행렬과 허용 오차 안에서 일치하는지 확인합니다.
+"""
+
+import bpy
+import numpy as np
+
+try:
+    from .Shared_Utils import profiled, get_logger, WARNING, run_steps
+except ImportError:
+    from Shared_Utils import profiled, get_logger, WARNING, run_steps
+
+# 월드 행렬 읽기, 행렬 분해와 키 일괄 기록은 Keyframe_Utils의 함수를 사용
+try:
+    from .Keyframe_Utils import (read_world_matrices, decompose_matrices, quaternions_to_rotation_values,
+                                 ensure_fcurve, write_keyframes)
+except ImportError:
+    from Keyframe_Utils import (read_world_matrices, decompose_matrices, quaternions_to_rotation_values,
+                                ensure_fcurve, write_keyframes)
+
+log = get_logger("Flatten_Controller_Constraints")
+
+CONTROLLER_SUFFIX = "_CTRL"   # Create_Controller_to_Selected_Object에서 만든 컨트롤러 이름
+STATIC_TOLERANCE = 1e-6       # 모든 프레임의 행렬 차이가 이 값보다 작으면 키 없이 값만 설정
+VERIFY_TOLERANCE = 1e-4       # 왕복 검증 허용 오차 (행렬 성분 최대 차이)
+VERIFY_FRAMES = 5             # 왕복 검증에 사용할 프레임 수 (처음과 끝 포함 균등 분포)
+
+def is_controller_child_of(constraint, only_controllers=True):
+    if constraint.type != 'CHILD_OF' or constraint.target is None:
+        return False
+    return not only_controllers or constraint.target.name.endswith(CONTROLLER_SUFFIX)
+
+def collect_flatten_targets(objects, only_controllers=True):
+    """
+    평탄화할 오브젝트와 제거할 Child Of 컨스트레인트를 모으는 함수
+    선택한 오브젝트가 컨트롤러면 그 컨트롤러를 따르는 오브젝트들을 대상으로 합니다.
+    다른 활성 컨스트레인트가 함께 있는 오브젝트는 결과가 달라지므로 건너뜁니다.
+    반환값: [(오브젝트, [컨스트레인트, ...]), ...]
+    """
+    objects = set(objects)
+    scene_objects = bpy.context.scene.objects
+
+    # 컨트롤러 -> 그 컨트롤러를 Child Of 타겟으로 쓰는 오브젝트
+    followers = {}
+    for obj in scene_objects:
+        for constraint in obj.constraints:
+            if is_controller_child_of(constraint, only_controllers):
+                followers.setdefault(constraint.target, []).append(obj)
+
+    candidates = set(objects)
+    for selected in objects:
+        candidates.update(followers.get(selected, ()))
+    candidates = [obj for obj in scene_objects if obj in candidates]
+
+    targets = []
+    for obj in candidates:
+        child_ofs = [c for c in obj.constraints if is_controller_child_of(c, only_controllers)]
+        if not child_ofs:
+            continue
+        others = [c for c in obj.constraints if c not in child_ofs and not c.mute]
+        if others:
+            log.item("다른 컨스트레인트", "SKIP: '%s'에 다른 컨스트레인트('%s')가 있어 건너뜁니다.",
+                     obj.name, others[0].name, message_level=WARNING)
+            continue
+        targets.append((obj, child_ofs))
+    return targets
+
+def iter_sample_world_matrices(scene, objects, frames):
+    """프레임 범위를 한 번 순회하면서 오브젝트들의 월드 행렬 (프레임, 오브젝트, 4, 4)을 샘플링"""
+    samples = np.empty((len(frames), len(objects), 4, 4))
+    for i, frame in enumerate(frames):
+        scene.frame_set(frame)
+        samples[i] = read_world_matrices(objects)
+        yield (i + 1) / len(frames)
+    return samples
+
+def write_object_transforms(obj, frames, basis):
+    """
+    오브젝트 로컬 트랜스폼 (프레임, 4, 4)을 새 액션의 키로 일괄 기록하는 함수
+    액션이 없고 모든 프레임이 같으면 키 없이 트랜스폼 값만 설정하고 None을 반환합니다.
+    """
+    locations, quaternions, scales = decompose_matrices(basis)
+    rotation_path, rotations = quaternions_to_rotation_values(obj, quaternions)
+
+    has_action = obj.animation_data is not None and obj.animation_data.action is not None
+    if not has_action and np.abs(basis - basis[0]).max() < STATIC_TOLERANCE:
+        obj.location = locations[0]
+        setattr(obj, rotation_path, rotations[0])
+        obj.scale = scales[0]
+        return None
+
+    if has_action:
+        log.item("액션 교체", "'%s': 기존 액션 '%s'을(를) 평탄화한 액션으로 교체합니다.",
+                 obj.name, obj.animation_data.action.name, message_level=WARNING)
+
+    # 새 액션 이름은 Rename_Action_to_Object_Name과 같이 오브젝트 이름 (중복이면 Blender가 .001 부여)
+    action = bpy.data.actions.new(obj.name)
+    animation_data = obj.animation_data or obj.animation_data_create()
+    animation_data.action = action
+
+    for data_path, values in (("location", locations), (rotation_path, rotations), ("scale", scales)):
+        for index in range(values.shape[1]):
+            fcurve = ensure_fcurve(action, obj, data_path, index, "Object Transforms")
+            write_keyframes(fcurve, frames, values[:, index])
+    return action
+
+def remove_unused_controllers(controllers):
+    """자식도 없고 다른 컨스트레인트의 타겟도 아닌 컨트롤러만 삭제하는 함수"""
+    still_used = set()
+    for obj in bpy.context.scene.objects:
+        if obj.parent in controllers:
+            still_used.add(obj.parent)
+        for constraint in obj.constraints:
+            target = getattr(constraint, "target", None)
+            if target in controllers:
+                still_used.add(target)
+
+    removed = 0
+    for controller in controllers:
+        if controller in still_used:
+            log.item("사용 중인 컨트롤러", "SKIP: 컨트롤러 '%s'는 아직 사용 중이라 남겨둡니다.", controller.name)
+            continue
+        bpy.data.objects.remove(controller)
+        removed += 1
+    return removed
+
+def verify_round_trip(scene, objects, frames, samples):
+    """몇 개 프레임을 다시 평가해서 평탄화 전에 샘플링한 월드 행렬과의 최대 차이를 반환하는 함수"""
+    positions = np.unique(np.linspace(0, len(frames) - 1, min(VERIFY_FRAMES, len(frames))).round().astype(int))
+    max_error = 0.0
+    for i in positions:
+        scene.frame_set(frames[i])
+        max_error = max(max_error, float(np.abs(read_world_matrices(objects) - samples[i]).max()))
+    return max_error
+
+@profiled()
+@log.flushing
+def flatten_controller_constraints(objects=None, remove_controllers=False, only_controllers=True):
+    """동기 실행 버전 (Modal_Job_Runner에서는 iter_flatten_controller_constraints를 단계별로 실행)"""
+    return run_steps(iter_flatten_controller_constraints(objects, remove_controllers, only_controllers))
+
+def iter_flatten_controller_constraints(objects=None, remove_controllers=False, only_controllers=True):
+    """
+    단계마다 진행률(0.0 ~ 1.0)을 yield 하는 평탄화 작업
+    objects가 없으면 선택한 오브젝트(선택이 없으면 씬 전체)를 대상으로 합니다.
+    only_controllers가 False면 _CTRL이 아닌 타겟의 Child Of도 평탄화합니다.
+    반환값: (평탄화한 오브젝트 리스트, 왕복 검증 최대 오차)
+    """
+    scene = bpy.context.scene
+    if objects is None:
+        objects = bpy.context.selected_objects or scene.objects
+
+    targets = collect_flatten_targets(objects, only_controllers)
+    if not targets:
+        log.warning("평탄화할 Child Of 컨스트레인트가 없습니다.")
+        return [], 0.0
+
+    flattened = [obj for obj, _ in targets]
+    parents = list(dict.fromkeys(obj.parent for obj in flattened if obj.parent is not None))
+    sampled_objects = flattened + parents
+    frames = list(range(scene.frame_start, scene.frame_end + 1))
+    original_frame = scene.frame_current
+    log.info("%d개 오브젝트의 Child Of를 프레임 %d-%d에서 평탄화합니다.", len(flattened), frames[0], frames[-1])
+
+    # 1. 프레임 범위를 한 번만 순회하면서 대상과 부모의 월드 행렬을 샘플링
+    #    yield는 여기까지만 하므로, 취소되면 현재 프레임만 되돌리면 됩니다. (이후 단계는 한 번에 실행)
+    sampling = iter_sample_world_matrices(scene, sampled_objects, frames)
+    try:
+        while True:
+            yield 0.8 * next(sampling)
+    except StopIteration as result:
+        samples = result.value
+    except GeneratorExit:
+        scene.frame_set(original_frame)
+        log.info("작업이 중단되어 현재 프레임을 %d로 되돌렸습니다.", original_frame)
+        raise
+
+    # 2. 월드 행렬 -> 로컬 트랜스폼 (matrix_world = parent.matrix_world @ matrix_parent_inverse @ matrix_basis)
+    #    부모 자신도 평탄화 대상이어도 월드 행렬은 그대로 유지되므로 샘플링한 값을 쓸 수 있습니다.
+    parent_column = {parent: len(flattened) + i for i, parent in enumerate(parents)}
+    controllers = set()
+    for i, (obj, child_ofs) in enumerate(targets):
+        world = samples[:, i]
+        if obj.parent is not None:
+            parent_space = samples[:, parent_column[obj.parent]] @ np.array(obj.matrix_parent_inverse)
+            basis = np.linalg.inv(parent_space) @ world
+        else:
+            basis = world
+
+        controllers.update(constraint.target for constraint in child_ofs)
+        for constraint in child_ofs:
+            obj.constraints.remove(constraint)
+        write_object_transforms(obj, frames, basis)
+        log.item("평탄화", "'%s': Child Of %d개 제거, %d프레임 기록", obj.name, len(child_ofs), len(frames))
+
+    # 3. 왕복 검증 (평탄화 후 다시 평가한 월드 행렬 == 원래 월드 행렬)
+    max_error = verify_round_trip(scene, flattened, frames, samples[:, :len(flattened)])
+    if max_error <= VERIFY_TOLERANCE:
+        log.info("왕복 검증 통과: 최대 오차 %.2e (허용 %.0e)", max_error, VERIFY_TOLERANCE)
+    else:
+        log.warning("왕복 검증 실패: 최대 오차 %.2e (허용 %.0e)", max_error, VERIFY_TOLERANCE)
+
+    # 4. 옵션: 더 이상 쓰이지 않는 컨트롤러 삭제
+    if remove_controllers:
+        removed = remove_unused_controllers(controllers)
+        log.info("컨트롤러 %d개를 삭제했습니다.", removed)
+
+    scene.frame_set(original_frame)
+    log.info("SUCCESS: %d개 오브젝트를 평탄화했습니다.", len(flattened))
+    return flattened, max_error
+
+
+class MW_OT_FlattenControllers(bpy.types.Operator):
+    """Bake Child Of controller setups into plain keyframes and remove the constraints"""
+    bl_idname = "mw.flatten_controllers"
+    bl_label = "Flatten Controller Constraints"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    remove_controllers: bpy.props.BoolProperty(
+        name="Remove Controllers",
+        description="Delete controllers that nothing uses after flattening",
+        default=False,
+    )
+    only_controllers: bpy.props.BoolProperty(
+        name="Only Controllers",
+        description=f"Only flatten Child Of constraints that target '{CONTROLLER_SUFFIX}' objects",
+        default=True,
+    )
+
+    def execute(self, context):
+        flattened, max_error = flatten_controller_constraints(
+            remove_controllers=self.remove_controllers, only_controllers=self.only_controllers)
+        if not flattened:
+            self.report({'WARNING'}, "No Child Of constraints to flatten")
+            return {'CANCELLED'}
+
+        level = 'INFO' if max_error <= VERIFY_TOLERANCE else 'WARNING'
+        self.report({level}, f"Flattened {len(flattened)} objects (max error {max_error:.2e})")
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(MW_OT_FlattenControllers)
+
+def unregister():
+    bpy.utils.unregister_class(MW_OT_FlattenControllers)
+
+if __name__ == "__main__":
+    # 기존 등록 해제 (안전성)
+    try:
+        unregister()
+    except:
+        pass
+
+    register()
+
+    bpy.ops.mw.flatten_controllers()
@@ -0,0 +1,91 @@
+"""
+Following Bones
+오브젝트를 따라가는 본을 일괄 생성하는 공용 함수 모음입니다.
+Add_Following_Bone_to_Armature와 Create_Armature_with_Following_Bones에서 사용합니다.
+
+- 타겟들의 matrix_world를 한 번에 읽어 본의 head, tail, roll을 배열 연산으로 계산
+- Edit 모드는 한 번만 진입하고 본 위치는 foreach_set으로 일괄 설정
+"""
+
+import bpy
+import numpy as np
+
+try:
+    from .Keyframe_Utils import read_world_matrices
+except ImportError:
+    from Keyframe_Utils import read_world_matrices
+
+BONE_LENGTH = 1.0  # 기본 본 길이 (타겟 오브젝트의 Y축 방향)
+
+def normalize_rows(vectors):
+    lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(lengths > 1e-12, lengths, 1.0)
+
+def compute_bone_rest_data(armature_obj, target_matrices, bone_length=BONE_LENGTH):
+    """
+    타겟 월드 행렬들로부터 본의 head, tail, roll을 한 번에 계산하는 함수
+    본의 Y축 = 타겟의 Y축, 본의 Z축 = 타겟의 Z축 (roll로 맞춤), 스케일은 제외
+    """
+    armature_inverse = np.linalg.inv(np.array(armature_obj.matrix_world, dtype=np.float64))
+    local = armature_inverse @ target_matrices
+
+    heads = local[:, :3, 3]
+    y_axes = normalize_rows(local[:, :3, 1])
+    z_axes = local[:, :3, 2]
+    z_axes = normalize_rows(z_axes - np.sum(z_axes * y_axes, axis=1, keepdims=True) * y_axes)
+    tails = heads + y_axes * bone_length
+
+    # Blender의 vec_roll_to_mat3와 같은 방식으로 roll이 0일 때의 X/Z축을 구하고
+    # 타겟 Z축과의 각도를 roll로 사용 (mat3_vec_to_roll)
+    x, y, z = y_axes[:, 0], y_axes[:, 1], y_axes[:, 2]
+    theta = 1.0 + y
+    regular = theta > 1e-6
+    safe_theta = np.where(regular, theta, 1.0)
+    roll_zero_x = np.where(regular[:, None],
+                           np.stack([1.0 - x * x / safe_theta, -x, -x * z / safe_theta], axis=1),
+                           [-1.0, 0.0, 0.0])
+    roll_zero_z = np.where(regular[:, None],
+                           np.stack([-x * z / safe_theta, -z, 1.0 - z * z / safe_theta], axis=1),
+                           [0.0, 0.0, 1.0])
+    rolls = np.arctan2(np.sum(roll_zero_x * z_axes, axis=1), np.sum(roll_zero_z * z_axes, axis=1))
+
+    return heads, tails, rolls
+
+def build_following_bones(armature_obj, target_objects, add_constraints=True, bone_length=BONE_LENGTH):
+    """
+    타겟 오브젝트마다 따라가는 본을 일괄 생성하는 함수
+    - 모든 타겟의 matrix_world를 한 번에 읽어 head/tail/roll 계산
+    - Edit 모드는 한 번만 진입하고 본 위치는 foreach_set으로 일괄 설정
+    - Copy Transforms 콘스트레인트는 한 번의 포즈 본 루프에서 추가 (add_constraints=False면 생략)
+    생성된 본 이름 리스트를 target_objects 순서대로 반환합니다. (아마추어가 액티브여야 함)
+    """
+    heads, tails, rolls = compute_bone_rest_data(armature_obj, read_world_matrices(target_objects), bone_length)
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = armature_obj.data.edit_bones
+    first_new = len(edit_bones)
+
+    # 이름이 겹치면 Blender가 .001 등을 붙이므로 실제 생성된 이름을 기록
+    bone_names = [edit_bones.new(target_obj.name).name for target_obj in target_objects]
+
+    # 새 본은 edit_bones 끝에 추가되므로 해당 구간만 덮어써서 일괄 설정
+    count = len(edit_bones)
+    for attr, values, width in (("head", heads, 3), ("tail", tails, 3), ("roll", rolls, 1)):
+        buffer = np.empty(count * width, dtype=np.float32)
+        edit_bones.foreach_get(attr, buffer)
+        buffer.reshape(count, width)[first_new:] = values.reshape(-1, width)
+        edit_bones.foreach_set(attr, buffer)
+
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    if not add_constraints:
+        return bone_names
+
+    # 각 새로 생성된 본에 Copy Transforms 콘스트레인트 추가
+    pose_bones = armature_obj.pose.bones
+    for bone_name, target_obj in zip(bone_names, target_objects):
+        constraint = pose_bones[bone_name].constraints.new(type='COPY_TRANSFORMS')
+        constraint.name = "Copy Transforms"
+        constraint.target = target_obj
+
+    return bone_names
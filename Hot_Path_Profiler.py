@@ -0,0 +1,276 @@
+"""
+Hot Path Profiler
+스크립트 진입 함수의 실행 정보를 기록하는 프로파일링 데코레이터/컨텍스트 매니저입니다.
+
+- 기록 항목: 실행 시간(wall time), bpy.ops 호출 횟수(오퍼레이터별), depsgraph 업데이트 횟수,
+  tracemalloc 최대 메모리 (TRACE_MEMORY가 True일 때, 가장 바깥 구간만)
+- 기록은 최근 RING_BUFFER_SIZE개만 유지하는 링 버퍼에 저장되고, 사이드바 패널에서 확인하거나
+  JSON 파일로 저장할 수 있습니다.
+- 실행 중에 켜고 끌 수 있으며, 꺼져 있을 때는 플래그 하나만 확인하고 바로 원래 함수를 호출합니다.
+  (환경 변수 MW_PROFILE=1 로 시작하면 처음부터 켜짐)
+
+사용법:
+    @profiled()
+    def convert_armature_for_unreal(): ...
+
+    with profile_section("bake"):
+        bpy.ops.nla.bake(...)
+
+    steps = profile_steps(iter_convert_armature_for_unreal(), "iter_convert_armature_for_unreal")
+"""
+
+import bpy
+import functools
+import json
+import os
+import time
+import tracemalloc
+from collections import deque
+
+RING_BUFFER_SIZE = 200
+ENABLED = os.environ.get("MW_PROFILE") == "1"
+TRACE_MEMORY = True   # tracemalloc은 실행 속도를 눈에 띄게 늦추므로 필요 없으면 끄기
+
+records = deque(maxlen=RING_BUFFER_SIZE)
+active_records = []   # 현재 실행 중인 구간 (중첩 구간은 바깥 구간에도 집계)
+patched_call = None   # 프로파일링 중 교체한 bpy.ops 호출 함수 (원본)
+
+def set_enabled(enabled, trace_memory=None):
+    """프로파일링을 켜고 끄는 함수 (실행 중에도 변경 가능)"""
+    global ENABLED, TRACE_MEMORY
+    ENABLED = bool(enabled)
+    if trace_memory is not None:
+        TRACE_MEMORY = bool(trace_memory)
+
+def get_operator_class():
+    # bpy.ops.<모듈>.<오퍼레이터>는 모두 같은 클래스의 인스턴스 (bpy/ops.py의 _BPyOpsSubModOp)
+    return type(bpy.ops.object.select_all)
+
+def count_operator_call(idname):
+    for record in active_records:
+        operators = record['ops']
+        operators[idname] = operators.get(idname, 0) + 1
+
+def count_depsgraph_update(scene, depsgraph=None):
+    for record in active_records:
+        record['depsgraph_updates'] += 1
+
+def start_hooks():
+    """가장 바깥 구간이 시작될 때 bpy.ops 호출과 depsgraph 업데이트를 세는 훅을 설치"""
+    global patched_call
+    operator_class = get_operator_class()
+    patched_call = operator_class.__call__
+
+    original_call = patched_call
+
+    def counting_call(self, *args, **kwargs):
+        count_operator_call(self.idname_py())
+        return original_call(self, *args, **kwargs)
+
+    operator_class.__call__ = counting_call
+    bpy.app.handlers.depsgraph_update_post.append(count_depsgraph_update)
+
+def stop_hooks():
+    global patched_call
+    get_operator_class().__call__ = patched_call
+    patched_call = None
+    if count_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(count_depsgraph_update)
+
+class profile_section:
+    """with 문으로 사용하는 프로파일링 구간 (꺼져 있으면 아무것도 하지 않음)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.record = None
+        self.started_tracing = False
+
+    def __enter__(self):
+        if not ENABLED:
+            return self
+
+        outermost = not active_records
+        self.record = {
+            'name': self.name,
+            'time': time.time(),
+            'depth': len(active_records),
+            'wall_ms': 0.0,
+            'ops': {},
+            'ops_total': 0,
+            'depsgraph_updates': 0,
+            'peak_kb': None,
+            'error': "",
+        }
+
+        if outermost:
+            start_hooks()
+            if TRACE_MEMORY:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self.started_tracing = True
+                tracemalloc.reset_peak()
+
+        active_records.append(self.record)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        record = self.record
+        if record is None:
+            return False
+
+        record['wall_ms'] = (time.perf_counter() - self.start) * 1000.0
+        active_records.remove(record)
+        record['ops_total'] = sum(record['ops'].values())
+        if exc_type is not None:
+            record['error'] = f"{exc_type.__name__}: {exc_value}"
+
+        if not active_records:
+            stop_hooks()
+            if tracemalloc.is_tracing():
+                record['peak_kb'] = tracemalloc.get_traced_memory()[1] / 1024.0
+                if self.started_tracing:
+                    tracemalloc.stop()
+
+        records.append(record)
+        self.record = None
+        return False
+
+def profiled(name=None):
+    """함수 실행 전체를 profile_section으로 감싸는 데코레이터"""
+    def decorator(func):
+        section_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with profile_section(section_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+def profile_steps(steps, name):
+    """
+    제너레이터 작업(iter_*) 전체를 하나의 profile_section으로 감싸는 제너레이터
+    Modal_Job_Runner처럼 타이머 이벤트마다 나눠 실행해도 작업이 끝나거나 취소될 때 기록 하나가 남습니다.
+    (wall time에는 타이머 이벤트 사이의 대기 시간도 포함됩니다)
+    """
+    if not ENABLED:
+        return (yield from steps)
+    with profile_section(name):
+        return (yield from steps)
+
+def get_summary():
+    """이름별 호출 횟수, 총/최대 실행 시간, bpy.ops 호출 수를 집계하는 함수"""
+    summary = {}
+    for record in records:
+        item = summary.setdefault(record['name'], {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'ops_total': 0})
+        item['calls'] += 1
+        item['total_ms'] += record['wall_ms']
+        item['max_ms'] = max(item['max_ms'], record['wall_ms'])
+        item['ops_total'] += record['ops_total']
+    return summary
+
+def dump_json(filepath):
+    """링 버퍼의 기록과 요약을 JSON 파일로 저장하는 함수"""
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump({'records': list(records), 'summary': get_summary()}, f, indent=4, ensure_ascii=False)
+    return filepath
+
+
+class MW_OT_profiler_toggle(bpy.types.Operator):
+    """Enable or disable hot path profiling"""
+    bl_idname = "mw.profiler_toggle"
+    bl_label = "Toggle Profiler"
+
+    def execute(self, context):
+        set_enabled(not ENABLED)
+        self.report({'INFO'}, f"Profiler {'enabled' if ENABLED else 'disabled'}")
+        return {'FINISHED'}
+
+
+class MW_OT_profiler_clear(bpy.types.Operator):
+    """Clear recorded profiling data"""
+    bl_idname = "mw.profiler_clear"
+    bl_label = "Clear Profile"
+
+    def execute(self, context):
+        records.clear()
+        return {'FINISHED'}
+
+
+class MW_OT_profiler_dump(bpy.types.Operator):
+    """Save recorded profiling data to a JSON file"""
+    bl_idname = "mw.profiler_dump"
+    bl_label = "Save Profile JSON"
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+
+    def execute(self, context):
+        dump_json(bpy.path.abspath(self.filepath))
+        self.report({'INFO'}, f"Saved {len(records)} records to {self.filepath}")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = os.path.join(bpy.app.tempdir or os.path.expanduser("~"), "mw_profile.json")
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+
+class MW_PT_hot_path_profiler(bpy.types.Panel):
+    """Show recent profiling records"""
+    bl_label = "MW Profiler"
+    bl_idname = "MW_PT_hot_path_profiler"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "MW"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+
+        row = layout.row(align=True)
+        row.operator(MW_OT_profiler_toggle.bl_idname, text="Enabled" if ENABLED else "Disabled",
+                     icon='REC' if ENABLED else 'PAUSE', depress=ENABLED)
+        row.operator(MW_OT_profiler_clear.bl_idname, text="", icon='TRASH')
+        row.operator(MW_OT_profiler_dump.bl_idname, text="", icon='EXPORT')
+
+        if not records:
+            layout.label(text="No records")
+            return
+
+        column = layout.column(align=True)
+        for record in reversed(list(records)[-10:]):
+            indent = "  " * record['depth']
+            text = f"{indent}{record['name']}  {record['wall_ms']:.1f} ms  ops {record['ops_total']}  dg {record['depsgraph_updates']}"
+            if record['peak_kb'] is not None:
+                text += f"  {record['peak_kb'] / 1024.0:.1f} MB"
+            column.label(text=text, icon='ERROR' if record['error'] else 'TIME')
+
+
+CLASSES = [
+    MW_OT_profiler_toggle,
+    MW_OT_profiler_clear,
+    MW_OT_profiler_dump,
+    MW_PT_hot_path_profiler,
+]
+
+def register():
+    for cls in CLASSES:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(CLASSES):
+        bpy.utils.unregister_class(cls)
+
+if __name__ == "__main__":
+    # 기존 등록 해제 (안전성)
+    try:
+        unregister()
+    except:
+        pass
+
+    register()
@@ -0,0 +1,256 @@
+"""
+Keyframe Utils
+포즈/오브젝트 행렬을 키프레임으로 일괄 기록하는 공용 함수 모음입니다.
+Sharded_Bake, Convert_Armature_for_UE, Following_Bones, Create_Armature_with_Following_Bones,
+Create_Controller_to_Selected_Object, Flatten_Controller_Constraints에서 사용합니다.
+
+- read_object_arrays, read_world_matrices: 여러 오브젝트의 속성/월드 행렬을 foreach_get 한 번으로 읽기
+- pose_to_basis_matrices: 포즈 공간 행렬을 본 로컬 트랜스폼(matrix_basis)으로 변환 (본 상속 설정 반영)
+- decompose_matrices: (n, 4, 4) 행렬을 location / rotation_quaternion / scale 배열로 분해
+- quaternions_to_rotation_values: 쿼터니언을 오브젝트/포즈 본의 회전 모드에 맞는 값으로 변환
+- ensure_fcurve, write_keyframes: F-Curve 생성과 keyframe_points.add + foreach_set 일괄 기록
+- write_pose_action: 본 로컬 트랜스폼 (프레임, 본, 4, 4)을 액션의 키로 일괄 기록 (본의 회전 모드 유지)
+
+사용법:
+    try:
+        from .Keyframe_Utils import pose_to_basis_matrices, write_pose_action
+    except ImportError:
+        from Keyframe_Utils import pose_to_basis_matrices, write_pose_action
+"""
+
+import bpy
+import numpy as np
+from mathutils import Matrix, Quaternion
+
+try:
+    from .Shared_Utils import get_logger
+except ImportError:
+    from Shared_Utils import get_logger
+
+log = get_logger("Keyframe_Utils")
+
+def read_object_arrays(objects, attr, shape):
+    """
+    오브젝트들의 float 배열 속성(bound_box, scale 등)을 (n, *shape) 배열로 읽는 함수
+    대상이 많으면 bpy.data.objects 전체를 foreach_get 한 번으로 읽어서 인덱싱합니다.
+    """
+    count = len(objects)
+    size = int(np.prod(shape))
+    all_objects = bpy.data.objects
+
+    if count and count * 4 >= len(all_objects):
+        buffer = np.empty(len(all_objects) * size, dtype=np.float32)
+        all_objects.foreach_get(attr, buffer)
+        index_of = {obj: i for i, obj in enumerate(all_objects)}
+        rows = np.fromiter((index_of[obj] for obj in objects), dtype=np.int64, count=count)
+        return buffer.reshape(-1, *shape)[rows]
+
+    return np.array([getattr(obj, attr) for obj in objects], dtype=np.float32).reshape(count, *shape)
+
+def read_world_matrices(objects):
+    """
+    오브젝트들의 matrix_world를 (n, 4, 4) 행 우선 float64 배열로 한 번에 읽는 함수
+    대상이 많으면 read_object_arrays와 같이 bpy.data.objects 전체를 foreach_get 한 번으로 읽습니다.
+    """
+    count = len(objects)
+    if count * 4 < len(bpy.data.objects):
+        return np.array([obj.matrix_world for obj in objects], dtype=np.float64).reshape(count, 4, 4)
+    # foreach_get의 행렬은 열 우선(column-major)이므로 전치
+    return read_object_arrays(objects, "matrix_world", (4, 4)).transpose(0, 2, 1).astype(np.float64)
+
+def has_default_inheritance(bone):
+    """본이 기본 상속 설정(회전/스케일 전체 상속, 로컬 위치, 상대 부모 없음)인지 확인하는 함수"""
+    return (bone.use_inherit_rotation and bone.inherit_scale == 'FULL'
+            and bone.use_local_location and not bone.use_relative_parent)
+
+def pose_to_basis_matrices(armature_obj, pose_matrices):
+    """
+    포즈 공간 행렬 (프레임, 본, 4, 4)을 본 로컬 트랜스폼(matrix_basis)으로 변환하는 함수
+    기본 상속 설정의 본은 배열 연산으로 한 번에 변환합니다.
+        pose = parent_pose @ parent_rest^-1 @ rest @ basis  =>  basis = rest^-1 @ parent_rest @ parent_pose^-1 @ pose
+    상속 설정이 다른 본은 위 식이 맞지 않으므로 Bone.convert_local_to_pose(invert=True)로 프레임마다 변환합니다.
+    """
+    bones = armature_obj.data.bones
+    rest = np.empty(len(bones) * 16, dtype=np.float32)
+    bones.foreach_get("matrix_local", rest)
+    rest = rest.reshape(-1, 4, 4).transpose(0, 2, 1).astype(np.float64)
+
+    bone_index = {bone.name: i for i, bone in enumerate(bones)}
+    pose_bones = armature_obj.pose.bones
+    pose_index = {pose_bone.name: i for i, pose_bone in enumerate(pose_bones)}
+    # pose.bones와 data.bones의 순서가 다를 수 있으므로 pose.bones 순서로 정렬
+    rest = rest[[bone_index[pose_bone.name] for pose_bone in pose_bones]]
+    parents = np.array([pose_index[pose_bone.parent.name] if pose_bone.parent else -1 for pose_bone in pose_bones])
+
+    has_parent = parents >= 0
+    parent_rest = np.where(has_parent[:, None, None], rest[np.maximum(parents, 0)], np.eye(4))
+    parent_pose = np.where(has_parent[np.newaxis, :, None, None], pose_matrices[:, np.maximum(parents, 0)], np.eye(4))
+
+    offset = np.linalg.inv(rest) @ parent_rest
+    basis = offset[np.newaxis] @ np.linalg.inv(parent_pose) @ pose_matrices
+
+    # 상속 설정이 다른 본은 Blender의 변환 함수로 다시 계산
+    special = [j for j, pose_bone in enumerate(pose_bones) if not has_default_inheritance(pose_bone.bone)]
+    for j in special:
+        bone = pose_bones[j].bone
+        rest_matrix = Matrix(rest[j].tolist())
+        parent = parents[j]
+        if parent >= 0:
+            parent_rest_matrix = Matrix(rest[parent].tolist())
+        for frame in range(len(pose_matrices)):
+            pose_matrix = Matrix(pose_matrices[frame, j].tolist())
+            if parent >= 0:
+                result = bone.convert_local_to_pose(pose_matrix, rest_matrix,
+                                                    parent_matrix=Matrix(pose_matrices[frame, parent].tolist()),
+                                                    parent_matrix_local=parent_rest_matrix, invert=True)
+            else:
+                result = bone.convert_local_to_pose(pose_matrix, rest_matrix, invert=True)
+            basis[frame, j] = result
+    if special:
+        log.debug("상속 설정이 기본값이 아닌 본 %d개는 프레임마다 변환했습니다.", len(special))
+    return basis
+
+def matrices_to_quaternions(rotations):
+    """(n, 3, 3) 회전 행렬을 (n, 4) 쿼터니언 (w, x, y, z)으로 변환하는 함수"""
+    m = rotations
+    trace = m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2]
+    # 수치적으로 가장 안정적인 성분을 기준으로 계산 (w, x, y, z 중 가장 큰 값)
+    candidates = np.stack([trace, m[:, 0, 0], m[:, 1, 1], m[:, 2, 2]], axis=1)
+    case = np.argmax(candidates, axis=1)
+    quats = np.empty((len(m), 4))
+
+    for c in range(4):
+        sel = case == c
+        if not np.any(sel):
+            continue
+        r = m[sel]
+        if c == 0:
+            s = np.sqrt(1.0 + trace[sel]) * 2.0
+            quats[sel] = np.stack([0.25 * s, (r[:, 2, 1] - r[:, 1, 2]) / s,
+                                   (r[:, 0, 2] - r[:, 2, 0]) / s, (r[:, 1, 0] - r[:, 0, 1]) / s], axis=1)
+        elif c == 1:
+            s = np.sqrt(1.0 + r[:, 0, 0] - r[:, 1, 1] - r[:, 2, 2]) * 2.0
+            quats[sel] = np.stack([(r[:, 2, 1] - r[:, 1, 2]) / s, 0.25 * s,
+                                   (r[:, 0, 1] + r[:, 1, 0]) / s, (r[:, 0, 2] + r[:, 2, 0]) / s], axis=1)
+        elif c == 2:
+            s = np.sqrt(1.0 + r[:, 1, 1] - r[:, 0, 0] - r[:, 2, 2]) * 2.0
+            quats[sel] = np.stack([(r[:, 0, 2] - r[:, 2, 0]) / s, (r[:, 0, 1] + r[:, 1, 0]) / s,
+                                   0.25 * s, (r[:, 1, 2] + r[:, 2, 1]) / s], axis=1)
+        else:
+            s = np.sqrt(1.0 + r[:, 2, 2] - r[:, 0, 0] - r[:, 1, 1]) * 2.0
+            quats[sel] = np.stack([(r[:, 1, 0] - r[:, 0, 1]) / s, (r[:, 0, 2] + r[:, 2, 0]) / s,
+                                   (r[:, 1, 2] + r[:, 2, 1]) / s, 0.25 * s], axis=1)
+
+    return quats / np.linalg.norm(quats, axis=1, keepdims=True)
+
+def decompose_matrices(matrices):
+    """(n, 4, 4) 행렬을 location (n, 3), rotation_quaternion (n, 4), scale (n, 3)으로 분해하는 함수"""
+    locations = matrices[:, :3, 3]
+    linear = matrices[:, :3, :3]
+    scales = np.linalg.norm(linear, axis=1)
+    # 음수 스케일(반전)은 X축 스케일에 부호를 반영
+    scales[:, 0] *= np.sign(np.linalg.det(linear))
+    rotations = linear / np.where(np.abs(scales) > 1e-12, scales, 1.0)[:, np.newaxis, :]
+    return locations, matrices_to_quaternions(rotations), scales
+
+def quaternions_to_rotation_values(owner, quaternions):
+    """
+    쿼터니언 (n, 4)을 owner(오브젝트 또는 포즈 본)의 회전 모드에 맞는 (키 이름, 값 배열)로 변환하는 함수
+    회전 모드는 바꾸지 않습니다. 쿼터니언은 부호 연속성을, 오일러는 이전 프레임 값과의 compat을 유지합니다.
+    """
+    # 쿼터니언 부호 연속성 유지 (이전 프레임과 반대 방향이면 뒤집기)
+    flips = np.sum(quaternions[1:] * quaternions[:-1], axis=1) < 0
+    signs = np.concatenate([[1.0], np.cumprod(np.where(flips, -1.0, 1.0))])
+    quaternions = quaternions * signs[:, np.newaxis]
+
+    if owner.rotation_mode == 'QUATERNION':
+        return "rotation_quaternion", quaternions
+
+    if owner.rotation_mode == 'AXIS_ANGLE':
+        # (각도, x, y, z), 회전이 없으면 Blender 기본값처럼 Y축
+        w = np.clip(quaternions[:, 0], -1.0, 1.0)
+        half_sin = np.sqrt(1.0 - w * w)
+        axes = np.where(half_sin[:, np.newaxis] > 1e-8,
+                        quaternions[:, 1:] / np.maximum(half_sin, 1e-8)[:, np.newaxis], [0.0, 1.0, 0.0])
+        return "rotation_axis_angle", np.column_stack([2.0 * np.arccos(w), axes])
+
+    eulers = np.empty((len(quaternions), 3))
+    previous = owner.rotation_euler.copy()
+    for i, quaternion in enumerate(quaternions):
+        previous = Quaternion(quaternion).to_euler(owner.rotation_mode, previous)
+        eulers[i] = previous
+    return "rotation_euler", eulers
+
+def ensure_fcurve(action, owner, data_path, index, group_name):
+    """Blender 4.4+ 슬롯 액션과 이전 버전 모두에서 F-Curve를 가져오거나 생성하는 함수"""
+    if hasattr(action, "fcurve_ensure_for_datablock"):
+        return action.fcurve_ensure_for_datablock(owner, data_path, index=index, group_name=group_name)
+    fcurve = action.fcurves.find(data_path, index=index)
+    if fcurve is None:
+        fcurve = action.fcurves.new(data_path, index=index, action_group=group_name)
+    return fcurve
+
+def clear_keyframes_in_range(fcurve, frame_start, frame_end):
+    """frame_start ~ frame_end 구간 안의 기존 키를 지우는 함수 (구간 밖의 키는 유지)"""
+    points = fcurve.keyframe_points
+    count = len(points)
+    if not count:
+        return
+    existing = np.empty(count * 2, dtype=np.float32)
+    points.foreach_get("co", existing)
+    inside = np.flatnonzero((existing[0::2] >= frame_start - 1e-3) & (existing[0::2] <= frame_end + 1e-3))
+    if len(inside) == count and hasattr(points, "clear"):
+        points.clear()
+        return
+    for i in inside[::-1]:
+        points.remove(points[int(i)], fast=True)
+
+def write_keyframes(fcurve, frames, values):
+    """
+    키프레임들을 keyframe_points.add + foreach_set으로 한 번에 기록하는 함수
+    F-Curve에 이미 키가 있으면 frames 구간 안의 키는 새 값으로 바꾸고 구간 밖의 키는 남깁니다.
+    """
+    clear_keyframes_in_range(fcurve, frames[0], frames[-1])
+    points = fcurve.keyframe_points
+    start = len(points)
+    points.add(len(frames))
+    buffer = np.empty(len(points) * 2, dtype=np.float32)
+    if start:
+        points.foreach_get("co", buffer)
+    buffer[start * 2::2] = frames
+    buffer[start * 2 + 1::2] = values
+    points.foreach_set("co", buffer)
+    fcurve.update()  # 키 정렬과 핸들 재계산
+
+def write_pose_action(armature_obj, frames, basis, bone_names=None, action=None):
+    """
+    본 로컬 트랜스폼 (프레임, 본, 4, 4)을 액션의 키로 일괄 기록하는 함수
+    bone_names: basis의 본 순서 (없으면 armature_obj.pose.bones 순서)
+    action: 키를 기록할 액션 (없으면 "<아마추어>_Baked" 새 액션, 있으면 nla.bake의 use_current_action처럼
+            그 액션의 같은 채널에 기록하고 베이크 구간 밖의 키는 유지)
+    회전은 본마다 현재 rotation_mode(쿼터니언, 오일러, Axis Angle) 그대로 기록합니다.
+    """
+    if bone_names is None:
+        bone_names = [pose_bone.name for pose_bone in armature_obj.pose.bones]
+    frame_count, bone_count = basis.shape[:2]
+    locations, quaternions, scales = decompose_matrices(basis.reshape(-1, 4, 4))
+    locations = locations.reshape(frame_count, bone_count, 3)
+    quaternions = quaternions.reshape(frame_count, bone_count, 4)
+    scales = scales.reshape(frame_count, bone_count, 3)
+
+    if action is None:
+        action = bpy.data.actions.new(f"{armature_obj.name}_Baked")
+    animation_data = armature_obj.animation_data or armature_obj.animation_data_create()
+    if animation_data.action != action:
+        animation_data.action = action
+
+    pose_bones = armature_obj.pose.bones
+    for j, bone_name in enumerate(bone_names):
+        rotation_path, rotations = quaternions_to_rotation_values(pose_bones[bone_name], quaternions[:, j])
+        base_path = f'pose.bones["{bpy.utils.escape_identifier(bone_name)}"]'
+        for prop, values in (("location", locations[:, j]), (rotation_path, rotations), ("scale", scales[:, j])):
+            for index in range(values.shape[1]):
+                fcurve = ensure_fcurve(action, armature_obj, f"{base_path}.{prop}", index, bone_name)
+                write_keyframes(fcurve, frames, values[:, index])
+
+    return action
@@ -0,0 +1,263 @@
+"""
+Modal Job Runner
+무거운 스크립트를 시간 단위로 나눠서(chunk) 실행하고 진행률을 표시하는 모달 작업 프레임워크입니다.
+
+- 작업(job)은 진행률(0.0 ~ 1.0)을 yield 하는 제너레이터 함수입니다.
+  제너레이터가 return 한 값이 작업 결과가 됩니다.
+  워커 프로세스 등 외부 작업을 기다릴 때는 None을 yield 하면 다음 타이머 이벤트까지 쉽니다.
+- 타이머 이벤트마다 TIME_BUDGET 동안만 제너레이터를 진행시키므로 Blender UI가 멈추지 않습니다.
+- ESC(또는 우클릭)로 취소할 수 있으며, 롤백 방식에 따라 처리합니다.
+    'UNDO'      : 시작 전과 취소 시점에 Undo 단계를 남기고, 되돌리기(Ctrl+Z)는 사용자에게 맡김
+                  (모달 오퍼레이터 안에서 ed.undo()를 호출하면 불안정하므로 직접 되돌리지 않음)
+    'GENERATOR' : 제너레이터를 close() 하면 GeneratorExit 처리에서 작업이 직접 되돌림
+                  (새로 만든 데이터 블록 삭제, 바꾼 값 복원, 또는 데이터를 바꾸기 전에만 yield)
+    'UNDO'는 이름만 바꾸는 작업에만 쓰고, 데이터를 만들거나 지우는 작업은 'GENERATOR'로 등록합니다.
+- 진행률은 상태 바 텍스트, 마우스 커서 진행률, 사이드바 패널의 프로그레스 바로 표시됩니다.
+"""
+
+import bpy
+import importlib
+import importlib.util
+import os
+import sys
+import time
+
+TIME_BUDGET = 0.05       # 타이머 이벤트 한 번에 작업을 진행하는 최대 시간 (초)
+TIMER_INTERVAL = 0.01    # 타이머 이벤트 간격 (초)
+
+# (job_id, 표시 이름, 모듈 이름, 제너레이터 함수 이름, 롤백 방식)
+JOBS = [
+    ('UE_BAKE', "Convert Armature for UE", "Convert_Armature_for_UE", "iter_convert_armature_for_unreal", 'GENERATOR'),
+    ('BONE_TO_VERTEX', "Constraint Bone to Vertex", "Constraint_Bone_to_Vertex", "iter_constraint_bone_to_vertex", 'GENERATOR'),
+    ('RENAME_ACTIONS', "Rename Actions to Object Name", "Rename_Action_to_Object_Name", "iter_rename_actions_to_object_name", 'UNDO'),
+    ('RENAME_ALL_ACTIONS', "Rename All Actions to Object Name", "Rename_Action_to_Object_Name", "iter_rename_all_actions_to_object_name", 'UNDO'),
+    ('DEDUPLICATE_ACTIONS', "Deduplicate Actions", "Deduplicate_Actions", "iter_deduplicate_actions", 'GENERATOR'),
+    ('RENAME_ACTION_SLOTS', "Rename Action Slots to Object Name", "Rename_Action_Slots_to_Object_Name", "iter_rename_action_slots_to_object_name", 'UNDO'),
+    ('RENAME_BY_CONSTRAINTS', "Rename Objects by Constraints", "Rename_Objects_by_Constraints", "iter_rename_objects_by_constraints", 'UNDO'),
+    ('CREATE_CONTROLLERS', "Create Controllers", "Create_Controller_to_Selected_Object", "iter_create_controllers_for_selected_objects", 'GENERATOR'),
+    ('FLATTEN_CONTROLLERS', "Flatten Controller Constraints", "Flatten_Controller_Constraints", "iter_flatten_controller_constraints", 'GENERATOR'),
+    ('CONSTRAINT_COST', "Profile Constraint Cost", "Constraint_Cost_Profiler", "iter_profile_constraint_cost", 'GENERATOR'),
+]
+
+# 스크립트들이 공용으로 import 하는 모듈 (단독 실행 시 미리 불러서 sys.modules에 등록)
+SHARED_MODULES = ["Hot_Path_Profiler", "Buffered_Logger", "Shared_Utils", "Keyframe_Utils", "Sharded_Bake"]
+
+SCRIPT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# 현재 실행 중인 작업의 상태 (패널/상태 바 표시용)
+active_job = {
+    'label': "",
+    'progress': 0.0,
+    'running': False,
+}
+
+def get_job(job_id):
+    for job in JOBS:
+        if job[0] == job_id:
+            return job
+    raise KeyError(f"Unknown job: {job_id}")
+
+def load_script_module(module_name):
+    """
+    스크립트 모듈을 처음 사용할 때 불러오는 함수
+    애드온 패키지 안에서는 상대 import, 단독 실행 시에는 이 파일과 같은 폴더에서 불러옵니다.
+    """
+    if __package__:
+        return importlib.import_module(f"{__package__}.{module_name}")
+
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    path = os.path.join(SCRIPT_DIRECTORY, module_name + ".py")
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        del sys.modules[module_name]
+        raise
+    return module
+
+def load_shared_modules():
+    for module_name in SHARED_MODULES:
+        try:
+            load_script_module(module_name)
+        except (ImportError, OSError):
+            pass
+
+def flush_logs():
+    """작업 중 버퍼에 쌓인 스크립트 로그를 출력"""
+    logger_module = sys.modules.get(f"{__package__}.Buffered_Logger" if __package__ else "Buffered_Logger")
+    if logger_module:
+        logger_module.flush_all()
+
+def format_progress_text(label, progress):
+    filled = int(progress * 20)
+    return f"{label}  [{'█' * filled}{'░' * (20 - filled)}] {progress * 100:.0f}%   (ESC: 취소)"
+
+def tag_redraw_all(context):
+    if context.screen:
+        for area in context.screen.areas:
+            area.tag_redraw()
+
+
+class MW_OT_run_job(bpy.types.Operator):
+    """Run a heavy script in time-sliced chunks with a progress bar (ESC to cancel)"""
+    bl_idname = "mw.run_job"
+    bl_label = "Run Job"
+    bl_options = {'REGISTER'}
+
+    job_id: bpy.props.EnumProperty(
+        name="Job",
+        items=[(job[0], job[1], "") for job in JOBS],
+    )
+
+    def start(self, context):
+        _, label, module_name, function_name, rollback = get_job(self.job_id)
+        self.label = label
+        self.rollback = rollback
+        self.progress = 0.0
+
+        # 롤백 지점 기록
+        if rollback == 'UNDO':
+            bpy.ops.ed.undo_push(message=f"Before {label}")
+
+        load_shared_modules()
+        module = load_script_module(module_name)
+        # iter_* 를 직접 실행하면 동기 함수의 @profiled를 거치지 않으므로 작업 전체를 프로파일링 구간으로 감쌈
+        self.steps = load_script_module("Shared_Utils").profile_steps(getattr(module, function_name)(), function_name)
+
+        active_job.update(label=label, progress=0.0, running=True)
+
+    def finish(self, context, result):
+        active_job.update(progress=1.0, running=False)
+        flush_logs()
+        # 작업 전체를 하나의 Undo 단계로 기록
+        bpy.ops.ed.undo_push(message=self.label)
+        if result == {'CANCELLED'}:
+            self.report({'WARNING'}, f"{self.label}: 실행 조건이 맞지 않아 취소되었습니다.")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"{self.label}: 완료")
+        return {'FINISHED'}
+
+    def cancel_job(self, context, reason):
+        # 제너레이터에 GeneratorExit를 보내서 스스로 정리할 기회를 줌
+        self.steps.close()
+        active_job.update(running=False)
+        flush_logs()
+        if self.rollback == 'UNDO':
+            # 중간 상태를 Undo 단계로 남기고, 되돌리기는 사용자가 Ctrl+Z로 실행
+            bpy.ops.ed.undo_push(message=f"Cancel {self.label}")
+            self.report({'WARNING'}, f"{self.label}: {reason} (Ctrl+Z로 시작 전 상태로 되돌릴 수 있습니다)")
+        else:
+            self.report({'WARNING'}, f"{self.label}: {reason} (롤백 완료)")
+
+    def execute(self, context):
+        # 모달 없이 동기 실행 (스크립트/백그라운드 모드용)
+        self.start(context)
+        try:
+            result = load_script_module("Shared_Utils").run_steps(self.steps)
+        except Exception as e:
+            self.cancel_job(context, f"오류 발생 - {e}")
+            return {'CANCELLED'}
+        return self.finish(context, result)
+
+    def invoke(self, context, event):
+        if active_job['running']:
+            self.report({'WARNING'}, f"이미 실행 중인 작업이 있습니다: {active_job['label']}")
+            return {'CANCELLED'}
+
+        self.start(context)
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(TIMER_INTERVAL, window=context.window)
+        wm.progress_begin(0, 100)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type in {'ESC', 'RIGHTMOUSE'} and event.value == 'PRESS':
+            self.cleanup(context)
+            self.cancel_job(context, "사용자가 취소했습니다")
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER':
+            # 작업 중 다른 입력은 막아서 씬 상태가 바뀌지 않도록 함
+            return {'RUNNING_MODAL'}
+
+        deadline = time.perf_counter() + TIME_BUDGET
+        try:
+            while time.perf_counter() < deadline:
+                progress = next(self.steps)
+                if progress is None:
+                    break  # 외부 작업 대기 중: 다음 타이머 이벤트에 다시 확인
+                self.progress = min(max(float(progress), 0.0), 1.0)
+        except StopIteration as result:
+            self.cleanup(context)
+            return self.finish(context, result.value)
+        except Exception as e:
+            self.cleanup(context)
+            self.cancel_job(context, f"오류 발생 - {e}")
+            return {'CANCELLED'}
+
+        active_job['progress'] = self.progress
+        context.window_manager.progress_update(int(self.progress * 100))
+        context.workspace.status_text_set(format_progress_text(self.label, self.progress))
+        tag_redraw_all(context)
+        return {'RUNNING_MODAL'}
+
+    def cleanup(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+        tag_redraw_all(context)
+
+
+class MW_PT_job_runner(bpy.types.Panel):
+    """Run heavy scripts as cancellable jobs"""
+    bl_label = "MW Jobs"
+    bl_idname = "MW_PT_job_runner"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "MW"
+
+    def draw(self, context):
+        layout = self.layout
+
+        if active_job['running']:
+            # Blender 4.0+ 는 프로그레스 바 위젯 사용
+            if hasattr(layout, "progress"):
+                layout.progress(factor=active_job['progress'], type='BAR',
+                                text=f"{active_job['label']} {active_job['progress'] * 100:.0f}%")
+            else:
+                layout.label(text=format_progress_text(active_job['label'], active_job['progress']), icon='TIME')
+            layout.label(text="ESC: 취소")
+            return
+
+        column = layout.column(align=True)
+        for job_id, label, *_ in JOBS:
+            column.operator(MW_OT_run_job.bl_idname, text=label).job_id = job_id
+
+
+CLASSES = [
+    MW_OT_run_job,
+    MW_PT_job_runner,
+]
+
+def register():
+    for cls in CLASSES:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(CLASSES):
+        bpy.utils.unregister_class(cls)
+
+if __name__ == "__main__":
+    # 기존 등록 해제 (안전성)
+    try:
+        unregister()
+    except:
+        pass
+
+    register()
@@ -1,9 +1,9 @@
 bl_info = {
     "name": "Select by Name",
-    "blender": (3, 0, 0),
+    "blender": (3, 3, 0),
     "category": "Animation",
     "author": "HungLe93",
-    "version": (1, 0),
+    "version": (1, 1),
     "location": "Object Mode > Select > Select by name Or Pose Mode > Pose > Select by name ",
     "description": "Select object or bone by name. Press F5 and fill name.",
     "warning": "",
@@ -14,77 +14,418 @@ bl_info = {
 
 
 import bpy
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from heapq import nsmallest
+
+# == NAME INDEX
+NGRAM = 3
+DEFAULT_MAX_RESULTS = 100
+FUZZY_MIN_SCORE = 0.3
+# n-grams shared by more than this fraction of all names carry almost no
+# ranking information and are skipped while counting fuzzy overlaps
+FUZZY_COMMON_NGRAM_RATIO = 0.2
+WORD_SEPARATORS = "_.- |:/"
+
+KIND_OBJECT = 'OBJECT'
+KIND_BONE = 'BONE'
+
+
+def ngrams(text):
+    """Unique n-grams of an already lowercased string"""
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class NameIndex:
+    """
+    Inverted n-gram index over object names and the bone names of every armature.
+
+    Identical lowercase names share one term id, so 1000 copies of the same rig
+    cost one set of postings. Posting lists are compact arrays that are only
+    appended to; removed terms are skipped at query time and the postings are
+    compacted once enough of them pile up.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._terms = []            # term id -> lowercase name (None when freed)
+        self._term_ids = {}         # lowercase name -> term id
+        self._refs = []             # term id -> Counter{(kind, owner, label): count}
+        self._object_refs = []      # term id -> number of object users (fast kind filter)
+        self._postings = {}         # n-gram -> array of term ids
+        self._sorted = []           # live lowercase names, sorted (prefix search)
+        self._sorted_stale = True   # bulk edits rebuild the sorted list once instead
+        self._dead = 0
+
+        self._objects = {}          # object session_uid -> name
+        self._armatures = {}        # armature session_uid -> set of bone names
+
+        self.built = False
+        self.objects_dirty = True
+        self.armatures_dirty = True
+        self.dirty_armatures = set()
+
+    # -- term bookkeeping ---------------------------------------------------
+
+    def _add(self, kind, owner, label):
+        lower = label.lower()
+        term_id = self._term_ids.get(lower)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._terms.append(lower)
+            self._refs.append(Counter())
+            self._object_refs.append(0)
+            self._term_ids[lower] = term_id
+            for gram in ngrams(lower):
+                posting = self._postings.get(gram)
+                if posting is None:
+                    posting = self._postings[gram] = array('I')
+                posting.append(term_id)
+            if not self._sorted_stale:
+                insort(self._sorted, lower)
+        self._refs[term_id][(kind, owner, label)] += 1
+        if kind == KIND_OBJECT:
+            self._object_refs[term_id] += 1
+
+    def _remove(self, kind, owner, label):
+        lower = label.lower()
+        term_id = self._term_ids.get(lower)
+        if term_id is None:
+            return
+        refs = self._refs[term_id]
+        key = (kind, owner, label)
+        refs[key] -= 1
+        if refs[key] <= 0:
+            del refs[key]
+        if kind == KIND_OBJECT:
+            self._object_refs[term_id] -= 1
+        if refs:
+            return
+
+        # No user left: free the term, postings are skipped until compaction
+        self._terms[term_id] = None
+        del self._term_ids[lower]
+        if not self._sorted_stale:
+            pos = bisect_left(self._sorted, lower)
+            if pos < len(self._sorted) and self._sorted[pos] == lower:
+                del self._sorted[pos]
+        self._dead += 1
+
+    def _compact(self):
+        # Rebuild the term tables only; sync snapshots and dirty flags survive
+        all_refs = [refs for refs in self._refs if refs]
+        self._terms, self._term_ids, self._refs, self._object_refs = [], {}, [], []
+        self._postings, self._dead = {}, 0
+        self._sorted_stale = True
+        for refs in all_refs:
+            for (kind, owner, label), count in refs.items():
+                for _ in range(count):
+                    self._add(kind, owner, label)
+
+    # -- synchronisation with bpy.data -------------------------------------
+
+    @property
+    def object_count(self):
+        return len(self._objects)
+
+    def sync_object(self, obj):
+        """Pick up a single added or renamed object (called from handlers)"""
+        uid = obj.session_uid
+        old_name = self._objects.get(uid)
+        if old_name == obj.name:
+            return
+        if old_name is not None:
+            self._remove(KIND_OBJECT, 0, old_name)
+        self._objects[uid] = obj.name
+        self._add(KIND_OBJECT, 0, obj.name)
+
+    def sync_objects(self, objects):
+        """Diff all objects against the index (adds, removals and renames)"""
+        self._sorted_stale = True
+        current = {obj.session_uid: obj.name for obj in objects}
+        for uid, name in list(self._objects.items()):
+            if current.get(uid) != name:
+                self._remove(KIND_OBJECT, 0, name)
+                del self._objects[uid]
+        for uid, name in current.items():
+            if uid not in self._objects:
+                self._objects[uid] = name
+                self._add(KIND_OBJECT, 0, name)
+        self.objects_dirty = False
+
+    def sync_armature(self, armature):
+        """Diff the bone names of one armature datablock against the index"""
+        uid = armature.session_uid
+        old_names = self._armatures.get(uid, set())
+        new_names = {bone.name for bone in armature.bones}
+        for name in old_names - new_names:
+            self._remove(KIND_BONE, uid, name)
+        for name in new_names - old_names:
+            self._add(KIND_BONE, uid, name)
+        self._armatures[uid] = new_names
+
+    def sync_armatures(self, armatures):
+        """Diff every armature datablock, dropping bones of deleted armatures"""
+        self._sorted_stale = True
+        alive = set()
+        for armature in armatures:
+            alive.add(armature.session_uid)
+            self.sync_armature(armature)
+        for uid in list(self._armatures):
+            if uid not in alive:
+                for name in self._armatures.pop(uid):
+                    self._remove(KIND_BONE, uid, name)
+        self.armatures_dirty = False
+        self.dirty_armatures.clear()
+
+    def ensure_synced(self):
+        """Apply pending changes; a full build only happens the first time"""
+        if self.objects_dirty:
+            self.sync_objects(bpy.data.objects)
+        if self.armatures_dirty:
+            self.sync_armatures(bpy.data.armatures)
+        elif self.dirty_armatures:
+            for armature in bpy.data.armatures:
+                if armature.session_uid in self.dirty_armatures:
+                    self.sync_armature(armature)
+            self.dirty_armatures.clear()
+        if self._dead > 1000 and self._dead > len(self._term_ids) // 4:
+            self._compact()
+        if self._sorted_stale:
+            self._sorted = sorted(self._term_ids)
+            self._sorted_stale = False
+        self.built = True
+
+    # -- queries ------------------------------------------------------------
+
+    def _labels(self, term_id, kind, owners):
+        for (ref_kind, owner, label) in self._refs[term_id]:
+            if ref_kind == kind and (owners is None or owner in owners):
+                yield label
+
+    def search(self, query, kind=KIND_OBJECT, owners=None, mode='ALL', limit=DEFAULT_MAX_RESULTS):
+        """
+        Ranked name search.
+
+        mode: 'ALL' (prefix, then substring, then fuzzy), 'PREFIX', 'SUBSTRING' or 'FUZZY'.
+        owners: armature session_uids to restrict bone results to (None = all).
+        Returns at most `limit` distinct labels, best match first.
+        """
+        query = query.strip().lower()
+        terms = self._terms
+        object_refs = self._object_refs
+
+        def accepted(term_id):
+            if kind == KIND_OBJECT:
+                return object_refs[term_id] > 0
+            return any(True for _ in self._labels(term_id, kind, owners))
+
+        ranked = []  # (rank tuple, term id)
+        seen = set()
+
+        # Prefix (and exact) matches straight from the sorted name list.
+        # Sorted order already ranks them, so the scan stops at the cap.
+        if mode in {'ALL', 'PREFIX'}:
+            pos = bisect_left(self._sorted, query)
+            while pos < len(self._sorted) and len(ranked) < limit:
+                term = self._sorted[pos]
+                if not term.startswith(query):
+                    break
+                term_id = self._term_ids[term]
+                if accepted(term_id):
+                    ranked.append(((0 if term == query else 1, pos), term_id))
+                    seen.add(term_id)
+                pos += 1
+
+        # Substring matches: verify the rarest n-gram's postings only.
+        # Queries shorter than one n-gram scan all names but stop at the cap.
+        if query and mode in {'ALL', 'SUBSTRING'}:
+            grams = ngrams(query)
+            if grams:
+                rarest = min((self._postings.get(gram, ()) for gram in grams), key=len)
+                candidates = set(rarest)
+            elif len(ranked) < limit:
+                candidates = range(len(terms))
+            else:
+                candidates = ()
+            found = 0
+            for term_id in candidates:
+                term = terms[term_id]
+                if term is None or term_id in seen:
+                    continue
+                pos = term.find(query)
+                if pos < 0 or not accepted(term_id):
+                    continue
+                at_word = pos == 0 or term[pos - 1] in WORD_SEPARATORS
+                ranked.append(((2 if at_word else 3, pos, len(term)), term_id))
+                seen.add(term_id)
+                found += 1
+                if not grams and found >= limit:
+                    break
+
+        # Fuzzy matches by n-gram overlap (Dice coefficient)
+        if mode == 'FUZZY' or (mode == 'ALL' and len(ranked) < limit):
+            grams = ngrams(query)
+            if grams:
+                live = max(len(self._term_ids), 1)
+                postings = [self._postings.get(gram, ()) for gram in grams]
+                informative = [p for p in postings if len(p) <= live * FUZZY_COMMON_NGRAM_RATIO]
+                overlap = Counter()
+                for posting in (informative or postings):
+                    overlap.update(posting)
+                for term_id, shared in overlap.items():
+                    term = terms[term_id]
+                    if term is None or term_id in seen:
+                        continue
+                    score = 2.0 * shared / (len(grams) + max(len(term) - NGRAM + 1, 1))
+                    if score >= FUZZY_MIN_SCORE and accepted(term_id):
+                        ranked.append(((4, -score, len(term)), term_id))
+
+        # Same bone name on several armatures is offered once
+        results = {}
+        for _, term_id in nsmallest(limit, ranked):
+            results.update(dict.fromkeys(self._labels(term_id, kind, owners)))
+        return list(results)[:limit]
+
+
+name_index = NameIndex()
+
+
+# == HANDLERS
+# The index follows edits incrementally: depsgraph updates resync single
+# objects, renames arrive through the message bus, and anything that changes
+# the object count or bone set is diffed lazily on the next search.
+_msgbus_owner = object()
+
+
+def _mark_objects_dirty(*args):
+    name_index.objects_dirty = True
+
+
+def _mark_armatures_dirty(*args):
+    name_index.armatures_dirty = True
+
+
+def subscribe_renames():
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    bpy.msgbus.subscribe_rna(key=(bpy.types.Object, "name"), owner=_msgbus_owner,
+                             args=(), notify=_mark_objects_dirty)
+    bpy.msgbus.subscribe_rna(key=(bpy.types.Bone, "name"), owner=_msgbus_owner,
+                             args=(), notify=_mark_armatures_dirty)
+
+
+@bpy.app.handlers.persistent
+def on_depsgraph_update(scene, depsgraph):
+    if not name_index.built:
+        return
+    if len(bpy.data.objects) != name_index.object_count:
+        name_index.objects_dirty = True
+    for update in depsgraph.updates:
+        datablock = update.id.original
+        if isinstance(datablock, bpy.types.Object):
+            if not name_index.objects_dirty:
+                name_index.sync_object(datablock)
+        elif isinstance(datablock, bpy.types.Armature):
+            name_index.dirty_armatures.add(datablock.session_uid)
+
+
+@bpy.app.handlers.persistent
+def on_load_post(*args):
+    name_index.clear()
+    subscribe_renames()
+
+
+@bpy.app.handlers.persistent
+def on_undo_redo(*args):
+    name_index.objects_dirty = True
+    name_index.armatures_dirty = True
+
+
+HANDLERS = [
+    (bpy.app.handlers.depsgraph_update_post, on_depsgraph_update),
+    (bpy.app.handlers.load_post, on_load_post),
+    (bpy.app.handlers.undo_post, on_undo_redo),
+    (bpy.app.handlers.redo_post, on_undo_redo),
+]
+
+
+def pose_armatures(context):
+    """Armature objects currently in pose mode (multi-object pose mode aware)"""
+    objects = getattr(context, "objects_in_mode", None) or [context.active_object]
+    return [obj for obj in objects if obj and obj.type == 'ARMATURE']
+
+
+def search_names(self, context, edit_text):
+    name_index.ensure_synced()
+    if context.mode == 'POSE':
+        owners = {obj.data.session_uid for obj in pose_armatures(context)}
+        return name_index.search(edit_text, KIND_BONE, owners, self.match_mode, self.max_results)
+    return name_index.search(edit_text, KIND_OBJECT, None, self.match_mode, self.max_results)
+
 
 # == OPERATORS
 class OBJECT_OT_select_by_name(bpy.types.Operator):
     bl_idname = "object.select_by_name"
     bl_label = "Select by Name"
-    bl_property = "object_enum"
-
-    filter_string: bpy.props.StringProperty(name="Filter String", description="Enter search string to filter items")
-    
-    def get_items(self, context):
-        items = []
-        filter_string_lower = self.filter_string.lower()
-        
-        if context.mode == 'POSE':
-            # Check if in Pose mode, then find bones
-            armature = context.active_object
-            if armature and armature.type == 'ARMATURE':
-                for bone in armature.pose.bones:
-                    if filter_string_lower in bone.name.lower():
-                        items.append((bone.name, bone.name, ""))
-        
-        else:
-            # Default to searching objects
-            for obj in bpy.data.objects:
-                if filter_string_lower in obj.name.lower():
-                    items.append((obj.name, obj.name, ""))
-        
-        if not items:
-            items.append(("NONE", "No items found", ""))
-        return items
+    bl_property = "name"
 
-    object_enum: bpy.props.EnumProperty(items=get_items, name='Name', description="Filtered items")
+    name: bpy.props.StringProperty(name="Name", description="Type to search object or bone names",
+                                   search=search_names)
+    match_mode: bpy.props.EnumProperty(
+        name="Match",
+        items=[
+            ('ALL', "Best", "Prefix, then substring, then fuzzy matches"),
+            ('PREFIX', "Prefix", "Names starting with the search text"),
+            ('SUBSTRING', "Contains", "Names containing the search text"),
+            ('FUZZY', "Fuzzy", "Names sharing most n-grams with the search text"),
+        ],
+        default='ALL',
+    )
+    max_results: bpy.props.IntProperty(name="Max Results", default=DEFAULT_MAX_RESULTS, min=1, max=10000)
 
     def execute(self, context):
         if context.mode == 'POSE':
             # Select bone in Pose mode
-            armature = context.active_object
-            if armature and armature.type == 'ARMATURE':
-                bone = armature.pose.bones.get(self.object_enum)
-                if bone:
-                    bpy.ops.pose.select_all(action='DESELECT')
-                    bone.bone.select = True
-                    context.view_layer.objects.active = armature
-                    self.report({'INFO'}, f"Selected bone: {bone.name}")
-                else:
-                    self.report({'ERROR'}, f"Bone '{self.object_enum}' not found in active armature")
-            else:
+            armatures = [obj for obj in pose_armatures(context) if self.name in obj.pose.bones]
+            if armatures:
+                bpy.ops.pose.select_all(action='DESELECT')
+                for armature in armatures:
+                    armature.pose.bones[self.name].bone.select = True
+                context.view_layer.objects.active = armatures[0]
+                self.report({'INFO'}, f"Selected bone: {self.name}")
+            elif not pose_armatures(context):
                 self.report({'ERROR'}, "No active armature in Pose mode")
-        
+            else:
+                self.report({'ERROR'}, f"Bone '{self.name}' not found in active armature")
+
         else:
             # Select object in Object mode
-            obj = bpy.data.objects.get(self.object_enum)
+            obj = bpy.data.objects.get(self.name)
             if obj:
                 bpy.ops.object.select_all(action='DESELECT')
                 obj.select_set(True)
                 context.view_layer.objects.active = obj
                 self.report({'INFO'}, f"Selected object: {obj.name}")
             else:
-                self.report({'ERROR'}, f"Object '{self.object_enum}' not found in scene")
-        
+                self.report({'ERROR'}, f"Object '{self.name}' not found in scene")
+
         return {'FINISHED'}
 
     def invoke(self, context, event):
-        self.filter_string = ""
-        context.window_manager.invoke_search_popup(self)
-        return {'RUNNING_MODAL'}
+        self.name = ""
+        name_index.ensure_synced()
+        return context.window_manager.invoke_props_dialog(self)
 
     def draw(self, context):
         layout = self.layout
-        layout.prop(self, "filter_string", text="Filter")
-        layout.prop(self, "object_enum", text="Item")
+        layout.activate_init = True
+        layout.prop(self, "name", text="Item")
+        row = layout.row()
+        row.prop(self, "match_mode", expand=True)
+        layout.prop(self, "max_results")
 
 # == MAIN ROUTINE
 CLASSES = [
@@ -95,6 +436,12 @@ def register():
     for cls in CLASSES:
         bpy.utils.register_class(cls)
 
+    for handler_list, handler in HANDLERS:
+        if handler not in handler_list:
+            handler_list.append(handler)
+    name_index.clear()
+    subscribe_renames()
+
     # Add operator to the Select menu in the 3D Viewport for both Object Mode and Pose Mode
     bpy.types.VIEW3D_MT_select_object.append(menu_func)
     bpy.types.VIEW3D_MT_pose.append(menu_func)
@@ -109,6 +456,12 @@ def unregister():
     for cls in CLASSES:
         bpy.utils.unregister_class(cls)
 
+    for handler_list, handler in HANDLERS:
+        if handler in handler_list:
+            handler_list.remove(handler)
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    name_index.clear()
+
     # Remove from the Select menu in the 3D Viewport
     bpy.types.VIEW3D_MT_select_object.remove(menu_func)
     bpy.types.VIEW3D_MT_pose.remove(menu_func)
@@ -1,6 +1,16 @@
 import bpy
 
+try:
+    from .Shared_Utils import profiled, run_steps
+except ImportError:
+    from Shared_Utils import profiled, run_steps
+
+@profiled()
 def rename_action_slots_to_object_name():
+    """동기 실행 버전 (Modal_Job_Runner에서는 iter_ 버전을 단계별로 실행)"""
+    return run_steps(iter_rename_action_slots_to_object_name())
+
+def iter_rename_action_slots_to_object_name():
     """
     선택된 오브젝트들의 액션 슬롯 name_display를 해당 오브젝트 이름으로 변경하는 함수
     (블렌더 4.4+ 액션 슬롯 시스템 대응)
@@ -15,7 +25,8 @@ def rename_action_slots_to_object_name():
     
     processed_count = 0
     
-    for obj in selected_objects:
+    for index, obj in enumerate(selected_objects):
+        yield index / len(selected_objects)
         print(f"\n오브젝트 '{obj.name}' 처리 중...")
         
         # 오브젝트에 애니메이션 데이터가 있는지 확인
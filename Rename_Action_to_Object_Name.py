@@ -1,6 +1,19 @@
 import bpy
 
+try:
+    from .Shared_Utils import profiled, get_logger, DEBUG, run_steps, rename_action_to_object_name
+except ImportError:
+    from Shared_Utils import profiled, get_logger, DEBUG, run_steps, rename_action_to_object_name
+
+log = get_logger("Rename_Action_to_Object_Name")
+
+@profiled()
+@log.flushing
 def rename_actions_to_object_name():
+    """동기 실행 버전 (Modal_Job_Runner에서는 iter_ 버전을 단계별로 실행)"""
+    return run_steps(iter_rename_actions_to_object_name())
+
+def iter_rename_actions_to_object_name():
     """
     선택된 오브젝트들의 액션 이름을 해당 오브젝트 이름으로 변경하는 함수
     (bpy.data.actions[""].name을 변경)
@@ -10,53 +23,48 @@ def rename_actions_to_object_name():
     selected_objects = bpy.context.selected_objects
     
     if not selected_objects:
-        print("선택된 오브젝트가 없습니다.")
+        log.warning("선택된 오브젝트가 없습니다.")
         return {'CANCELLED'}
     
     processed_count = 0
     
-    for obj in selected_objects:
-        print(f"\n오브젝트 '{obj.name}' 처리 중...")
-        
+    for index, obj in enumerate(selected_objects):
+        yield index / len(selected_objects)
         # 오브젝트에 애니메이션 데이터가 있는지 확인
         if not obj.animation_data:
-            print(f"  - 애니메이션 데이터가 없습니다.")
+            log.item("애니메이션 데이터 없음", "오브젝트 '%s': 애니메이션 데이터가 없습니다.", obj.name, message_level=DEBUG)
             continue
         
         # 액션이 있는지 확인
         if not obj.animation_data.action:
-            print(f"  - 액션이 없습니다.")
+            log.item("액션 없음", "오브젝트 '%s': 액션이 없습니다.", obj.name, message_level=DEBUG)
             continue
         
         action = obj.animation_data.action
         old_action_name = action.name
         
-        # 액션 이름을 오브젝트 이름으로 변경
-        new_action_name = obj.name
-        
-        # 동일한 이름의 액션이 이미 존재하는지 확인
-        if new_action_name in bpy.data.actions and bpy.data.actions[new_action_name] != action:
-            # 중복 방지를 위해 숫자 접미사 추가
-            counter = 1
-            while f"{new_action_name}.{counter:03d}" in bpy.data.actions:
-                counter += 1
-            new_action_name = f"{new_action_name}.{counter:03d}"
-            print(f"  - 중복 방지: 액션 이름을 '{new_action_name}'로 설정")
-        
-        # 액션 이름 변경
-        action.name = new_action_name
+        # 액션 이름을 오브젝트 이름으로 변경 (동일한 이름의 액션이 이미 있으면 숫자 접미사 추가)
+        new_action_name = rename_action_to_object_name(action, obj.name)
+        if new_action_name != obj.name:
+            log.item("중복 방지", "중복 방지: 액션 이름을 '%s'로 설정", new_action_name, message_level=DEBUG)
         
-        print(f"  - 액션 이름 변경: '{old_action_name}' → '{new_action_name}'")
+        log.item("액션 이름 변경", "오브젝트 '%s': 액션 이름 '%s' → '%s'", obj.name, old_action_name, new_action_name)
         processed_count += 1
     
     if processed_count > 0:
-        print(f"\n총 {processed_count}개의 액션 이름이 변경되었습니다.")
+        log.info("총 %d개의 액션 이름이 변경되었습니다.", processed_count)
         return {'FINISHED'}
     else:
-        print("\n변경된 액션이 없습니다.")
+        log.info("변경된 액션이 없습니다.")
         return {'CANCELLED'}
 
+@profiled()
+@log.flushing
 def rename_all_actions_to_object_name():
+    """동기 실행 버전 (Modal_Job_Runner에서는 iter_ 버전을 단계별로 실행)"""
+    return run_steps(iter_rename_all_actions_to_object_name())
+
+def iter_rename_all_actions_to_object_name():
     """
     씬의 모든 오브젝트에 대해 액션 이름을 오브젝트 이름으로 변경하는 함수 (선택 여부 무관)
     """
@@ -64,9 +72,11 @@ def rename_all_actions_to_object_name():
     all_objects = bpy.data.objects
     processed_count = 0
     
-    print("씬의 모든 오브젝트를 대상으로 액션 이름을 변경합니다...")
+    log.info("씬의 모든 오브젝트를 대상으로 액션 이름을 변경합니다...")
     
-    for obj in all_objects:
+    for index, obj in enumerate(all_objects):
+        if index % 100 == 0:
+            yield index / len(all_objects)
         # 오브젝트에 애니메이션 데이터가 있는지 확인
         if not obj.animation_data or not obj.animation_data.action:
             continue
@@ -78,60 +88,48 @@ def rename_all_actions_to_object_name():
         if action.name == obj.name:
             continue  # 이미 올바른 이름
         
-        # 액션 이름을 오브젝트 이름으로 변경
-        new_action_name = obj.name
-        
-        # 동일한 이름의 액션이 이미 존재하는지 확인
-        if new_action_name in bpy.data.actions and bpy.data.actions[new_action_name] != action:
-            # 중복 방지를 위해 숫자 접미사 추가
-            counter = 1
-            while f"{new_action_name}.{counter:03d}" in bpy.data.actions:
-                counter += 1
-            new_action_name = f"{new_action_name}.{counter:03d}"
-        
-        # 액션 이름 변경
-        action.name = new_action_name
+        # 액션 이름을 오브젝트 이름으로 변경 (동일한 이름의 액션이 이미 있으면 숫자 접미사 추가)
+        new_action_name = rename_action_to_object_name(action, obj.name)
         
-        print(f"오브젝트 '{obj.name}': 액션 이름 '{old_action_name}' → '{new_action_name}'")
+        log.item("액션 이름 변경", "오브젝트 '%s': 액션 이름 '%s' → '%s'", obj.name, old_action_name, new_action_name)
         processed_count += 1
     
     if processed_count > 0:
-        print(f"\n총 {processed_count}개의 액션 이름이 변경되었습니다.")
+        log.info("총 %d개의 액션 이름이 변경되었습니다.", processed_count)
         return {'FINISHED'}
     else:
-        print("\n변경된 액션이 없습니다.")
+        log.info("변경된 액션이 없습니다.")
         return {'CANCELLED'}
 
 # 스크립트 실행
 if __name__ == "__main__":
-    print("=" * 60)
-    print("액션 이름을 오브젝트 이름으로 변경하는 스크립트")
-    print("=" * 60)
+    log.info("=" * 60)
+    log.info("액션 이름을 오브젝트 이름으로 변경하는 스크립트")
+    log.info("=" * 60)
     
-    # 선택된 오브젝트 정보 출력
+    # 선택된 오브젝트 정보 출력 (DEBUG 레벨에서만 오브젝트별 출력)
     selected = bpy.context.selected_objects
     
     if selected:
-        print(f"선택된 오브젝트: {len(selected)}개")
-        for obj in selected:
-            has_action = obj.animation_data and obj.animation_data.action
-            action_name = obj.animation_data.action.name if has_action else "없음"
-            print(f"  - {obj.name} (액션: {action_name})")
-        
-        print("\n선택된 오브젝트들의 액션 이름을 변경합니다...")
+        log.info("선택된 오브젝트: %d개", len(selected))
+        if log.is_enabled_for(DEBUG):
+            for obj in selected:
+                has_action = obj.animation_data and obj.animation_data.action
+                action_name = obj.animation_data.action.name if has_action else "없음"
+                log.debug("  - %s (액션: %s)", obj.name, action_name)
+        
+        log.info("선택된 오브젝트들의 액션 이름을 변경합니다...")
         result = rename_actions_to_object_name()
         
     else:
-        print("선택된 오브젝트가 없습니다.")
-        print("씬의 모든 오브젝트를 대상으로 처리하시겠습니까? (y/n)")
-        print("(스크립트에서는 자동으로 모든 오브젝트 처리)")
-        
+        log.info("선택된 오브젝트가 없어 씬의 모든 오브젝트를 대상으로 처리합니다.")
         result = rename_all_actions_to_object_name()
     
-    print(f"\n실행 결과: {result}")
+    log.info("실행 결과: %s", result)
     
-    # 처리 후 액션 목록 출력
-    print("\n현재 씬의 액션 목록:")
-    for i, action in enumerate(bpy.data.actions, 1):
-        users_count = action.users
-        print(f"  {i}. '{action.name}' (사용자: {users_count}개)")
\ No newline at end of file
+    # 처리 후 액션 목록 출력 (DEBUG 레벨에서만)
+    if log.is_enabled_for(DEBUG):
+        log.debug("현재 씬의 액션 목록:")
+        for i, action in enumerate(bpy.data.actions, 1):
+            log.debug("  %d. '%s' (사용자: %d개)", i, action.name, action.users)
+    log.flush()
@@ -1,5 +1,10 @@
 import bpy
 
+try:
+    from .Shared_Utils import profiled, run_steps
+except ImportError:
+    from Shared_Utils import profiled, run_steps
+
 def get_constraint_targets(obj):
     """
     주어진 오브젝트의 컨스트레인트 타겟들을 찾아 반환하는 함수
@@ -22,7 +27,12 @@ def get_constraint_targets(obj):
     
     return targets
 
+@profiled()
 def rename_objects_by_constraints():
+    """동기 실행 버전 (Modal_Job_Runner에서는 iter_ 버전을 단계별로 실행)"""
+    return run_steps(iter_rename_objects_by_constraints())
+
+def iter_rename_objects_by_constraints():
     """
     선택된 오브젝트들의 이름을 연결된 컨스트레인트 타겟 오브젝트 이름을 기반으로 변경하는 함수
     이름 형식: "CTRL_" + 연결된 오브젝트의 이름
@@ -37,7 +47,8 @@ def rename_objects_by_constraints():
     
     renamed_count = 0
     
-    for obj in selected_objects:
+    for index, obj in enumerate(selected_objects):
+        yield index / len(selected_objects)
         # 현재 오브젝트의 컨스트레인트 타겟들 찾기
         targets = get_constraint_targets(obj)
         
@@ -76,7 +87,12 @@ def rename_objects_by_constraints():
     
     return {'FINISHED'}
 
+@profiled()
 def rename_objects_by_specific_constraint_type(constraint_type=None):
+    """동기 실행 버전 (Modal_Job_Runner에서는 iter_ 버전을 단계별로 실행)"""
+    return run_steps(iter_rename_objects_by_specific_constraint_type(constraint_type))
+
+def iter_rename_objects_by_specific_constraint_type(constraint_type=None):
     """
     특정 컨스트레인트 타입만을 기준으로 오브젝트 이름을 변경하는 함수
     constraint_type: 'COPY_LOCATION', 'COPY_ROTATION', 'TRACK_TO' 등
@@ -90,7 +106,8 @@ def rename_objects_by_specific_constraint_type(constraint_type=None):
     
     renamed_count = 0
     
-    for obj in selected_objects:
+    for index, obj in enumerate(selected_objects):
+        yield index / len(selected_objects)
         target_found = None
         
         # 오브젝트 레벨 컨스트레인트 확인
@@ -0,0 +1,274 @@
+"""
+Scene Health Linter
+씬의 오브젝트, 컨스트레인트, 포즈 본을 한 번만 순회하면서 여러 검사 규칙(rule)을 동시에 평가하는 스크립트
+
+- 기본 규칙: Non-Unit Scale, 쓸모없는 Empty, 잘못된 컨스트레인트 타겟, 사용되지 않는 액션,
+  Child Of 사용처가 없는 컨트롤러
+- 규칙은 LintRule을 상속해서 LINT_RULES에 추가하면 같은 순회에서 함께 평가됩니다.
+- 결과는 규칙별 리포트 하나로 모이고, 원하는 규칙의 오브젝트만 선택할 수 있습니다.
+"""
+
+import bpy
+import numpy as np
+import time
+
+try:
+    from .Shared_Utils import profiled
+except ImportError:
+    from Shared_Utils import profiled
+
+SCALE_TOLERANCE = 0.0001
+CONTROLLER_SUFFIX = "_CTRL"   # Create_Controller_to_Selected_Object에서 만든 컨트롤러 이름
+
+class LintScan:
+    """한 번의 순회에서 모은, 여러 규칙이 공유하는 씬 정보"""
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.objects = list(scene.objects)
+        self.object_set = set(self.objects)
+        self.parents = set()              # 자식이 있는 오브젝트
+        self.constraint_targets = set()   # 컨스트레인트 타겟으로 쓰이는 오브젝트
+        self.child_of_targets = set()     # Child Of 컨스트레인트 타겟으로 쓰이는 오브젝트
+
+        # 오브젝트 단위 값은 foreach_get으로 한 번에 읽기
+        self.scales = np.empty(len(self.objects) * 3, dtype=np.float32)
+        scene.objects.foreach_get("scale", self.scales)
+        self.scales = self.scales.reshape(-1, 3)
+
+
+class LintRule:
+    """
+    검사 규칙의 기본 클래스
+    visit_object / visit_constraint는 순회 중에 호출되고 (재정의한 규칙만 호출),
+    finish는 순회가 끝난 뒤 (대상, 메시지) 리스트를 반환합니다.
+    대상이 씬의 오브젝트면 리포트에서 선택할 수 있습니다.
+    """
+    rule_id = ""
+    label = ""
+
+    def visit_object(self, obj, scan):
+        pass
+
+    def visit_constraint(self, owner_obj, owner_name, constraint, scan):
+        pass
+
+    def finish(self, scan):
+        return []
+
+
+class NonUnitScaleRule(LintRule):
+    rule_id = 'NON_UNIT_SCALE'
+    label = "Non-Unit Scale"
+
+    def finish(self, scan):
+        rows = np.flatnonzero(np.any(np.abs(scan.scales - 1.0) > SCALE_TOLERANCE, axis=1))
+        return [(scan.objects[i], "Scale({:.3f}, {:.3f}, {:.3f})".format(*scan.scales[i])) for i in rows]
+
+
+class UselessEmptyRule(LintRule):
+    rule_id = 'USELESS_EMPTY'
+    label = "Useless Empty"
+
+    def __init__(self):
+        self.empties = []
+
+    def visit_object(self, obj, scan):
+        # 콜렉션 인스턴스 Empty는 그 자체로 의미가 있으므로 제외
+        if obj.type == 'EMPTY' and obj.instance_type != 'COLLECTION':
+            self.empties.append(obj)
+
+    def finish(self, scan):
+        return [(obj, "자식 없음, 컨스트레인트 타겟 아님") for obj in self.empties
+                if obj not in scan.parents and obj not in scan.constraint_targets]
+
+
+class DanglingConstraintTargetRule(LintRule):
+    rule_id = 'DANGLING_TARGET'
+    label = "Dangling Constraint Target"
+
+    def __init__(self):
+        self.issues = []
+
+    def visit_constraint(self, owner_obj, owner_name, constraint, scan):
+        if not hasattr(constraint, "target"):
+            if not constraint.is_valid:
+                self.issues.append((owner_obj, f"{owner_name}: '{constraint.name}' 설정이 올바르지 않습니다"))
+            return
+
+        target = constraint.target
+        if target is None:
+            message = "타겟이 없습니다"
+        elif target not in scan.object_set:
+            message = f"타겟 '{target.name}'이(가) 씬에 없습니다"
+        elif getattr(constraint, "subtarget", "") and target.type == 'ARMATURE' \
+                and constraint.subtarget not in target.data.bones:
+            message = f"본 '{constraint.subtarget}'이(가) '{target.name}'에 없습니다"
+        elif getattr(constraint, "subtarget", "") and target.type == 'MESH' \
+                and constraint.subtarget not in target.vertex_groups:
+            message = f"버텍스 그룹 '{constraint.subtarget}'이(가) '{target.name}'에 없습니다"
+        elif not constraint.is_valid:
+            message = "설정이 올바르지 않습니다"
+        else:
+            return
+        self.issues.append((owner_obj, f"{owner_name}: '{constraint.name}' {message}"))
+
+    def finish(self, scan):
+        return self.issues
+
+
+class OrphanActionRule(LintRule):
+    rule_id = 'ORPHAN_ACTION'
+    label = "Orphan Action"
+
+    def finish(self, scan):
+        # 가짜 사용자(Fake User)를 제외한 실제 사용자가 없는 액션
+        return [(action, f"사용자 없음 (Fake User: {'예' if action.use_fake_user else '아니오'})")
+                for action in bpy.data.actions
+                if action.users - int(action.use_fake_user) <= 0]
+
+
+class UnusedControllerRule(LintRule):
+    rule_id = 'UNUSED_CONTROLLER'
+    label = "Controller without Child Of"
+
+    def __init__(self):
+        self.controllers = []
+
+    def visit_object(self, obj, scan):
+        if obj.name.endswith(CONTROLLER_SUFFIX):
+            self.controllers.append(obj)
+
+    def finish(self, scan):
+        return [(obj, "이 컨트롤러를 타겟으로 하는 Child Of 컨스트레인트가 없습니다")
+                for obj in self.controllers if obj not in scan.child_of_targets]
+
+
+# 같은 순회에서 평가할 규칙 (규칙을 추가하려면 LintRule 하위 클래스를 여기에 추가)
+LINT_RULES = [
+    NonUnitScaleRule,
+    UselessEmptyRule,
+    DanglingConstraintTargetRule,
+    OrphanActionRule,
+    UnusedControllerRule,
+]
+
+last_report = {}
+
+def is_overridden(rule, method_name):
+    return getattr(type(rule), method_name) is not getattr(LintRule, method_name)
+
+def record_constraint(scan, owner_obj, owner_name, constraint, constraint_visitors):
+    target = getattr(constraint, "target", None)
+    if target is not None:
+        scan.constraint_targets.add(target)
+        if constraint.type == 'CHILD_OF':
+            scan.child_of_targets.add(target)
+    # Armature 컨스트레인트 등 여러 타겟을 가진 경우
+    for constraint_target in getattr(constraint, "targets", ()):
+        if constraint_target.target is not None:
+            scan.constraint_targets.add(constraint_target.target)
+    for visit in constraint_visitors:
+        visit(owner_obj, owner_name, constraint, scan)
+
+@profiled()
+def lint_scene(scene=None, rule_classes=None):
+    """
+    씬을 한 번 순회하면서 모든 규칙을 평가하고 리포트를 반환하는 함수
+    반환값: {rule_id: {'label': str, 'issues': [(대상, 메시지), ...]}}
+    """
+    start = time.perf_counter()
+    scene = scene or bpy.context.scene
+    rules = [rule_class() for rule_class in (rule_classes or LINT_RULES)]
+    scan = LintScan(scene)
+
+    object_visitors = [rule.visit_object for rule in rules if is_overridden(rule, "visit_object")]
+    constraint_visitors = [rule.visit_constraint for rule in rules if is_overridden(rule, "visit_constraint")]
+
+    # 오브젝트, 오브젝트 컨스트레인트, 포즈 본 컨스트레인트를 한 번만 순회
+    for obj in scan.objects:
+        if obj.parent is not None:
+            scan.parents.add(obj.parent)
+
+        for visit in object_visitors:
+            visit(obj, scan)
+
+        for constraint in obj.constraints:
+            record_constraint(scan, obj, obj.name, constraint, constraint_visitors)
+
+        if obj.type == 'ARMATURE' and obj.pose:
+            for pose_bone in obj.pose.bones:
+                for constraint in pose_bone.constraints:
+                    record_constraint(scan, obj, f"{obj.name}:{pose_bone.name}", constraint, constraint_visitors)
+
+    report = {rule.rule_id: {'label': rule.label, 'issues': rule.finish(scan)} for rule in rules}
+
+    last_report.clear()
+    last_report.update(report)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n=== Scene Health Lint: 오브젝트 {len(scan.objects)}개, {elapsed:.2f}초 ===")
+    for rule_id, result in report.items():
+        print(f"  {result['label']}: {len(result['issues'])}건")
+
+    return report
+
+def select_rule_objects(context, rule_id, report=None):
+    """리포트에서 지정한 규칙에 걸린 오브젝트만 선택하는 함수"""
+    report = report or last_report
+    issues = report.get(rule_id, {}).get('issues', [])
+    view_layer_objects = context.view_layer.objects
+
+    objects = [target for target, _ in issues
+               if isinstance(target, bpy.types.Object) and view_layer_objects.get(target.name) == target]
+    objects = list(dict.fromkeys(objects))
+
+    bpy.ops.object.select_all(action='DESELECT')
+    for obj in objects:
+        obj.select_set(True)
+    if objects:
+        view_layer_objects.active = objects[-1]
+    return objects
+
+
+class MW_OT_LintScene(bpy.types.Operator):
+    """Check the scene for common problems in a single pass"""
+    bl_idname = "mw.lint_scene"
+    bl_label = "Scene Health Lint"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    select_rule: bpy.props.EnumProperty(
+        name="Select",
+        description="Select the objects found by this rule",
+        items=[('NONE', "None", "Only report")] + [(rule.rule_id, rule.label, "") for rule in LINT_RULES],
+        default='NONE',
+    )
+
+    def execute(self, context):
+        report = lint_scene(context.scene)
+        total = sum(len(result['issues']) for result in report.values())
+
+        if self.select_rule != 'NONE':
+            objects = select_rule_objects(context, self.select_rule, report)
+            self.report({'INFO'}, f"{total} issues, selected {len(objects)} objects ({report[self.select_rule]['label']})")
+        else:
+            self.report({'INFO'}, f"{total} issues found")
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(MW_OT_LintScene)
+
+def unregister():
+    bpy.utils.unregister_class(MW_OT_LintScene)
+
+if __name__ == "__main__":
+    # 기존 등록 해제 (안전성)
+    try:
+        unregister()
+    except:
+        pass
+
+    register()
+
+    bpy.ops.mw.lint_scene()
@@ -0,0 +1,253 @@
+"""
+Script Manager Index
+스크립트 매니저가 사용하는 스크립트 메타데이터 인덱스를 관리하는 모듈입니다.
+
+- 스크립트마다 경로, 수정 시간(mtime), 크기, 내용 해시, docstring, 오퍼레이터, 진입 함수, 태그를 기록합니다.
+- 재스캔은 증분 방식입니다. mtime과 크기가 같으면 파일을 읽지 않고,
+  내용 해시가 같으면 다시 파싱하지 않습니다.
+- 메타데이터는 AST로 추출하므로 스크립트를 실행하지 않습니다 (bpy 없이도 동작).
+- 사라진 스크립트는 인덱스와 preferences.json에서 모두 정리(prune)합니다.
+"""
+
+import ast
+import hashlib
+import json
+import os
+
+SCRIPT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+PREFERENCES_DIRECTORY = os.path.join(SCRIPT_DIRECTORY, "Manager_preferences")
+PREFERENCES_PATH = os.path.join(PREFERENCES_DIRECTORY, "preferences.json")
+INDEX_PATH = os.path.join(PREFERENCES_DIRECTORY, "script_index.json")
+
+INDEX_VERSION = 1   # 인덱스 항목 형식이 바뀌면 올려서 전체 재파싱
+SKIP_DIRECTORIES = {"__pycache__", "Manager_preferences"}
+SKIP_FILES = {"__init__.py"}
+
+def load_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_json(path, data):
+    """임시 파일에 쓴 뒤 교체해서 중간에 실패해도 기존 파일이 깨지지 않도록 저장"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+def iter_script_files(directory=SCRIPT_DIRECTORY):
+    """
+    스크립트 파일의 (인덱스 키, 절대 경로, stat)을 반환하는 제너레이터
+    인덱스 키는 스크립트 폴더 기준 상대 경로입니다 (루트의 스크립트는 파일 이름 그대로).
+    """
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    if entry.name not in SKIP_DIRECTORIES:
+                        pending.append(entry.path)
+                elif entry.name.endswith(".py") and entry.name not in SKIP_FILES:
+                    key = os.path.relpath(entry.path, directory).replace(os.sep, "/")
+                    yield key, entry.path, entry.stat()
+
+def get_constant_string(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+def is_operator_class(node):
+    """Operator 또는 bpy.types.Operator를 상속한 클래스인지 확인 (패널 등은 제외)"""
+    for base in node.bases:
+        name = base.attr if isinstance(base, ast.Attribute) else getattr(base, "id", "")
+        if name == "Operator":
+            return True
+    return False
+
+def get_class_operator(node):
+    """bl_idname이 문자열로 지정된 오퍼레이터 클래스에서 오퍼레이터 정보를 추출하는 함수"""
+    if not is_operator_class(node):
+        return None
+
+    values = {}
+    for statement in node.body:
+        if isinstance(statement, ast.Assign) and len(statement.targets) == 1:
+            target, value = statement.targets[0], statement.value
+        elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+            target, value = statement.target, statement.value
+        else:
+            continue
+        if isinstance(target, ast.Name) and target.id in {"bl_idname", "bl_label", "bl_description"}:
+            values[target.id] = get_constant_string(value)
+
+    if not values.get("bl_idname"):
+        return None
+
+    return {
+        "class": node.name,
+        "idname": values["bl_idname"],
+        "label": values.get("bl_label") or "",
+        "description": values.get("bl_description") or ast.get_docstring(node) or "",
+    }
+
+def get_main_calls(node):
+    """if __name__ == "__main__": 블록에서 직접 호출하는 최상위 함수 이름을 추출하는 함수"""
+    test = node.test
+    is_main_guard = (
+        isinstance(test, ast.Compare)
+        and isinstance(test.left, ast.Name) and test.left.id == "__name__"
+        and len(test.comparators) == 1 and get_constant_string(test.comparators[0]) == "__main__"
+    )
+    if not is_main_guard:
+        return []
+
+    calls = []
+    for statement in node.body:
+        for child in ast.walk(statement):
+            if isinstance(child, ast.Call) and isinstance(child.func, ast.Name) and child.func.id not in calls:
+                calls.append(child.func.id)
+    return calls
+
+def parse_script_metadata(source, filename="<script>"):
+    """
+    스크립트 소스를 AST로 파싱해서 docstring, 오퍼레이터, 함수, 진입 함수를 추출하는 함수
+    스크립트는 실행하지 않습니다.
+    """
+    try:
+        tree = ast.parse(source, filename)
+    except SyntaxError as e:
+        return {"docstring": "", "operators": [], "functions": [], "entry_points": [],
+                "error": f"SyntaxError: {e.msg} (line {e.lineno})"}
+
+    operators = []
+    functions = []
+    entry_points = []
+
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            operator = get_class_operator(node)
+            if operator:
+                operators.append(operator)
+        elif isinstance(node, ast.FunctionDef):
+            functions.append(node.name)
+        elif isinstance(node, ast.If):
+            entry_points.extend(get_main_calls(node))
+
+    # 진입 함수는 이 파일에 정의된 함수만 (register 등 포함)
+    defined = set(functions)
+    entry_points = [name for name in entry_points if name in defined]
+
+    return {
+        "docstring": (ast.get_docstring(tree) or "").strip(),
+        "operators": operators,
+        "functions": functions,
+        "entry_points": entry_points,
+        "error": "",
+    }
+
+def parse_tags(tags_text):
+    return [tag.strip() for tag in tags_text.split(",") if tag.strip()]
+
+def update_index(directory=SCRIPT_DIRECTORY, index_path=INDEX_PATH, preferences_path=PREFERENCES_PATH):
+    """
+    스크립트 인덱스를 증분 갱신하고 저장하는 함수
+    반환값: (인덱스 딕셔너리, 통계 딕셔너리)
+    """
+    index = load_json(index_path, {})
+    if index.get("version") != INDEX_VERSION:
+        index = {"version": INDEX_VERSION, "scripts": {}}
+    old_scripts = index["scripts"]
+
+    preferences = load_json(preferences_path, {})
+
+    scripts = {}
+    stats = {"unchanged": 0, "touched": 0, "parsed": 0, "removed": 0, "pruned_preferences": 0}
+
+    for key, path, stat in iter_script_files(directory):
+        entry = old_scripts.get(key)
+
+        # 1. mtime과 크기가 같으면 파일을 읽지 않고 그대로 사용
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            stats["unchanged"] += 1
+        else:
+            with open(path, "rb") as f:
+                data = f.read()
+            content_hash = hashlib.sha1(data).hexdigest()
+
+            # 2. 내용이 같으면 (체크아웃 등으로 mtime만 바뀐 경우) 파싱 생략
+            if entry and entry["hash"] == content_hash:
+                stats["touched"] += 1
+                entry = dict(entry)
+            else:
+                stats["parsed"] += 1
+                entry = parse_script_metadata(data.decode("utf-8", errors="replace"), key)
+                entry["hash"] = content_hash
+            entry["mtime_ns"] = stat.st_mtime_ns
+            entry["size"] = stat.st_size
+
+        # 태그는 preferences.json의 값을 반영 (파일이 바뀌지 않아도 갱신)
+        entry["path"] = key
+        entry["tags"] = parse_tags(preferences.get(key, {}).get("tags", ""))
+        scripts[key] = entry
+
+    stats["removed"] = len(set(old_scripts) - set(scripts))
+
+    # 3. 더 이상 존재하지 않는 스크립트의 설정 정리
+    stale_keys = [key for key in preferences if key not in scripts]
+    for key in stale_keys:
+        del preferences[key]
+    stats["pruned_preferences"] = len(stale_keys)
+    if stale_keys:
+        save_json(preferences_path, preferences)
+
+    if stats["parsed"] or stats["touched"] or stats["removed"] or old_scripts.keys() != scripts.keys():
+        index["scripts"] = scripts
+        save_json(index_path, index)
+    else:
+        index["scripts"] = scripts
+
+    return index, stats
+
+def get_display_name(key, preference):
+    custom_name = preference.get("custom_display_name", "")
+    if custom_name:
+        return custom_name
+    return os.path.splitext(os.path.basename(key))[0].replace("_", " ")
+
+def list_scripts(index, preferences_path=PREFERENCES_PATH, tag=None):
+    """
+    매니저 목록 표시용 행 리스트를 반환하는 함수 (즐겨찾기 우선, 표시 이름 순)
+    tag를 지정하면 해당 태그가 있는 스크립트만 반환합니다.
+    """
+    preferences = load_json(preferences_path, {})
+    rows = []
+    for key, entry in index["scripts"].items():
+        if tag and tag not in entry["tags"]:
+            continue
+        preference = preferences.get(key, {})
+        rows.append({
+            "path": key,
+            "display_name": get_display_name(key, preference),
+            "favorite": bool(preference.get("favorite", False)),
+            "summary": entry["docstring"].splitlines()[0] if entry["docstring"] else "",
+            "operators": [operator["idname"] for operator in entry["operators"]],
+            "tags": entry["tags"],
+        })
+    rows.sort(key=lambda row: (not row["favorite"], row["display_name"].lower()))
+    return rows
+
+if __name__ == "__main__":
+    script_index, scan_stats = update_index()
+    print(f"INFO: 스크립트 {len(script_index['scripts'])}개 "
+          f"(변경 없음 {scan_stats['unchanged']}, 파싱 {scan_stats['parsed']}, "
+          f"해시 동일 {scan_stats['touched']}, 삭제 {scan_stats['removed']}, "
+          f"설정 정리 {scan_stats['pruned_preferences']})")
+    for row in list_scripts(script_index):
+        star = "*" if row["favorite"] else " "
+        print(f" {star} {row['display_name']:<45} {', '.join(row['operators'])}")
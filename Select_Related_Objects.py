@@ -1,5 +1,10 @@
 import bpy
 
+try:
+    from .Shared_Utils import profiled
+except ImportError:
+    from Shared_Utils import profiled
+
 def get_constraint_related_objects(start_objects):
     """
     주어진 오브젝트들과 컨스트레인트 관계를 가진 모든 오브젝트를 찾아 반환하는 함수
@@ -64,6 +69,7 @@ def get_constraint_related_objects(start_objects):
     
     return related_objects
 
+@profiled()
 def select_constraint_related_objects():
     """
     선택된 오브젝트와 서로 컨스트레인트 관계를 가진 모든 오브젝트를 선택하는 함수
@@ -0,0 +1,167 @@
+"""
+Sharded Bake
+긴 프레임 범위의 포즈 베이크를 여러 개의 백그라운드 Blender 프로세스로 나눠서 병렬로 실행하는 모듈입니다.
+
+1. 현재 파일 상태를 임시 .blend 파일로 복사 저장
+2. 프레임 범위를 SHARD_COUNT개로 나누고, 구간마다 `blender -b` 워커 프로세스를 실행
+3. 워커는 프레임마다 포즈 본 행렬(아마추어 공간)을 메모리 맵 .npy 파일에 기록
+4. 부모는 모든 구간을 합쳐서 본 로컬 트랜스폼으로 변환한 뒤 하나의 액션에 키를 일괄 기록
+
+프레임 평가가 한 코어에 묶이는 작업이므로 코어 수만큼 처리량이 늘어납니다.
+(기본 상속 설정의 본은 배열 연산으로, Inherit Rotation / Inherit Scale / Local Location /
+ Relative Parent 설정이 다른 본은 Bone.convert_local_to_pose로 프레임마다 변환합니다.)
+"""
+
+import bpy
+import numpy as np
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+try:
+    from .Shared_Utils import get_logger, run_steps
+except ImportError:
+    from Shared_Utils import get_logger, run_steps
+
+# 본 로컬 트랜스폼 변환과 키 일괄 기록은 Keyframe_Utils의 함수를 사용
+try:
+    from .Keyframe_Utils import pose_to_basis_matrices, write_pose_action
+except ImportError:
+    from Keyframe_Utils import pose_to_basis_matrices, write_pose_action
+
+log = get_logger("Sharded_Bake")
+
+SHARD_COUNT = max(1, (os.cpu_count() or 2) - 1)   # 워커 프로세스 수 (부모 프로세스용 코어 1개 남김)
+MIN_FRAMES_PER_SHARD = 50     # 구간이 이보다 짧으면 워커 수를 줄임 (파일 로딩 비용이 더 큼)
+WORKER_FLAG = "--mw-shard-worker"
+
+def split_frame_range(frame_start, frame_end, shard_count):
+    """프레임 범위를 거의 같은 길이의 (시작, 끝) 구간들로 나누는 함수 (끝 포함)"""
+    frame_count = frame_end - frame_start + 1
+    shard_count = max(1, min(shard_count, frame_count // MIN_FRAMES_PER_SHARD or 1))
+    bounds = np.linspace(0, frame_count, shard_count + 1).astype(int)
+    return [(frame_start + int(bounds[i]), frame_start + int(bounds[i + 1]) - 1) for i in range(shard_count)]
+
+def read_pose_matrices(pose_bones, buffer):
+    """포즈 본 행렬(아마추어 공간)을 foreach_get으로 읽어 buffer (본 수, 16)에 기록"""
+    pose_bones.foreach_get("matrix", buffer.reshape(-1))
+
+def run_worker(argv):
+    """
+    워커 프로세스 진입점 (blender -b 복사본.blend --python Sharded_Bake.py -- --mw-shard-worker ...)
+    지정한 프레임 구간의 포즈 본 행렬을 메모리 맵 파일에 기록합니다.
+    """
+    armature_name, frame_start, frame_end, output_path = argv[0], int(argv[1]), int(argv[2]), argv[3]
+    scene = bpy.context.scene
+    pose_bones = bpy.data.objects[armature_name].pose.bones
+
+    output = np.load(output_path, mmap_mode='r+')
+    if output.shape[1] != len(pose_bones):
+        raise RuntimeError(f"본 개수가 다릅니다: {output.shape[1]} != {len(pose_bones)}")
+
+    frame_buffer = np.empty((len(pose_bones), 16), dtype=np.float32)
+    for row, frame in enumerate(range(frame_start, frame_end + 1)):
+        scene.frame_set(frame)
+        read_pose_matrices(pose_bones, frame_buffer)
+        output[row] = frame_buffer
+    output.flush()
+    del output
+
+def start_worker(blend_path, armature_name, frame_start, frame_end, output_path, log_path):
+    command = [
+        bpy.app.binary_path, "-b", "--factory-startup",
+        "--enable-autoexec" if bpy.context.preferences.filepaths.use_scripts_auto_execute else "--disable-autoexec",
+        "-t", "1",   # 워커끼리 코어를 나눠 쓰도록 스레드 1개로 제한
+        blend_path,
+        "--python-exit-code", "1",   # 스크립트 오류 시 0이 아닌 종료 코드
+        # 워커에서 Shared_Utils 등 같은 폴더의 모듈을 import 할 수 있도록 스크립트 폴더를 경로에 추가
+        "--python-expr", f"import sys; sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})",
+        "--python", os.path.abspath(__file__),
+        "--", WORKER_FLAG, armature_name, str(frame_start), str(frame_end), output_path,
+    ]
+    log_file = open(log_path, "w")
+    process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT)
+    return process, log_file
+
+def read_log_tail(log_path, lines=20):
+    try:
+        with open(log_path, "r", errors="replace") as f:
+            return "".join(f.readlines()[-lines:])
+    except OSError:
+        return ""
+
+@log.flushing
+def bake_sharded(armature_obj, frame_start, frame_end, shard_count=SHARD_COUNT, action=None):
+    """동기 실행 버전"""
+    return run_steps(iter_bake_sharded(armature_obj, frame_start, frame_end, shard_count, action))
+
+def iter_bake_sharded(armature_obj, frame_start, frame_end, shard_count=SHARD_COUNT, action=None):
+    """
+    프레임 구간을 워커 프로세스들로 나눠 베이크하고 진행률(0.0 ~ 1.0)을 yield 하는 함수
+    action이 있으면 그 액션에, 없으면 새 액션에 키를 기록합니다. (Keyframe_Utils.write_pose_action)
+    반환값: 베이크된 액션 (armature_obj에 지정됨, 컨스트레인트는 그대로 둠)
+    """
+    shards = split_frame_range(frame_start, frame_end, shard_count)
+    bone_count = len(armature_obj.pose.bones)
+    work_directory = tempfile.mkdtemp(prefix="mw_shard_bake_")
+    workers = []
+
+    try:
+        # 1. 현재 상태(복사된 아마추어 포함)를 임시 파일로 저장
+        blend_path = os.path.join(work_directory, "shard_source.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+
+        # 2. 구간마다 출력 메모리 맵을 만들고 워커 실행
+        for index, (shard_start, shard_end) in enumerate(shards):
+            output_path = os.path.join(work_directory, f"shard_{index}.npy")
+            np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float32,
+                                      shape=(shard_end - shard_start + 1, bone_count, 16)).flush()
+            log_path = os.path.join(work_directory, f"shard_{index}.log")
+            process, log_file = start_worker(blend_path, armature_obj.name, shard_start, shard_end, output_path, log_path)
+            workers.append((process, log_file, output_path, log_path))
+
+        # 3. 워커가 끝날 때까지 대기
+        # 끝난 워커 수가 바뀌면 진행률을, 아니면 None을 yield 해서 다음 타이머 이벤트까지 기다림
+        finished_count = 0
+        while True:
+            finished = [process.poll() is not None for process, *_ in workers]
+            for process, log_file, output_path, log_path in workers:
+                if process.returncode not in (None, 0):
+                    raise RuntimeError(f"Shard 워커 실패 (code {process.returncode}):\n{read_log_tail(log_path)}")
+            if all(finished):
+                break
+            if sum(finished) != finished_count:
+                finished_count = sum(finished)
+                yield 0.9 * finished_count / len(workers)
+            else:
+                yield None
+
+        # 4. 구간들을 합쳐서 (프레임, 본, 4, 4) 배열로 만들고 액션에 기록
+        # foreach_get의 행렬은 열 우선(column-major)이므로 전치
+        pose_matrices = np.concatenate([np.load(output_path) for _, _, output_path, _ in workers])
+        pose_matrices = pose_matrices.reshape(-1, bone_count, 4, 4).transpose(0, 1, 3, 2).astype(np.float64)
+        yield 0.95
+
+        frames = np.arange(frame_start, frame_end + 1, dtype=np.float32)
+        action = write_pose_action(armature_obj, frames, pose_to_basis_matrices(armature_obj, pose_matrices), action=action)
+        log.info("%d개 워커로 %d프레임 베이크 완료: '%s'", len(workers), len(frames), action.name)
+        return action
+
+    finally:
+        # 취소/오류 시 남은 워커 종료 후 임시 파일 정리
+        for process, log_file, *_ in workers:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            log_file.close()
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+# 워커 프로세스로 실행된 경우
+if __name__ == "__main__":
+    arguments = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if arguments[:1] == [WORKER_FLAG]:
+        run_worker(arguments[1:])
+    else:
+        print("사용법: Convert_Armature_for_UE의 SHARD_BAKE 모드 또는 iter_bake_sharded()에서 사용합니다.")
@@ -0,0 +1,141 @@
+"""
+Shared Utils
+여러 스크립트가 함께 사용하는 도우미를 모아 둔 모듈입니다.
+
+- profiled, profile_steps: Hot_Path_Profiler의 프로파일링 데코레이터와 제너레이터 작업 래퍼
+  (Hot_Path_Profiler를 찾을 수 없으면 아무것도 하지 않는 함수로 대체)
+- get_logger, DEBUG / INFO / WARNING / ERROR: Buffered_Logger의 로거와 레벨
+  (Buffered_Logger를 찾을 수 없으면 INFO 이상을 print로 바로 출력하는 PrintLogger로 대체,
+   반복 메시지(item)는 WARNING 이상만 출력)
+- run_steps: 진행률을 yield 하는 제너레이터 작업(iter_*)을 끝까지 동기 실행하고 결과를 반환
+  (작업이 None을 yield 하면 외부 작업을 기다리는 중이므로 WAIT_INTERVAL 동안 쉬었다가 진행)
+- get_all_fcurves: 액션의 모든 F-Curve (Blender 4.x 이하의 Action.fcurves와 5.0+ 슬롯 액션 모두 지원)
+- scale_keyframe_values: F-Curve 키프레임 값과 핸들의 Y값을 foreach_get/foreach_set으로 한 번에 스케일
+- rename_action_to_object_name: 액션 이름을 오브젝트 이름으로 변경 (다른 액션이 이미 쓰는 이름이면 .001 등 접미사)
+
+사용법:
+    try:
+        from .Shared_Utils import profiled, get_logger, run_steps
+    except ImportError:
+        from Shared_Utils import profiled, get_logger, run_steps
+"""
+
+import time
+
+import bpy
+import numpy as np
+
+WAIT_INTERVAL = 0.05   # run_steps에서 작업이 None(대기 중)을 yield 했을 때 쉬는 시간 (초)
+
+try:
+    from .Hot_Path_Profiler import profiled, profile_steps
+except ImportError:
+    try:
+        from Hot_Path_Profiler import profiled, profile_steps
+    except ImportError:
+        def profiled(name=None):
+            """Hot_Path_Profiler를 찾을 수 없으면 아무것도 하지 않는 데코레이터"""
+            return lambda func: func
+
+        def profile_steps(steps, name):
+            return steps
+
+try:
+    from .Buffered_Logger import get_logger, DEBUG, INFO, WARNING, ERROR
+except ImportError:
+    try:
+        from Buffered_Logger import get_logger, DEBUG, INFO, WARNING, ERROR
+    except ImportError:
+        DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+
+        class PrintLogger:
+            """Buffered_Logger를 찾을 수 없을 때 print로 바로 출력하는 로거 (WARNING 미만의 반복 메시지는 생략)"""
+            PREFIXES = {DEBUG: "", INFO: "", WARNING: "WARNING: ", ERROR: "ERROR: "}
+
+            def is_enabled_for(self, message_level):
+                return message_level >= INFO
+
+            def log(self, message_level, message, *args):
+                if message_level >= INFO:
+                    print(self.PREFIXES[message_level] + (message % args if args else message))
+
+            def debug(self, message, *args):
+                pass
+
+            def info(self, message, *args):
+                self.log(INFO, message, *args)
+
+            def warning(self, message, *args):
+                self.log(WARNING, message, *args)
+
+            def error(self, message, *args):
+                self.log(ERROR, message, *args)
+
+            def item(self, key, message, *args, message_level=INFO):
+                if message_level >= WARNING:
+                    self.log(message_level, message, *args)
+
+            def flush(self):
+                pass
+
+            def flushing(self, func):
+                return func
+
+        def get_logger(name):
+            return PrintLogger()
+
+def run_steps(steps):
+    """제너레이터 작업을 끝까지 동기 실행하고 결과를 반환하는 함수 (Modal_Job_Runner 없이 실행할 때)"""
+    try:
+        while True:
+            if next(steps) is None:
+                time.sleep(WAIT_INTERVAL)
+    except StopIteration as result:
+        return result.value
+
+def get_all_fcurves(action):
+    """
+    Blender 5.0+ 호환성을 위한 F-Curve 가져오기 헬퍼 함수
+    Action.fcurves (Legacy) 또는 Action.slots -> channelbag (New)를 모두 지원
+    """
+    # 1. Legacy API (Blender 4.x 이하)
+    if hasattr(action, "fcurves"):
+        return action.fcurves
+
+    # 2. New API (Blender 5.0+ Slotted Actions)
+    fcurves = []
+    if hasattr(action, "slots"):
+        try:
+            from bpy_extras import anim_utils
+            for slot in action.slots:
+                channelbag = anim_utils.action_get_channelbag_for_slot(action, slot)
+                if channelbag:
+                    fcurves.extend(channelbag.fcurves)
+        except ImportError:
+            pass
+
+    return fcurves
+
+def scale_keyframe_values(fcurve, factor):
+    """F-Curve 키프레임 값과 핸들의 Y값을 한 번에 스케일하는 함수"""
+    points = fcurve.keyframe_points
+    count = len(points)
+    if not count:
+        return
+    buffer = np.empty(count * 2, dtype=np.float32)
+    for attr in ("co", "handle_left", "handle_right"):
+        points.foreach_get(attr, buffer)
+        buffer[1::2] *= factor
+        points.foreach_set(attr, buffer)
+    fcurve.update()
+
+def rename_action_to_object_name(action, object_name):
+    """액션 이름을 오브젝트 이름으로 변경하고 새 이름을 반환하는 함수 (중복이면 .001 등 접미사)"""
+    new_action_name = object_name
+    if new_action_name in bpy.data.actions and bpy.data.actions[new_action_name] != action:
+        counter = 1
+        while f"{new_action_name}.{counter:03d}" in bpy.data.actions:
+            counter += 1
+        new_action_name = f"{new_action_name}.{counter:03d}"
+    action.name = new_action_name
+    return new_action_name
@@ -1,4 +1,136 @@
 import bpy
+import numpy as np
+
+try:
+    from .Shared_Utils import profiled, get_all_fcurves, scale_keyframe_values
+except ImportError:
+    from Shared_Utils import profiled, get_all_fcurves, scale_keyframe_values
+
+# True면 Unit Scale 변경과 함께 실제 데이터(메시, 셰이프 키, 오브젝트/본 위치,
+# 아마추어 레스트 포즈, Location F-Curve)를 같은 배율로 스케일합니다.
+RESCALE_DATA = False
+
+def scale_collection_attribute(collection, attr, factor, width=3):
+    """컬렉션의 float 벡터 속성을 foreach_get/foreach_set으로 한 번에 스케일하는 함수"""
+    count = len(collection)
+    if not count:
+        return 0
+    buffer = np.empty(count * width, dtype=np.float32)
+    collection.foreach_get(attr, buffer)
+    buffer *= factor
+    collection.foreach_set(attr, buffer)
+    return count
+
+def collect_scene_actions(objects):
+    """오브젝트들이 사용하는 액션 (활성 액션 + NLA 스트립)을 중복 없이 수집하는 함수"""
+    actions = set()
+    for obj in objects:
+        animation_data = obj.animation_data
+        if not animation_data:
+            continue
+        if animation_data.action:
+            actions.add(animation_data.action)
+        for track in animation_data.nla_tracks:
+            for strip in track.strips:
+                if strip.action:
+                    actions.add(strip.action)
+    return actions
+
+def rescale_scene_data(factor):
+    """
+    씬 전체의 실제 데이터를 factor배 하는 함수
+    - 공유된 메시/아마추어 데이터블록은 한 번만 처리
+    - 모든 값은 foreach_get/foreach_set으로 일괄 처리
+    - 링크된(라이브러리) 데이터는 수정할 수 없으므로 건너뜀
+    """
+    context = bpy.context
+    scene = context.scene
+    view_layer = context.view_layer
+    objects = list(scene.objects)
+
+    if context.object and context.object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    # 1. 메시 버텍스 + 셰이프 키 (데이터블록당 한 번)
+    meshes = {obj.data for obj in objects if obj.type == 'MESH' and obj.data and not obj.data.library}
+    vertex_count = 0
+    for mesh in meshes:
+        vertex_count += scale_collection_attribute(mesh.vertices, "co", factor)
+        if mesh.shape_keys:
+            for key_block in mesh.shape_keys.key_blocks:
+                scale_collection_attribute(key_block.data, "co", factor)
+        mesh.update()
+
+    # 2. 오브젝트 위치 (자식 오브젝트의 로컬 위치와 Parent Inverse의 이동 성분 포함)
+    editable_objects = [obj for obj in objects if not obj.library]
+    if len(editable_objects) == len(objects):
+        scale_collection_attribute(scene.objects, "location", factor)
+        scale_collection_attribute(scene.objects, "delta_location", factor)
+    else:
+        for obj in editable_objects:
+            obj.location *= factor
+            obj.delta_location *= factor
+    for obj in editable_objects:
+        if obj.parent:
+            parent_inverse = obj.matrix_parent_inverse.copy()
+            parent_inverse.translation *= factor
+            obj.matrix_parent_inverse = parent_inverse
+
+    # 3. 아마추어 레스트 포즈 (데이터블록당 한 번, Edit 모드 한 번에 모두 처리)
+    armature_users = {}
+    for obj in editable_objects:
+        if (obj.type == 'ARMATURE' and not obj.data.library and obj.data not in armature_users
+                and view_layer.objects.get(obj.name) is not None and obj.visible_get()):
+            armature_users[obj.data] = obj
+
+    skipped_armatures = {obj.data for obj in editable_objects if obj.type == 'ARMATURE'} - set(armature_users)
+    for armature in skipped_armatures:
+        print(f"WARNING: 아마추어 '{armature.name}'은(는) 링크되었거나 숨겨져 있어 레스트 포즈를 스케일하지 않았습니다.")
+
+    if armature_users:
+        original_selection = list(context.selected_objects)
+        original_active = view_layer.objects.active
+
+        for obj in original_selection:
+            obj.select_set(False)
+        for obj in armature_users.values():
+            obj.select_set(True)
+        view_layer.objects.active = next(iter(armature_users.values()))
+
+        bpy.ops.object.mode_set(mode='EDIT')
+        for obj in armature_users.values():
+            if obj.mode != 'EDIT':
+                print(f"WARNING: 아마추어 '{obj.name}'의 Edit 모드 진입에 실패했습니다.")
+                continue
+            edit_bones = obj.data.edit_bones
+            scale_collection_attribute(edit_bones, "head", factor)
+            scale_collection_attribute(edit_bones, "tail", factor)
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+        for obj in armature_users.values():
+            obj.select_set(False)
+        for obj in original_selection:
+            obj.select_set(True)
+        view_layer.objects.active = original_active
+
+    # 4. 포즈 본 위치 (포즈는 오브젝트마다 따로 존재)
+    for obj in editable_objects:
+        if obj.type == 'ARMATURE' and obj.pose:
+            scale_collection_attribute(obj.pose.bones, "location", factor)
+
+    # 5. Location F-Curve (액션당 한 번)
+    location_curves = 0
+    for action in collect_scene_actions(objects):
+        if action.library:
+            continue
+        for fcurve in get_all_fcurves(action):
+            if fcurve.data_path.endswith("location"):
+                scale_keyframe_values(fcurve, factor)
+                location_curves += 1
+
+    print(f"데이터 스케일 x{factor}: 메시 {len(meshes)}개 (버텍스 {vertex_count}개), "
+          f"오브젝트 {len(editable_objects)}개, 아마추어 {len(armature_users)}개, "
+          f"Location 곡선 {location_curves}개")
 
 def show_message_dialog(message, title="알림", icon='INFO'):
     """메시지 다이얼로그를 띄우는 함수"""
@@ -9,8 +141,12 @@ def show_message_dialog(message, title="알림", icon='INFO'):
     
     bpy.context.window_manager.popup_menu(draw, title=title, icon=icon)
 
-def toggle_unreal_units():
-    """단순 함수 버전 - 스크립트 직접 실행용"""
+@profiled()
+def toggle_unreal_units(rescale_data=RESCALE_DATA):
+    """
+    단순 함수 버전 - 스크립트 직접 실행용
+    rescale_data=True면 화면상 크기가 유지되도록 실제 데이터를 (이전 Scale / 새 Scale)배 합니다.
+    """
     scene = bpy.context.scene
     current_scale = scene.unit_settings.scale_length
     
@@ -46,6 +182,12 @@ def toggle_unreal_units():
         message = "비표준 Unit Scale 감지\n블렌더 기본 Unit으로 리셋되었습니다\nScale: 1.0"
         show_message_dialog(message, "Unit 리셋 완료", 'ERROR')
     
+    # 데이터 리스케일 (예: 1.0 -> 0.01이면 100배, 0.01 -> 1.0이면 0.01배)
+    if rescale_data:
+        factor = current_scale / scene.unit_settings.scale_length
+        if abs(factor - 1.0) > 1e-6:
+            rescale_scene_data(factor)
+
     # 변경 후 상태 출력
     print(f"변경된 Unit Scale: {scene.unit_settings.scale_length}")
     print(f"변경된 Length Unit: {scene.unit_settings.length_unit}")
@@ -0,0 +1,174 @@
+"""
+MW Blender Scripts 애드온
+스크립트 폴더 전체를 하나의 애드온으로 설치할 때 사용하는 진입점입니다.
+
+- register()는 가벼운 오퍼레이터 스텁과 패널만 등록합니다.
+  각 스크립트 모듈(과 NumPy)은 해당 오퍼레이터가 처음 실행될 때 import 됩니다.
+- 스크립트 파일은 그대로 Blender 텍스트 에디터에서 단독 실행할 수도 있습니다.
+- register()에 걸린 시간은 register_time_ms에 기록되고 패널 하단에 표시됩니다.
+"""
+
+bl_info = {
+    "name": "MW Blender Scripts",
+    "author": "myungwonchoi",
+    "version": (1, 0),
+    "blender": (3, 3, 0),
+    "location": "View3D > Sidebar > MW",
+    "description": "Rigging / animation utility scripts (loaded on demand)",
+    "category": "Object",
+}
+
+import bpy
+import importlib
+import time
+
+REGISTER_TIME_BUDGET_MS = 5.0  # 이 시간보다 오래 걸리면 경고 출력
+
+# (스텁 이름, 표시 이름, 모듈 이름, 실행 방식, 대상, 설명)
+# 실행 방식
+#   'FUNCTION' : 모듈을 불러온 뒤 대상 함수를 호출
+#   'OPERATOR' : 모듈의 register()를 호출한 뒤 대상 오퍼레이터(bl_idname)를 실행
+#   'REGISTER' : 모듈의 register()만 호출 (패널 등 UI를 제공하는 모듈)
+SCRIPTS = [
+    ('add_following_bone', "Add Following Bones", "Add_Following_Bone_to_Armature", 'FUNCTION',
+     "add_following_bone_to_armature", "Add bones that follow the selected objects to the selected armature"),
+    ('create_following_armature', "Create Armature with Following Bones", "Create_Armature_with_Following_Bones", 'FUNCTION',
+     "create_armature_with_following_bones", "Create a new armature with a bone following each selected object"),
+    ('constraint_bone_to_vertex', "Constraint Bone to Vertex", "Constraint_Bone_to_Vertex", 'FUNCTION',
+     "constraint_bone_to_vertex", "Bind bones to the nearest vertices of the selected mesh (many armature/mesh pairs at once)"),
+    ('compare_aim_constraints', "Compare IK / Damped Track Playback", "Constraint_Bone_to_Vertex", 'FUNCTION',
+     "compare_constraint_modes", "Measure playback fps of the selected bound armatures with IK and with Damped Track aim constraints"),
+    ('create_controllers', "Create Controllers", "Create_Controller_to_Selected_Object", 'OPERATOR',
+     "mw.create_controllers", "Create a controller empty for each selected object"),
+    ('flatten_controllers', "Flatten Controller Constraints", "Flatten_Controller_Constraints", 'OPERATOR',
+     "mw.flatten_controllers", "Bake Child Of controller setups into plain keyframes and remove the constraints"),
+    ('create_empty', "Create Empty at Selection", "Create_Empty_Selected_Object", 'FUNCTION',
+     "create_empty_selected_object", "Create empties at the active object or the selected elements"),
+    ('select_related', "Select Constraint Related", "Select_Related_Objects", 'FUNCTION',
+     "select_constraint_related_objects", "Select every object connected by constraints"),
+    ('select_useless_empty', "Select Useless Empties", "Select_Useless_Empty", 'FUNCTION',
+     "select_useless_empty", "Select empties with no children that no constraint targets"),
+    ('select_non_unit_scale', "Select Non-Unit Scale", "Select_Non_Unit_Scale_Objects", 'OPERATOR',
+     "mw.select_non_unit_scale", "Select objects whose scale is not 1,1,1"),
+    ('lint_scene', "Scene Health Lint", "Scene_Health_Linter", 'OPERATOR',
+     "mw.lint_scene", "Check scale, empties, constraint targets, actions and controllers in one pass"),
+    ('constraint_cost', "Profile Constraint Cost", "Constraint_Cost_Profiler", 'OPERATOR',
+     "mw.profile_constraint_cost", "Measure playback cost per constraint type and owner by muting and re-evaluating"),
+    ('rename_actions', "Rename Actions to Object Name", "Rename_Action_to_Object_Name", 'FUNCTION',
+     "rename_actions_to_object_name", "Rename the actions of the selected objects after the objects"),
+    ('deduplicate_actions', "Deduplicate Actions", "Deduplicate_Actions", 'FUNCTION',
+     "deduplicate_actions", "Merge actions with identical keyframe data and remap their users"),
+    ('rename_action_slots', "Rename Action Slots to Object Name", "Rename_Action_Slots_to_Object_Name", 'FUNCTION',
+     "rename_action_slots_to_object_name", "Rename action slots after the objects using them"),
+    ('rename_by_constraints', "Rename Objects by Constraints", "Rename_Objects_by_Constraints", 'FUNCTION',
+     "rename_objects_by_constraints", "Rename objects after their constraint targets"),
+    ('change_action', "Change Objects Action", "Change_Objects_Action", 'OPERATOR',
+     "wm.action_selector", "Assign an action to the selected objects"),
+    ('convert_for_ue', "Convert Armature for UE", "Convert_Armature_for_UE", 'FUNCTION',
+     "convert_armature_for_unreal", "Copy, bake and rescale the selected armature for Unreal Engine"),
+    ('toggle_unit_scale', "Toggle Unreal Unit Scale", "Toggle_Blender_Unreal_UnitScale", 'FUNCTION',
+     "toggle_unreal_units", "Toggle the scene unit scale between Blender and Unreal"),
+    ('job_runner', "Enable Job Runner", "Modal_Job_Runner", 'REGISTER',
+     None, "Load the cancellable job runner panel"),
+    ('profiler', "Enable Profiler", "Hot_Path_Profiler", 'REGISTER',
+     None, "Load the hot path profiler panel"),
+]
+
+loaded_modules = {}        # 모듈 이름 -> 불러온 모듈
+registered_modules = []    # register()를 호출한 모듈 (해제 순서 유지)
+register_time_ms = 0.0
+
+def load_module(module_name):
+    """스크립트 모듈을 처음 사용할 때 import 하는 함수"""
+    module = loaded_modules.get(module_name)
+    if module is None:
+        module = importlib.import_module(f"{__package__}.{module_name}")
+        loaded_modules[module_name] = module
+    return module
+
+def ensure_module_registered(module_name):
+    """모듈이 자체 클래스를 가지고 있으면 처음 한 번만 register() 하는 함수"""
+    module = load_module(module_name)
+    if module not in registered_modules:
+        module.register()
+        registered_modules.append(module)
+    return module
+
+def call_operator(idname):
+    category, name = idname.split(".")
+    return getattr(getattr(bpy.ops, category), name)('INVOKE_DEFAULT')
+
+
+class ScriptStub:
+    """SCRIPTS 항목 하나를 실행하는 오퍼레이터 스텁의 공통 부분"""
+    module_name = ""
+    kind = 'FUNCTION'
+    target = None
+
+    def execute(self, context):
+        if self.kind == 'FUNCTION':
+            result = getattr(load_module(self.module_name), self.target)()
+        else:
+            ensure_module_registered(self.module_name)
+            result = call_operator(self.target) if self.kind == 'OPERATOR' else {'FINISHED'}
+
+        if isinstance(result, set) and 'CANCELLED' in result:
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+
+def make_stub_class(stub_name, label, module_name, kind, target, description):
+    # 함수 실행은 이 스텁이 Undo 단계를 만들고, 오퍼레이터 실행은 대상 오퍼레이터에 맡김
+    options = {'REGISTER', 'UNDO'} if kind == 'FUNCTION' else {'REGISTER'}
+    return type(f"MW_OT_script_{stub_name}", (ScriptStub, bpy.types.Operator), {
+        "bl_idname": f"mw.script_{stub_name}",
+        "bl_label": label,
+        "bl_description": description,
+        "bl_options": options,
+        "module_name": module_name,
+        "kind": kind,
+        "target": target,
+    })
+
+STUB_CLASSES = [make_stub_class(*entry) for entry in SCRIPTS]
+
+
+class MW_PT_scripts(bpy.types.Panel):
+    """MW Blender Scripts"""
+    bl_label = "MW Scripts"
+    bl_idname = "MW_PT_scripts"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "MW"
+
+    def draw(self, context):
+        layout = self.layout
+        column = layout.column(align=True)
+        for cls in STUB_CLASSES:
+            column.operator(cls.bl_idname)
+
+        footer = layout.row()
+        footer.enabled = False
+        footer.label(text=f"Loaded {len(loaded_modules)}/{len(SCRIPTS)} scripts, register {register_time_ms:.2f} ms")
+
+
+CLASSES = STUB_CLASSES + [MW_PT_scripts]
+
+def register():
+    global register_time_ms
+    start = time.perf_counter()
+
+    for cls in CLASSES:
+        bpy.utils.register_class(cls)
+
+    register_time_ms = (time.perf_counter() - start) * 1000.0
+    if register_time_ms > REGISTER_TIME_BUDGET_MS:
+        print(f"WARNING: MW Blender Scripts register() took {register_time_ms:.2f} ms")
+
+def unregister():
+    for module in reversed(registered_modules):
+        module.unregister()
+    registered_modules.clear()
+
+    for cls in reversed(CLASSES):
+        bpy.utils.unregister_class(cls)